@@ -1,7 +1,25 @@
 __version__ = "0.5"
 
 from .parfun import *
+from .tracing import *
+from .preprocess import *
+from .quasipoly import *
 from .barvinok import *
+from .workspace import *
 from .latte import *
+from .native import *
+from .isl import *
+from .race import *
+from .cache import *
 from .findiff import *
+from .costmodel import *
+from .chartable import *
+from .tworow import *
+from .normalize import *
 from .kronecker import *
+from .genfun import *
+from .batch import *
+from .stretched import *
+from .dispatch import *
+from .service import *
+from .wire import *
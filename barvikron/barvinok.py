@@ -1,25 +1,77 @@
-import os, subprocess
-from . import EvaluatorBase
+import logging, os, queue, subprocess, threading
+import whichcraft
+from . import EvaluatorBase, parse_isl_pw_qpolynomial, UnresolvedChamber
+from .parfun import run_async
+from .tracing import span, record
 
-__all__ = ["BarvinokEvaluator"]
+__all__ = [
+    "BarvinokEvaluator",
+    "ParametricBarvinokEvaluator",
+    "IsccEvaluator",
+    "SessionCrashed",
+]
 
+# query whose answer marks the end of the output of the preceding query in an iscc session
+MARKER = 1234567891
+MARKER_QUERY = "card { [i] : 0 <= i < %d };\n" % MARKER
+MARKER_OUTPUT = "{ %d }" % MARKER
 
-def prepare_input(A, b):
+
+def prepare_input(M, c):
     """
-    Prepare vector partition function query in the format expected by barvinok_count.
+    Prepare query for counting the lattice points in { y : M * y + c >= 0 } in the format
+    expected by barvinok_count.
     """
-    nrows, ncols = A.shape
-    s = "%d %d\n" % (ncols + nrows, 1 + ncols + 1)
+    nrows, ncols = len(M), len(M[0])
+    s = "%d %d\n" % (nrows, 1 + ncols + 1)
 
-    # x[i] >= 0
-    for i in range(ncols):
-        delta_i = [int(i == j) for j in range(ncols)]
-        s += "1   %s   0\n" % " ".join(map(str, delta_i))
+    # M[i] * y + c[i] >= 0
+    for row, c_i in zip(M, c):
+        s += "1   %s   %s\n" % (" ".join(map(str, row)), c_i)
+    return s
 
-    # A[i] * x - b[i] >= 0
+
+def prepare_parametric_input(A):
+    """
+    Prepare query for the parametric vector partition function b -> phi_A(b) in the format expected by iscc.
+    """
+    nrows, ncols = A.shape
+    params = ", ".join("b%d" % i for i in range(nrows))
+    variables = ", ".join("x%d" % j for j in range(ncols))
+
+    # x[j] >= 0 and A[i] * x = b[i]
+    constraints = ["x%d >= 0" % j for j in range(ncols)]
     for i, row in enumerate(A):
-        s += "0   %s   %s\n" % (" ".join(map(str, row)), -b[i])
-    return s
+        lhs = " + ".join("%d * x%d" % (a, j) for j, a in enumerate(row) if a != 0)
+        constraints.append("%s = b%d" % (lhs or "0", i))
+
+    return "P := [%s] -> { [%s] : %s };\ncard P;\n" % (
+        params,
+        variables,
+        " and ".join(constraints),
+    )
+
+
+def prepare_iscc_query(M, c):
+    """
+    Prepare query for counting the lattice points in { y : M * y + c >= 0 } in iscc's syntax.
+    """
+    variables = ", ".join("y%d" % j for j in range(len(M[0])))
+    constraints = []
+    for row, c_i in zip(M, c):
+        lhs = str(c_i)
+        for j, m in enumerate(row):
+            if m:
+                lhs += " %s %d*y%d" % ("+" if m > 0 else "-", abs(m), j)
+        constraints.append(lhs + " >= 0")
+    return "card { [%s] : %s };\n" % (variables, " and ".join(constraints))
+
+
+def parse_output(stdout):
+    """
+    Parse output of barvinok_count.
+    """
+    return int(stdout.splitlines()[-1])
 
 
 class BarvinokEvaluator(EvaluatorBase):
@@ -34,21 +86,247 @@ class BarvinokEvaluator(EvaluatorBase):
         self.path = path
 
     def eval(self, vpn, b):
-        # prepare input
-        stdin = prepare_input(vpn.A, b).encode("ascii")
+        # prepare input (in terms of the lower-dimensional polytope)
+        with span("prepare"):
+            count = vpn.reduced.trivial_count(b)
+            if count is not None:
+                return count
+            stdin = prepare_input(*vpn.reduced.inequalities(b)).encode("ascii")
 
         # run barvinok_count
-        popen = subprocess.Popen(
-            self.path,
+        with span("spawn"):
+            popen = subprocess.Popen(
+                self.path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+        with span("solve"):
+            stdout, _ = popen.communicate(stdin)
+        assert popen.returncode == 0
+        record(bytes_in=len(stdin), bytes_out=len(stdout))
+
+        # parse output
+        with span("parse"):
+            return parse_output(stdout)
+
+    async def eval_async(self, vpn, b):
+        with span("prepare"):
+            count = vpn.reduced.trivial_count(b)
+            if count is not None:
+                return count
+            stdin = prepare_input(*vpn.reduced.inequalities(b)).encode("ascii")
+        returncode, stdout = await run_async([self.path], stdin)
+        assert returncode == 0
+        with span("parse"):
+            return parse_output(stdout)
+
+    def __str__(self):
+        return "barvinok[%s]" % self.path
+
+
+class ParametricBarvinokEvaluator(EvaluatorBase):
+    """
+    Evaluate vector partition functions by computing their piecewise quasi-polynomial once,
+    using barvinok's iscc tool (http://barvinok.gforge.inria.fr/), and evaluating it at each
+    given point. Points that cannot be resolved are evaluated using the fallback evaluator.
+    """
+
+    def __init__(self, path, fallback=None):
+        assert os.path.isfile(path), (
+            '"%s" not found (should be path to iscc binary)' % path
+        )
+        self.path = path
+        self.fallback = fallback
+        self.quasi_polynomials = {}
+        self.lock = threading.Lock()
+
+    def quasi_polynomial(self, vpn):
+        """
+        Return the piecewise quasi-polynomial of vpn, computing it if necessary.
+        """
+        key = tuple(map(tuple, vpn.A.tolist()))
+        with self.lock:
+            if key not in self.quasi_polynomials:
+                logging.info(
+                    "Computing parametric vector partition function using iscc..."
+                )
+                stdin = prepare_parametric_input(vpn.A).encode("ascii")
+                popen = subprocess.Popen(
+                    self.path,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                )
+                stdout, _ = popen.communicate(stdin)
+                if popen.returncode != 0:
+                    logging.warning(
+                        "iscc failed (exit code %d): %s",
+                        popen.returncode,
+                        stdout.decode("ascii", "replace").strip(),
+                    )
+                    self.quasi_polynomials[key] = None
+                else:
+                    try:
+                        self.quasi_polynomials[key] = parse_isl_pw_qpolynomial(
+                            stdout.decode("ascii")
+                        )
+                    except ValueError as err:
+                        logging.warning("Could not parse output of iscc: %s", err)
+                        self.quasi_polynomials[key] = None
+            if self.quasi_polynomials[key] is None:
+                raise UnresolvedChamber(
+                    "Parametric vector partition function not available."
+                )
+            return self.quasi_polynomials[key]
+
+    def eval(self, vpn, b):
+        try:
+            return self.quasi_polynomial(vpn)(b)
+        except UnresolvedChamber as err:
+            if not self.fallback:
+                raise
+            logging.info("%s Falling back to %s.", err, self.fallback)
+            return self.fallback.eval(vpn, b)
+
+    def close(self):
+        if self.fallback:
+            self.fallback.close()
+
+    def __str__(self):
+        if self.fallback:
+            return "barvinok-parametric[%s, fallback=%s]" % (self.path, self.fallback)
+        return "barvinok-parametric[%s]" % self.path
+
+
+class SessionCrashed(Exception):
+    pass
+
+
+class IsccSession(object):
+    """
+    Long-running iscc process that queries are streamed to. The output of each query is
+    delimited by the answer to a marker query.
+    """
+
+    def __init__(self, path):
+        # ask for line-buffered output, since iscc's output is a pipe
+        args = [path]
+        stdbuf = whichcraft.which("stdbuf")
+        if stdbuf:
+            args = [stdbuf, "-oL"] + args
+        self.popen = subprocess.Popen(
+            args,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            bufsize=1,
         )
-        stdout, _ = popen.communicate(stdin)
-        assert popen.returncode == 0
+
+    def query(self, text):
+        """
+        Send query and return its output lines.
+        """
+        try:
+            self.popen.stdin.write(text + MARKER_QUERY)
+            self.popen.stdin.flush()
+        except (BrokenPipeError, OSError) as err:
+            raise SessionCrashed("iscc session died (%s)." % err)
+
+        lines = []
+        while True:
+            line = self.popen.stdout.readline()
+            if not line:
+                raise SessionCrashed(
+                    "iscc session died (exit code %s): %s"
+                    % (self.popen.poll(), "".join(lines))
+                )
+            if line.strip() == MARKER_OUTPUT:
+                return lines
+            lines.append(line)
+
+    def close(self):
+        if self.popen.poll() is None:
+            self.popen.kill()
+        self.popen.wait()
+        self.popen.stdin.close()
+        self.popen.stdout.close()
+
+
+class IsccEvaluator(EvaluatorBase):
+    """
+    Evaluate vector partition functions by streaming card queries through persistent
+    sessions of barvinok's iscc tool (http://barvinok.gforge.inria.fr/), which avoids
+    starting a process per query.
+
+    Up to the given number of sessions are started (on demand), so that as many queries can
+    be evaluated concurrently. If sessions is None, a session is started whenever all others
+    are busy. If a session dies, it is restarted and the query is retried once.
+    """
+
+    def __init__(self, path, sessions=1):
+        assert os.path.isfile(path), (
+            '"%s" not found (should be path to iscc binary)' % path
+        )
+        self.path = path
+        self.idle = queue.Queue()
+        self.num_sessions = 0
+        self.max_sessions = sessions
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            if self.idle.empty() and (
+                self.max_sessions is None or self.num_sessions < self.max_sessions
+            ):
+                self.num_sessions += 1
+                return IsccSession(self.path)
+        return self.idle.get()
+
+    def eval(self, vpn, b):
+        # prepare query (in terms of the lower-dimensional polytope)
+        with span("prepare"):
+            count = vpn.reduced.trivial_count(b)
+            if count is not None:
+                return count
+            text = prepare_iscc_query(*vpn.reduced.inequalities(b))
+
+        # stream query through session, restarting it if it died
+        session = self.acquire()
+        try:
+            try:
+                with span("solve"):
+                    lines = session.query(text)
+            except SessionCrashed as err:
+                logging.warning("%s Restarting.", err)
+                session.close()
+                with span("spawn"):
+                    session = IsccSession(self.path)
+                with span("solve"):
+                    lines = session.query(text)
+                record(restarted=True)
+        except BaseException:
+            # session is in an unknown state
+            session.close()
+            session = IsccSession(self.path)
+            raise
+        finally:
+            self.idle.put(session)
 
         # parse output
-        return int(stdout.splitlines()[-1])
+        record(bytes_in=len(text), bytes_out=sum(map(len, lines)))
+        try:
+            with span("parse"):
+                return parse_isl_pw_qpolynomial(lines[-1])([])
+        except (IndexError, ValueError, UnresolvedChamber):
+            raise Exception("Could not parse iscc output: %s" % "".join(lines))
+
+    def close(self):
+        with self.lock:
+            while not self.idle.empty():
+                self.idle.get().close()
+                self.num_sessions -= 1
 
     def __str__(self):
-        return "barvinok[%s]" % self.path
+        return "iscc[%s]" % self.path
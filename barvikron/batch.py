@@ -0,0 +1,125 @@
+import concurrent.futures, logging, multiprocessing.util, os, time
+from collections import defaultdict
+from . import EvaluatorBase
+from .findiff import weyl_finite_differences
+from .kronecker import (
+    kronecker_weight_vpn,
+    prepare_kronecker,
+    finite_difference_terms,
+)
+
+__all__ = ["kronecker_many"]
+
+
+# evaluator and partition functions of each process of a pool (also used by the
+# multi-process workers of barvikron-parallel)
+process_state = {}
+
+
+def init_process(evaluator):
+    """
+    Initialize process of a pool with the given evaluator, or with the evaluator created by
+    calling it (if it is a picklable function, e.g., functools.partial).
+    """
+    if not isinstance(evaluator, EvaluatorBase):
+        evaluator = evaluator()
+    process_state["evaluator"] = evaluator
+    process_state["vpns"] = {}
+
+    # processes of a pool do not run atexit handlers, so release resources explicitly
+    multiprocessing.util.Finalize(evaluator, evaluator.close, exitpriority=10)
+
+
+def eval_in_process(dims, weight):
+    """
+    Evaluate weight multiplicity in a process of a pool, and return it together with the
+    time it took and the id of the process.
+    """
+    start = time.perf_counter()
+    vpns = process_state["vpns"]
+    if dims not in vpns:
+        vpns[dims] = kronecker_weight_vpn(dims)
+    weight_mul = vpns[dims].eval(weight, process_state["evaluator"])
+    return weight_mul, time.perf_counter() - start, os.getpid()
+
+
+def kronecker_many(queries, evaluator, processes=1, shortcuts=True):
+    """
+    Compute the Kronecker coefficients of a list of tuples of partitions, and yield
+    (index,value) pairs as soon as all weight multiplicities needed for a query are known.
+    Queries are checked and normalized first (see prepare_kronecker).
+
+    The weight multiplicities of all queries are collected first, so that each distinct
+    (dims,weight) is evaluated only once (neighbouring queries share most of them). They are
+    evaluated in the order of the queries, so that results are yielded early. If processes
+    is larger than one, they are evaluated in a pool of processes, to each of which evaluator
+    is sent -- it should then be picklable or be a picklable function that creates the
+    evaluator (e.g., functools.partial(BarvinokEvaluator, path)).
+    """
+    findiffs = {}
+    values = {}
+    needed = defaultdict(list)
+    remaining = {}
+    for index, partitions in enumerate(queries):
+        g, partitions = prepare_kronecker(partitions, shortcuts)
+        if g is not None:
+            values[index] = g
+            continue
+
+        # collect terms of finite difference formula
+        dims = tuple(map(len, partitions))
+        if dims not in findiffs:
+            findiffs[dims] = list(weyl_finite_differences(dims))
+        g0, terms = finite_difference_terms(partitions, findiffs[dims])
+        values[index] = g0
+        remaining[index] = len(terms)
+        for coeff, weight in terms:
+            needed[dims, tuple(map(int, weight))].append((index, coeff))
+    logging.info(
+        "About to compute %d distinct weight multiplicities (%d before deduplication) for %d queries.",
+        len(needed),
+        sum(remaining.values()),
+        len(values),
+    )
+
+    # yield queries that do not need any weight multiplicities
+    for index in list(values):
+        if not remaining.get(index):
+            remaining.pop(index, None)
+            yield index, values.pop(index)
+
+    def accumulate(key, weight_mul):
+        for index, coeff in needed.pop(key):
+            values[index] += coeff * weight_mul
+            remaining[index] -= 1
+            if not remaining[index]:
+                del remaining[index]
+                yield index, values.pop(index)
+
+    if processes <= 1:
+        created = not isinstance(evaluator, EvaluatorBase)
+        if created:
+            evaluator = evaluator()
+        try:
+            vpns = {}
+            for dims, weight in list(needed):
+                if dims not in vpns:
+                    vpns[dims] = kronecker_weight_vpn(dims)
+                yield from accumulate(
+                    (dims, weight), vpns[dims].eval(weight, evaluator)
+                )
+        finally:
+            if created:
+                evaluator.close()
+        return
+
+    pool = concurrent.futures.ProcessPoolExecutor(
+        processes, initializer=init_process, initargs=(evaluator,)
+    )
+    try:
+        futures = {pool.submit(eval_in_process, *key): key for key in needed}
+        for future in concurrent.futures.as_completed(futures):
+            weight_mul, _, _ = future.result()
+            yield from accumulate(futures[future], weight_mul)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
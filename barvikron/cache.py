@@ -0,0 +1,133 @@
+import hashlib, logging, os, sqlite3, threading
+from . import EvaluatorBase
+from .tracing import record
+
+__all__ = ["MultiplicityCache", "CachedEvaluator", "query_key"]
+
+DEFAULT_MAX_ENTRIES = 1000000
+
+# logical clock used to determine the least recently used entries
+CLOCK = "SELECT COALESCE(MAX(last_used), 0) + 1 FROM multiplicities"
+
+
+def query_key(A, b):
+    """
+    Return canonical hash identifying the query phi_A(b) of a vector partition function.
+    """
+    nrows, ncols = A.shape
+    h = hashlib.sha256()
+    h.update(b"%d %d\n" % (nrows, ncols))
+    for row in A:
+        h.update(" ".join(str(int(x)) for x in row).encode("ascii") + b"\n")
+    h.update(" ".join(str(int(x)) for x in b).encode("ascii"))
+    return h.hexdigest()
+
+
+class MultiplicityCache(object):
+    """
+    On-disk store of vector partition function values, backed by SQLite.
+
+    At most max_entries values are kept; beyond that, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        dirname = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dirname, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            path, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS multiplicities "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS multiplicities_last_used ON multiplicities (last_used)"
+        )
+
+    def lookup(self, vpn, b):
+        """
+        Return cached value of vpn at b, or None if it is not in the cache.
+        """
+        key = query_key(vpn.A, b)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT value FROM multiplicities WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.db.execute(
+                "UPDATE multiplicities SET last_used = (%s) WHERE key = ?" % CLOCK,
+                (key,),
+            )
+        return int(row[0])
+
+    def store(self, vpn, b, value):
+        """
+        Store value of vpn at b, evicting least recently used entries if necessary.
+        """
+        key = query_key(vpn.A, b)
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO multiplicities VALUES (?, ?, (%s))" % CLOCK,
+                (key, str(value)),
+            )
+            (size,) = self.db.execute("SELECT COUNT(*) FROM multiplicities").fetchone()
+            if size > self.max_entries:
+                self.db.execute(
+                    "DELETE FROM multiplicities WHERE key IN "
+                    "(SELECT key FROM multiplicities ORDER BY last_used LIMIT ?)",
+                    (size - self.max_entries,),
+                )
+
+    def __len__(self):
+        with self.lock:
+            (size,) = self.db.execute("SELECT COUNT(*) FROM multiplicities").fetchone()
+        return size
+
+    def close(self):
+        self.db.close()
+
+    def __str__(self):
+        return "%s (%d hits, %d misses)" % (self.path, self.hits, self.misses)
+
+
+class CachedEvaluator(EvaluatorBase):
+    """
+    Evaluate vector partition functions using another evaluator, memoizing the results in a MultiplicityCache.
+    """
+
+    def __init__(self, evaluator, cache):
+        self.evaluator = evaluator
+        self.cache = cache
+
+    def eval(self, vpn, b):
+        value = self.cache.lookup(vpn, b)
+        record(cache="miss" if value is None else "hit")
+        if value is None:
+            value = self.evaluator.eval(vpn, b)
+            self.cache.store(vpn, b, value)
+        return value
+
+    async def eval_async(self, vpn, b):
+        value = self.cache.lookup(vpn, b)
+        record(cache="miss" if value is None else "hit")
+        if value is None:
+            value = await self.evaluator.eval_async(vpn, b)
+            self.cache.store(vpn, b, value)
+        return value
+
+    def close(self):
+        logging.info("Cache: %s", self.cache)
+        self.cache.close()
+        self.evaluator.close()
+
+    def __str__(self):
+        return "cached[%s]" % self.evaluator
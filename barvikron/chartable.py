@@ -0,0 +1,135 @@
+import functools, logging, math
+from .normalize import check_partitions
+
+__all__ = [
+    "MAX_CHARACTER_SIZE",
+    "integer_partitions",
+    "class_sizes",
+    "character",
+    "characters",
+    "character_kronecker",
+]
+
+# kronecker uses the character formula for partitions with at most this many boxes
+MAX_CHARACTER_SIZE = 30
+
+
+def integer_partitions(n, largest=None):
+    """
+    Generate all partitions of n (with parts at most largest) in reverse lexicographic order.
+    """
+    if largest is None:
+        largest = n
+    if n == 0:
+        yield ()
+        return
+    for k in range(min(n, largest), 0, -1):
+        for rest in integer_partitions(n - k, k):
+            yield (k,) + rest
+
+
+@functools.lru_cache(maxsize=None)
+def conjugacy_classes(n):
+    """
+    Return tuple of the cycle types of the symmetric group S_n.
+    """
+    return tuple(integer_partitions(n))
+
+
+@functools.lru_cache(maxsize=None)
+def class_sizes(n):
+    """
+    Return tuple of the sizes n!/z_rho of the conjugacy classes of S_n (in the order of
+    conjugacy_classes).
+    """
+    sizes = []
+    for rho in conjugacy_classes(n):
+        z = 1
+        for k in set(rho):
+            m = rho.count(k)
+            z *= k**m * math.factorial(m)
+        sizes.append(math.factorial(n) // z)
+    return tuple(sizes)
+
+
+def beta_set(partition):
+    """
+    Return beta-set (first column hook lengths) of a partition, as a sorted tuple.
+    """
+    check_partitions([partition])
+    parts = [x for x in partition if x]
+    ell = len(parts)
+    return tuple(sorted(x + ell - 1 - i for i, x in enumerate(parts)))
+
+
+@functools.lru_cache(maxsize=2**20)
+def mn_character(beta, rho):
+    """
+    Evaluate irreducible character given by beta-set on cycle type rho (a tuple sorted in
+    decreasing order) using the Murnaghan-Nakayama rule.
+    """
+    if not rho:
+        return 1
+    k, rest = rho[0], rho[1:]
+    beads = set(beta)
+    value = 0
+    for i, x in enumerate(beta):
+        # removing a rim hook of length k moves a bead from x to x-k
+        if x >= k and x - k not in beads:
+            height = sum(1 for y in beta if x - k < y < x)
+            new_beta = tuple(sorted(beta[:i] + (x - k,) + beta[i + 1 :]))
+            value += (-1) ** height * mn_character(new_beta, rest)
+    return value
+
+
+def character(partition, rho):
+    """
+    Evaluate the irreducible character of the symmetric group labeled by partition on the
+    conjugacy class with cycle type rho.
+    """
+    assert sum(partition) == sum(
+        rho
+    ), "Partition and cycle type should have the same size."
+    return mn_character(
+        beta_set(partition), tuple(sorted((x for x in rho if x), reverse=True))
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _characters(partition):
+    beta = beta_set(partition)
+    return tuple(mn_character(beta, rho) for rho in conjugacy_classes(sum(partition)))
+
+
+def characters(partition):
+    """
+    Return the row of the character table of S_n labeled by partition (in the order of
+    conjugacy_classes). Rows are cached, so the table is filled in as needed.
+    """
+    check_partitions([partition])
+    return _characters(tuple(int(x) for x in partition if x))
+
+
+def character_kronecker(partitions):
+    """
+    Compute (generalized) Kronecker coefficient of partitions, i.e., the multiplicity of the
+    trivial representation in the tensor product of the corresponding irreducible
+    representations of S_n, as (1/n!) sum_rho |C_rho| prod_i chi^(lambda_i)(rho).
+    """
+    sizes = set(map(sum, partitions))
+    assert len(sizes) == 1, "All partitions should have the same number of boxes."
+    (n,) = sizes
+    n = int(n)
+    rows = [characters(partition) for partition in partitions]
+    total = 0
+    for j, size in enumerate(class_sizes(n)):
+        value = size
+        for row in rows:
+            value *= row[j]
+            if not value:
+                break
+        total += value
+    g, remainder = divmod(total, math.factorial(n))
+    assert remainder == 0
+    logging.info("Computed Kronecker coefficient using characters of S_%d.", n)
+    return g
@@ -0,0 +1,127 @@
+import heapq, json, logging, math, os
+import numpy as np
+
+__all__ = ["CostModel", "makespan", "read_timings", "write_timings"]
+
+
+def features(dims, weight):
+    """
+    Return feature vector describing how expensive it is to evaluate the weight multiplicity
+    of given (flattened) weight.
+
+    The polytope { x >= 0 : A * x = weight } has prod(dims) variables, and for fixed
+    dimension the running time of the backends is polynomial in the bit size of the weight
+    (not in its entries), hence the logarithm of the bit size. Zero entries force whole
+    slices of variables to vanish, which makes the polytope lower-dimensional.
+    """
+    entries = [abs(int(x)) for x in weight]
+    return [
+        1.0,
+        math.log(math.prod(dims)),
+        math.log1p(sum(x.bit_length() for x in entries)),
+        sum(1 for x in entries if x == 0),
+    ]
+
+
+# coefficients of the uncalibrated model (only the resulting order of the weights matters)
+DEFAULT_COEFFICIENTS = [0.0, 1.0, 1.0, -0.5]
+
+# predictions are capped at exp(MAX_LOG_SECONDS) seconds, so that they stay finite
+MAX_LOG_SECONDS = 100.0
+
+
+class CostModel(object):
+    """
+    Predict the time (in seconds) needed to evaluate a weight multiplicity.
+
+    The model is log(seconds) = coefficients * features(dims,weight). Unless it has been
+    calibrated from recorded timings, it is only meaningful for comparing weights.
+    """
+
+    def __init__(self, coefficients=None):
+        self.calibrated = coefficients is not None
+        self.coefficients = list(
+            DEFAULT_COEFFICIENTS if coefficients is None else coefficients
+        )
+
+    def log_predict(self, dims, weight):
+        return float(np.dot(self.coefficients, features(dims, weight)))
+
+    def predict(self, dims, weight):
+        return math.exp(min(self.log_predict(dims, weight), MAX_LOG_SECONDS))
+
+    def sort(self, dims, terms):
+        """
+        Sort list of (coeff,weight)'s in place, most expensive first.
+        """
+        terms.sort(key=lambda term: self.log_predict(dims, term[1]), reverse=True)
+
+    @classmethod
+    def fit(cls, timings):
+        """
+        Calibrate model from list of (dims,weight,seconds)'s by least squares.
+        """
+        timings = [
+            (dims, weight, seconds) for dims, weight, seconds in timings if seconds > 0
+        ]
+        if len(timings) < 2 * len(DEFAULT_COEFFICIENTS):
+            logging.info("Too few timings (%d) to calibrate cost model.", len(timings))
+            return cls()
+        X = np.array(
+            [features(dims, weight) for dims, weight, _ in timings], dtype=float
+        )
+        y = np.array([math.log(seconds) for _, _, seconds in timings])
+        coefficients = np.linalg.lstsq(X, y, rcond=None)[0]
+        logging.info(
+            "Calibrated cost model from %d timings: %s", len(timings), coefficients
+        )
+        return cls(coefficients)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Calibrate model from timings recorded in given file (if it exists).
+        """
+        return cls.fit(read_timings(path)) if os.path.exists(path) else cls()
+
+    def __repr__(self):
+        return "<CostModel(%s)>" % ", ".join("%.3g" % c for c in self.coefficients)
+
+
+def read_timings(path):
+    """
+    Read list of (dims,weight,seconds)'s from a JSON lines file.
+    """
+    timings = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                timings.append((record["dims"], record["weight"], record["seconds"]))
+    return timings
+
+
+def write_timings(path, timings):
+    """
+    Append list of (dims,weight,seconds)'s to a JSON lines file.
+    """
+    with open(path, "a") as f:
+        for dims, weight, seconds in timings:
+            record = {
+                "dims": list(map(int, dims)),
+                "weight": list(map(int, weight)),
+                "seconds": seconds,
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+def makespan(costs, num_workers):
+    """
+    Return the time it takes num_workers workers to process jobs with given costs, if each
+    worker picks up the next job in the given order as soon as it becomes idle.
+    """
+    assert num_workers > 0
+    loads = [0.0] * num_workers
+    for cost in costs:
+        heapq.heapreplace(loads, loads[0] + cost)
+    return max(loads)
@@ -0,0 +1,248 @@
+import collections, datetime, json, logging, os, threading, time
+
+__all__ = ["Dispatcher", "JournalMismatch"]
+
+# default number of seconds after which a work item is requeued if its worker has not sent a heartbeat
+DEFAULT_LEASE_TIMEOUT = 60.0
+
+
+class JournalMismatch(Exception):
+    pass
+
+
+def format_duration(seconds):
+    return str(datetime.timedelta(seconds=int(seconds)))
+
+
+class Dispatcher(object):
+    """
+    Hand out work items (coeff,weight) to workers and collect the weight multiplicities.
+
+    Work items are leased to workers. A lease expires if the worker does not send a
+    heartbeat within lease_timeout seconds, in which case the item is handed out again.
+    Results are keyed by the index of the work item, so duplicate results (from requeued
+    items) are harmless. If a journal path is given, each result is appended to it, and
+    results already present in the journal are not handed out again.
+
+    If the predicted costs of the work items are given, the most expensive items are handed
+    out first, so that no long computation is started at the very end.
+    """
+
+    def __init__(
+        self,
+        items,
+        lease_timeout=DEFAULT_LEASE_TIMEOUT,
+        journal=None,
+        header=None,
+        costs=None,
+    ):
+        self.items = list(items)
+        self.lease_timeout = lease_timeout
+        self.results = {}
+        self.seconds = {}
+        self.completed_by = {}
+        self.leases = {}
+        order = range(len(self.items))
+        if costs is not None:
+            assert len(costs) == len(self.items)
+            order = sorted(order, key=lambda i: costs[i], reverse=True)
+        # queue of work items to hand out, in order (completed items are skipped when they
+        # come up), and set of the work items that are still pending
+        self.queue = collections.deque(order)
+        self.pending = set(order)
+        self.lock = threading.Condition()
+        self.start_time = time.time()
+        self.num_resumed = 0
+
+        # resume from journal?
+        self.journal = None
+        if journal:
+            self.read_journal(journal, header)
+            self.journal = open(journal, "a")
+            if os.path.getsize(journal) == 0:
+                self.journal.write(json.dumps({"header": header}) + "\n")
+                self.journal.flush()
+
+    def read_journal(self, path, header):
+        if not os.path.exists(path):
+            return
+        with open(path, "rb+") as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # the master was interrupted while appending this record, so drop it
+                    # (new records would otherwise be appended to the fragment)
+                    logging.warning(
+                        "Dropping incomplete last line of journal %s: %r", path, line
+                    )
+                    f.truncate(offset)
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "header" in record:
+                    if record["header"] != header:
+                        raise JournalMismatch(
+                            "Journal %s was written for %s." % (path, record["header"])
+                        )
+                    continue
+                index = record["index"]
+                if not 0 <= index < len(self.items):
+                    raise JournalMismatch(
+                        "Journal %s has no work item %d." % (path, index)
+                    )
+                _, weight = self.items[index]
+                if list(map(int, weight)) != record["weight"]:
+                    raise JournalMismatch(
+                        "Journal %s does not match work item %d." % (path, index)
+                    )
+                self.results[index] = record["value"]
+        self.pending.difference_update(self.results)
+        self.num_resumed = len(self.results)
+        logging.info("Resumed %d results from journal %s.", self.num_resumed, path)
+
+    def complete_cached(self, index, weight_mul):
+        """
+        Record result that is already known (e.g., from a cache) before dispatching.
+        """
+        with self.lock:
+            self.results[index] = weight_mul
+            self.pending.discard(index)
+            self.num_resumed += 1
+
+    def lease(self, worker):
+        """
+        Lease next work item to the given worker and return (index,total,coeff,weight),
+        or None if no work item is currently available.
+        """
+        items = self.lease_many(worker, 1)
+        return items[0] if items else None
+
+    def lease_many(self, worker, n):
+        """
+        Lease up to n work items to the given worker and return list of (index,total,coeff,weight)'s.
+        """
+        with self.lock:
+            self.expire()
+            items = []
+            while self.queue and len(items) < n:
+                index = self.queue.popleft()
+                if index not in self.pending:
+                    continue
+                self.pending.remove(index)
+                self.leases[index] = (worker, time.time() + self.lease_timeout)
+                coeff, weight = self.items[index]
+                items.append(
+                    (index, len(self.items), coeff, tuple(int(x) for x in weight))
+                )
+            return items
+
+    def heartbeat(self, worker):
+        """
+        Renew all leases held by the given worker.
+        """
+        with self.lock:
+            deadline = time.time() + self.lease_timeout
+            for index, (owner, _) in self.leases.items():
+                if owner == worker:
+                    self.leases[index] = (worker, deadline)
+
+    def complete(self, worker, index, weight_mul, seconds=None):
+        """
+        Record weight multiplicity computed for the given work item (and how long it took).
+        """
+        self.complete_many(worker, [(index, weight_mul, seconds)])
+
+    def complete_many(self, worker, results):
+        """
+        Record list of (index,weight_mul,seconds)'s computed by the given worker.
+        """
+        with self.lock:
+            for index, weight_mul, seconds in results:
+                self.leases.pop(index, None)
+                if index in self.results:
+                    continue
+                self.results[index] = weight_mul
+                self.completed_by[index] = worker
+                if seconds is not None:
+                    self.seconds[index] = seconds
+                self.pending.discard(index)
+                if self.journal:
+                    _, weight = self.items[index]
+                    record = {
+                        "index": index,
+                        "weight": list(map(int, weight)),
+                        "value": weight_mul,
+                    }
+                    self.journal.write(json.dumps(record) + "\n")
+            if self.journal:
+                self.journal.flush()
+            self.lock.notify_all()
+
+    def expire(self):
+        """
+        Requeue work items whose lease has expired.
+        """
+        with self.lock:
+            now = time.time()
+            for index, (worker, deadline) in list(self.leases.items()):
+                if deadline < now:
+                    logging.info(
+                        "Lease of work item %d by %s expired, requeuing.",
+                        index + 1,
+                        worker,
+                    )
+                    del self.leases[index]
+                    self.queue.appendleft(index)
+                    self.pending.add(index)
+
+    def finished(self):
+        with self.lock:
+            return len(self.results) == len(self.items)
+
+    def wait(self, timeout):
+        """
+        Wait until all work items have been processed or the timeout has passed, and return
+        whether all work items have been processed.
+        """
+        with self.lock:
+            self.lock.wait_for(self.finished, timeout)
+            self.expire()
+            return self.finished()
+
+    def progress(self):
+        """
+        Return a line describing the progress, including an estimate of the remaining time.
+        """
+        with self.lock:
+            total = len(self.items)
+            done = len(self.results)
+            computed = done - self.num_resumed
+            elapsed = time.time() - self.start_time
+            if computed and done < total:
+                eta = format_duration(elapsed / computed * (total - done))
+            else:
+                eta = "n/a"
+            return "%d/%d done (%.1f%%), %d leased, %d pending, elapsed %s, ETA %s" % (
+                done,
+                total,
+                100.0 * done / total if total else 100.0,
+                len(self.leases),
+                len(self.pending),
+                format_duration(elapsed),
+                eta,
+            )
+
+    def total(self):
+        """
+        Return the sum of coeff * weight_mul over all work items.
+        """
+        with self.lock:
+            return sum(
+                coeff * self.results[i] for i, (coeff, _) in enumerate(self.items)
+            )
+
+    def close(self):
+        if self.journal:
+            self.journal.close()
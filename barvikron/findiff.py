@@ -1,7 +1,8 @@
 from collections import defaultdict
+import itertools
 import numpy as np
 
-__all__ = ["finite_differences"]
+__all__ = ["finite_differences", "weyl_finite_differences"]
 
 
 def finite_differences(positive_roots):
@@ -26,3 +27,43 @@ def finite_differences(positive_roots):
         for shift, coeff in d.items()
         if coeff != 0
     ]
+
+
+def permutation_sign(perm):
+    """
+    Return the sign of a permutation, given as a tuple of the integers 0, ..., n-1.
+    """
+    inversions = sum(
+        1 for i, j in itertools.combinations(range(len(perm)), 2) if perm[i] > perm[j]
+    )
+    return -1 if inversions % 2 else 1
+
+
+def weyl_finite_differences(dims):
+    """
+    Lazily expand the finite difference formula for the positive roots of
+    GL(dims[1]) x ... x GL(dims[n]) using the Weyl denominator formula
+      prod_alpha (1 - e^alpha) = sum_w sign(w) e^(rho - w rho),
+    yielding (coeff,shift)'s with shift a tuple of integers. All shifts are distinct,
+    and only O(sum(dims[i]!)) memory is used.
+    """
+    # expansion for each factor
+    factors = []
+    for dim in dims:
+        rho = list(range(dim - 1, -1, -1))
+        factors.append(
+            [
+                (
+                    permutation_sign(perm),
+                    tuple(rho[i] - rho[perm[i]] for i in range(dim)),
+                )
+                for perm in itertools.permutations(range(dim))
+            ]
+        )
+
+    # expand product
+    for terms in itertools.product(*factors):
+        coeff = 1
+        for sign, _ in terms:
+            coeff *= sign
+        yield coeff, sum((shift for _, shift in terms), ())
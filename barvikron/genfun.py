@@ -0,0 +1,77 @@
+import itertools, logging, math
+import numpy as np
+from .findiff import weyl_finite_differences
+from .chartable import integer_partitions
+
+__all__ = ["weight_multiplicity_table", "kronecker_table"]
+
+
+def weight_multiplicity_table(dims, k):
+    """
+    Compute all weight multiplicities of Sym^k(C^prod(dims)) at once by expanding the
+    generating function prod_j 1/(1 - x^(a_j)) over the columns a_j of
+    kronecker_weight_vpn(dims).A, truncated at degree k.
+
+    Since the entries of each block of a weight sum to k, the last entry of each block is
+    dropped: the weight multiplicity of a flattened weight is the entry of the returned
+    array at the remaining entries (which are between 0 and k).
+    """
+    n = math.prod(dims)
+    dtype = np.int64 if math.comb(n + k - 1, k) < 2**63 else object
+    ndim = sum(dims) - len(dims)
+
+    # expand generating function, keeping track of the degree in the first axis
+    G = np.zeros((k + 1,) + (k + 1,) * ndim, dtype=dtype)
+    G[(0,) * (ndim + 1)] = 1
+    offsets = np.cumsum([0] + [dim - 1 for dim in dims])
+    for midx in itertools.product(*map(range, dims)):
+        # the column for midx increments the midx[i]-th entry of the i-th block
+        axes = [offsets[i] + j for i, j in enumerate(midx) if j < dims[i] - 1]
+        dst = tuple(
+            slice(1, None) if axis in axes else slice(None) for axis in range(ndim)
+        )
+        src = tuple(
+            slice(None, -1) if axis in axes else slice(None) for axis in range(ndim)
+        )
+        # divide by 1 - x^(a_j), in order of increasing degree
+        for t in range(1, k + 1):
+            G[t][dst] += G[t - 1][src]
+    return G[k]
+
+
+def kronecker_table(dims, k):
+    """
+    Compute the Kronecker coefficients g(lambda_1,...,lambda_n) of all tuples of partitions
+    of k, where lambda_i has at most dims[i] rows, from a single weight_multiplicity_table
+    using the finite difference formula. Return dictionary mapping tuples of partitions
+    (padded with zeros to length dims[i]) to Kronecker coefficients.
+    """
+    table = weight_multiplicity_table(dims, k)
+    findiff = list(weyl_finite_differences(dims))
+    coeffs = np.array([coeff for coeff, _ in findiff], dtype=object)
+    shifts = np.array([list(map(int, shift)) for _, shift in findiff], dtype=np.int64)
+
+    # indices of the entries that are kept in the table
+    offsets = np.cumsum([0] + list(dims))
+    kept = [offsets[i] + j for i, dim in enumerate(dims) for j in range(dim - 1)]
+
+    partitions = [
+        [
+            tuple(p) + (0,) * (dim - len(p))
+            for p in integer_partitions(k)
+            if len(p) <= dim
+        ]
+        for dim in dims
+    ]
+    logging.info(
+        "Computing %d Kronecker coefficients from %d weight multiplicities.",
+        math.prod(map(len, partitions)),
+        table.size,
+    )
+    result = {}
+    for ps in itertools.product(*partitions):
+        weights = np.array(sum(ps, ()), dtype=np.int64) + shifts
+        valid = (weights >= 0).all(axis=1)
+        indices = tuple(weights[valid][:, kept].T)
+        result[ps] = int(table[indices].astype(object).dot(coeffs[valid]))
+    return result
@@ -0,0 +1,85 @@
+import threading
+from . import EvaluatorBase
+from .tracing import span
+
+try:
+    import islpy
+except ImportError:
+    islpy = None
+
+__all__ = ["IslEvaluator", "isl_available"]
+
+
+def isl_available():
+    """
+    Check whether islpy is installed with barvinok support (needed for counting).
+    """
+    return islpy is not None and hasattr(islpy.Set, "card")
+
+
+def prepare_parametric_set(M):
+    """
+    Prepare set { y : M * y + c >= 0 }, parametrized by c, in isl's syntax.
+    """
+    params = ", ".join("c%d" % i for i in range(len(M)))
+    variables = ", ".join("y%d" % j for j in range(len(M[0])))
+    constraints = []
+    for i, row in enumerate(M):
+        lhs = "c%d" % i
+        for j, m in enumerate(row):
+            if m:
+                lhs += " %s %d*y%d" % ("+" if m > 0 else "-", abs(m), j)
+        constraints.append(lhs + " >= 0")
+    return "[%s] -> { [%s] : %s }" % (params, variables, " and ".join(constraints))
+
+
+class IslEvaluator(EvaluatorBase):
+    """
+    Evaluate vector partition functions in-process using the isl/barvinok Python bindings
+    (islpy built with barvinok support, see https://documen.tician.de/islpy/).
+
+    The polytope of each vector partition function is built once, parametrized by the
+    right-hand side of its reduced system (see ReducedSystem). Each evaluation then fixes
+    the parameters and counts the lattice points, without starting any processes. isl
+    contexts must not be used concurrently, so each thread has its own context (and
+    polytopes), and evaluations in different threads run in parallel.
+    """
+
+    def __init__(self):
+        assert isl_available(), "islpy with barvinok support not found."
+        self.local = threading.local()
+
+    def parametric_set(self, vpn):
+        local = self.local
+        if not hasattr(local, "ctx"):
+            local.ctx = islpy.Context()
+            local.sets = {}
+        key = tuple(map(tuple, vpn.A.tolist()))
+        if key not in local.sets:
+            text = prepare_parametric_set(vpn.reduced.U2)
+            local.sets[key] = islpy.Set.read_from_str(local.ctx, text)
+        return local.sets[key]
+
+    def eval(self, vpn, b):
+        with span("prepare"):
+            count = vpn.reduced.trivial_count(b)
+            if count is not None:
+                return count
+            _, c = vpn.reduced.inequalities(b)
+
+        with span("solve"):
+            polytope = self.parametric_set(vpn)
+            for i, c_i in enumerate(c):
+                value = islpy.Val.read_from_str(polytope.get_ctx(), str(c_i))
+                polytope = polytope.fix_val(islpy.dim_type.param, i, value)
+            polytope = polytope.project_out(islpy.dim_type.param, 0, len(c))
+            card = polytope.card()
+            point = islpy.Point.zero(card.get_domain_space())
+            return int(card.eval(point).to_python())
+
+    def close(self):
+        # contexts of other threads are released with their threads
+        self.local = threading.local()
+
+    def __str__(self):
+        return "isl"
@@ -1,13 +1,27 @@
-import itertools, logging
+import itertools, logging, math
+from collections import defaultdict
 import numpy as np
-from . import VectorPartitionFunction, finite_differences
+from . import VectorPartitionFunction, weyl_finite_differences, CostModel, annotate
+from .tworow import is_two_row, two_row_kronecker
+from .chartable import MAX_CHARACTER_SIZE, character_kronecker
+from .normalize import check_partitions, normalize_partitions, normalize_weight
 
 __all__ = [
     "kronecker_weight_vpn",
     "flatten_weight",
     "kronecker_weight_multiplicity",
     "positive_roots",
+    "canonical_weight",
+    "collapse_terms",
+    "trivial_weight_multiplicity",
+    "prune_terms",
+    "kronecker_vanishes",
+    "kronecker_shortcut",
+    "prepare_kronecker",
+    "finite_difference_terms",
+    "kronecker_terms",
     "kronecker",
+    "kronecker_async",
 ]
 
 
@@ -29,7 +43,9 @@ def kronecker_weight_vpn(dims):
         As.append(A)
     A = np.row_stack(As)
 
-    return VectorPartitionFunction(A)
+    vpn = VectorPartitionFunction(A)
+    vpn.dims = list(dims)
+    return vpn
 
 
 def flatten_weight(omega):
@@ -46,8 +62,15 @@ def flatten_weight(omega):
 
 def kronecker_weight_multiplicity(omega, evaluator):
     """
-    Compute weight multiplicity in Sym(C^prod(dims)) for given weight.
+    Compute weight multiplicity in Sym(C^prod(dims)) for given weight (after reducing it
+    to the smallest dims, see normalize_weight).
     """
+    weight_mul = trivial_weight_multiplicity(
+        list(map(len, omega)), flatten_weight(omega)
+    )
+    if weight_mul is not None:
+        return weight_mul
+    omega = normalize_weight(omega)
     dims = list(map(len, omega))
     weight = flatten_weight(omega)
     return kronecker_weight_vpn(dims).eval(weight, evaluator)
@@ -68,41 +91,209 @@ def positive_roots(dims):
     return roots
 
 
-def kronecker(partitions, evaluator):
+def canonical_weight(dims, weight):
     """
-    Compute Kronecker coefficient for given highest weight.
+    Return canonical representative of a flattened weight, whose weight multiplicity is the same.
+
+    Weight multiplicities are invariant under permuting the entries of each GL(dims[i]) block,
+    as well as under permuting blocks of equal dimension. The representative has the entries
+    of each block sorted in decreasing order, and the blocks of each dimension sorted in
+    decreasing lexicographic order.
     """
-    # create partition function
-    dims = list(map(len, partitions))
-    vpn = kronecker_weight_vpn(dims)
+    offsets = np.cumsum([0] + list(dims))
+    blocks = [
+        tuple(sorted(map(int, weight[offsets[k] : offsets[k + 1]]), reverse=True))
+        for k in range(len(dims))
+    ]
+
+    # sort blocks of equal dimension among themselves
+    for dim in set(dims):
+        positions = [k for k, d in enumerate(dims) if d == dim]
+        for k, block in zip(
+            positions, sorted((blocks[k] for k in positions), reverse=True)
+        ):
+            blocks[k] = block
+
+    return sum(blocks, ())
+
+
+def collapse_terms(dims, highest_weight, findiff):
+    """
+    Collect the terms coeff * translate(shift) of a finite difference formula according to
+    the canonical representative of highest_weight + shift and return the list of
+    (coeff,weight)'s with nonzero coefficients. The terms are consumed lazily, so findiff
+    can be a generator.
+    """
+    d = defaultdict(int)
+    for coeff, shift in findiff:
+        weight = [int(x) + int(y) for x, y in zip(highest_weight, shift)]
+        d[canonical_weight(dims, weight)] += coeff
+
+    return [
+        (coeff, np.array(weight, dtype=object))
+        for weight, coeff in d.items()
+        if coeff != 0
+    ]
+
+
+def trivial_weight_multiplicity(dims, weight):
+    """
+    Return the weight multiplicity of a flattened weight if it can be read off without
+    evaluating the partition function, otherwise None.
+
+    The weight multiplicity counts arrays x >= 0 of shape dims whose margins are the blocks
+    of the weight. It is zero if some entry is negative or the blocks have different sums.
+    A block with a single nonzero entry (e.g., a GL(1) factor, or a block of sum zero)
+    forces x to vanish outside one slice, so it can be dropped. If at most one block
+    remains, x is uniquely determined by its margin.
+    """
+    if any(x < 0 for x in weight):
+        return 0
+    offsets = np.cumsum([0] + list(dims))
+    blocks = [weight[offsets[k] : offsets[k + 1]] for k in range(len(dims))]
+    if len(set(map(sum, blocks))) > 1:
+        return 0
+    if sum(1 for block in blocks if sum(1 for x in block if x) > 1) <= 1:
+        return 1
+    return None
 
-    # compute highest weight and finite-difference formula
+
+def prune_terms(dims, terms):
+    """
+    Split list of (coeff,weight)'s into the sum of coeff * weight multiplicity over the terms
+    whose weight multiplicity is trivial, and the list of remaining terms.
+    """
+    g = 0
+    remaining = []
+    for coeff, weight in terms:
+        weight_mul = trivial_weight_multiplicity(dims, weight)
+        if weight_mul is None:
+            remaining.append((coeff, weight))
+        else:
+            g += coeff * weight_mul
+    logging.info(
+        "Skipped %d of %d weight multiplicities that can be read off directly.",
+        len(terms) - len(remaining),
+        len(terms),
+    )
+    return g, remaining
+
+
+def kronecker_vanishes(partitions):
+    """
+    Check cheap necessary conditions for the Kronecker coefficient to be nonzero and return
+    True if one of them is violated: all partitions should have the same size, and the
+    length of each partition should be at most the product of the lengths of the others.
+    """
+    if len(set(map(sum, partitions))) > 1:
+        return True
+    lengths = [sum(1 for x in p if x) for p in partitions]
+    return any(
+        length > math.prod(lengths[:k] + lengths[k + 1 :])
+        for k, length in enumerate(lengths)
+    )
+
+
+def kronecker_shortcut(partitions):
+    """
+    Return Kronecker coefficient if it can be computed without evaluating partition
+    functions, i.e., in closed form for two rows (see two_row_kronecker) or from the
+    characters of the symmetric group for few boxes (see character_kronecker), and None
+    otherwise. Assumes that kronecker_vanishes is False.
+    """
+    check_partitions(partitions)
+    if len(partitions) <= 2:
+        # g(lambda,mu) = 1 iff lambda = mu (irreps of S_n are self-dual), g(lambda) = 1 iff
+        # lambda = (n)
+        stripped = [[x for x in p if x] for p in partitions]
+        if len(stripped) == 2:
+            return int(stripped[0] == stripped[1])
+        return int(not stripped or len(stripped[0]) <= 1)
+    if is_two_row(partitions):
+        return two_row_kronecker(partitions)
+    if sum(partitions[0]) <= MAX_CHARACTER_SIZE:
+        return character_kronecker(partitions)
+    return None
+
+
+def prepare_kronecker(partitions, shortcuts=True):
+    """
+    Check partitions (see check_partitions) and reduce them to the cheapest equivalent ones
+    (see normalize_partitions). Return (g,partitions), where g is the Kronecker coefficient
+    if it is known without evaluating partition functions, i.e., if it vanishes for trivial
+    reasons (see kronecker_vanishes), if all partitions are dropped by normalization, or,
+    unless shortcuts is False, if kronecker_shortcut applies, and None otherwise.
+    """
+    check_partitions(partitions)
+    if kronecker_vanishes(partitions):
+        logging.info("Kronecker coefficient vanishes for trivial reasons.")
+        return 0, partitions
+    partitions = normalize_partitions(partitions)
+    if not partitions:
+        return 1, partitions
+    return (kronecker_shortcut(partitions) if shortcuts else None), partitions
+
+
+def finite_difference_terms(partitions, findiff=None):
+    """
+    Return an integer g0 and list of (coeff,weight)'s such that the Kronecker coefficient
+    for given highest weight is g0 plus the sum of coeff times the weight multiplicity of
+    weight (see collapse_terms and prune_terms). The finite-difference formula
+    weyl_finite_differences(dims) can be passed as findiff, so that it is computed once.
+    """
+    dims = list(map(len, partitions))
     highest_weight = flatten_weight(partitions)
-    proots = positive_roots(dims)
     assert all(
-        highest_weight.dot(pr) >= 0 for pr in proots
+        highest_weight.dot(pr) >= 0 for pr in positive_roots(dims)
     ), "Highest weight should be dominant."
-    findiff = finite_differences(proots)
+    if findiff is None:
+        findiff = weyl_finite_differences(dims)
+    return prune_terms(dims, collapse_terms(dims, highest_weight, findiff))
+
+
+def kronecker_terms(partitions):
+    """
+    Return partition function vpn, list of (coeff,weight)'s and an integer g0 such that the
+    Kronecker coefficient for given highest weight is g0 plus the sum of coeff * vpn(weight).
+    Weight multiplicities that are trivial are accounted for in g0.
+    """
+    dims = list(map(len, partitions))
+    vpn = kronecker_weight_vpn(dims)
+    g0, terms = finite_difference_terms(partitions)
 
-    # compute finite-difference formula coefficients
-    total = len(findiff)
     logging.info(
-        "About to compute %d weight multiplicities using a partition function of size %s.",
-        total,
+        "About to compute %d weight multiplicities (%d before symmetry reduction) using a partition function of size %s.",
+        len(terms),
+        math.prod(map(math.factorial, dims)),
         vpn.A.shape,
     )
+    return vpn, terms, g0
 
-    g = 0
-    for i, (coeff, shift) in enumerate(findiff):
+
+def kronecker(partitions, evaluator, shortcuts=True):
+    """
+    Compute Kronecker coefficient for given highest weight, after reducing it to the
+    cheapest equivalent one (see normalize_partitions). Unless shortcuts is False,
+    coefficients that can be computed without partition functions are computed directly
+    (see prepare_kronecker).
+    """
+    g, partitions = prepare_kronecker(partitions, shortcuts)
+    if g is not None:
+        return g
+    vpn, terms, g = kronecker_terms(partitions)
+
+    # compute finite-difference formula coefficients
+    total = len(terms)
+    for i, (coeff, weight) in enumerate(terms):
         # compute next weight multiplicity
-        weight = highest_weight + shift
         logging.info(
             "(%3d/%3d)   About to compute the weight multiplicity of %s...",
             i + 1,
             total,
             weight,
         )
-        weight_mul = vpn.eval(weight, evaluator)
+        with annotate(dims=list(map(len, partitions)), index=i):
+            weight_mul = vpn.eval(weight, evaluator)
         logging.info(
             "(%3d/%3d)   => weight multiplicity = %d (coeff = %d).",
             i + 1,
@@ -115,3 +306,40 @@ def kronecker(partitions, evaluator):
         g += coeff * weight_mul
 
     return g
+
+
+async def kronecker_async(
+    partitions, evaluator, jobs=1, cost_model=None, shortcuts=True
+):
+    """
+    Compute Kronecker coefficient for given highest weight (normalized as in kronecker),
+    evaluating up to jobs weight multiplicities concurrently. The weight multiplicities that
+    the cost model predicts to be most expensive are started first.
+    """
+    g, partitions = prepare_kronecker(partitions, shortcuts)
+    if g is not None:
+        return g
+    vpn, terms, g = kronecker_terms(partitions)
+    (cost_model or CostModel()).sort(list(map(len, partitions)), terms)
+
+    # compute finite-difference formula coefficients as they become available
+    total = len(terms)
+    done = 0
+    weights = [weight for _, weight in terms]
+    with annotate(dims=list(map(len, partitions))):
+        async for i, weight_mul in evaluator.eval_many(vpn, weights, jobs):
+            coeff, weight = terms[i]
+            done += 1
+            logging.info(
+                "(%3d/%3d)   => weight multiplicity of %s = %d (coeff = %d).",
+                done,
+                total,
+                weight,
+                weight_mul,
+                coeff,
+            )
+
+            # and add appropriately
+            g += coeff * weight_mul
+
+    return g
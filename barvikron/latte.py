@@ -1,71 +1,124 @@
-import os, re, subprocess, tempfile
-from . import EvaluatorBase
+import asyncio, os, re, signal, subprocess
+from . import EvaluatorBase, Workspaces
+from .parfun import run_async
+from .tracing import span, record
 
 __all__ = ["LatteEvaluator"]
 
+# name of the input file in the scratch directory
+INPUT_FILENAME = "query.latte"
 
-def prepare_input(A, b):
+
+def prepare_input(M, c):
     """
-    Prepare vector partition function query in the format expected by LattE's count tool.
+    Prepare query for counting the lattice points in { y : M * y + c >= 0 } in the format
+    expected by LattE's count tool.
     """
-    nrows, ncols = A.shape
+    nrows, ncols = len(M), len(M[0])
     s = "%s %s\n" % (nrows, ncols + 1)
 
-    def integers(n):
-        return " ".join(str(i) for i in range(1, n + 1))
+    # c[i] + M[i] * y >= 0
+    for row, c_i in zip(M, c):
+        s += "%s   %s\n" % (c_i, " ".join(map(str, row)))
+    return s
 
-    # A[i] * x - b[i] = 0
-    for i, row in enumerate(A):
-        s += "%s   %s\n" % (-b[i], " ".join(map(str, row)))
-    s += "linearity     %s   %s\n" % (nrows, integers(nrows))
 
-    # x[i] >= 0
-    s += "nonnegative   %s   %s\n" % (ncols, integers(ncols))
-    return s
+def parse_output(returncode, output):
+    """
+    Parse output of LattE's count tool.
+    """
+    # more recent versions of LattE signal an error...
+    if b"Empty polytope or unbounded polytope" in output:
+        return 0
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, "count", output)
+
+    output = output.decode("ascii")
+    match = re.search(r"number of lattice points(?: is)?(?::)? (\d+)", output)
+    if not match:
+        raise Exception("Could not parse LattE output: %s" % output)
+    return int(match.group(1))
 
 
 class LatteEvaluator(EvaluatorBase):
     """
     Evaluate vector partition functions at given point using LattE's count tool (https://www.math.ucdavis.edu/~latte/).
+
+    Each run of count gets a private scratch directory (see Workspaces), since LattE
+    writes intermediate files with fixed names into its working directory. If a timeout
+    (in seconds) is given, count is killed when it runs for longer and TimeoutExpired is raised.
     """
 
-    def __init__(self, path):
+    def __init__(self, path, scratch=None, timeout=None):
         assert os.path.isfile(path), (
             '"%s" not found (should be path to LattE\'s count binary)' % path
         )
         self.path = path
+        self.timeout = timeout
+        self.workspaces = Workspaces(scratch, prefix="barvikron-latte-")
 
     def eval(self, vpn, b):
-        # save input in temporary file
-        handle, input_path = tempfile.mkstemp(".in", "kronecker-latte-")
-        try:
-            os.write(handle, prepare_input(vpn.A, b).encode("ascii"))
-            os.close(handle)
+        count = vpn.reduced.trivial_count(b)
+        if count is not None:
+            return count
+        with self.workspaces.acquire() as cwd:
+            # save input in scratch directory
+            with span("prepare"):
+                text = prepare_input(*vpn.reduced.inequalities(b))
+                with open(os.path.join(cwd, INPUT_FILENAME), "w") as f:
+                    f.write(text)
 
-            # run count
-            try:
-                output = subprocess.check_output(
-                    [self.path, input_path],
+            # run count (in its own process group, so that it can be killed with its children)
+            with span("spawn"):
+                popen = subprocess.Popen(
+                    [self.path, INPUT_FILENAME],
+                    stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
-                    cwd=os.path.dirname(input_path),
-                    # encoding="ascii",
+                    cwd=cwd,
+                    start_new_session=True,
                 )
-            except subprocess.CalledProcessError as err:
-                # more recent versions of LattE signal an error...
-                if b"Empty polytope or unbounded polytope" in err.output:
-                    return 0
+            try:
+                with span("solve"):
+                    output, _ = popen.communicate(timeout=self.timeout)
+            except BaseException:
+                try:
+                    os.killpg(popen.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                popen.communicate()
                 raise
+            record(bytes_in=len(text), bytes_out=len(output))
 
             # parse output
-            if b"Empty polytope or unbounded polytope" in output:
-                return 0
-            output = output.decode("ascii")
-            match = re.search(r"number of lattice points(?: is)?(?::)? (\d+)", output)
-            if not match:
-                raise Exception("Could not parse LattE output: %s" % output)
-            return int(match.group(1))
-        finally:
-            os.remove(input_path)
+            with span("parse"):
+                return parse_output(popen.returncode, output)
+
+    async def eval_async(self, vpn, b):
+        count = vpn.reduced.trivial_count(b)
+        if count is not None:
+            return count
+        with self.workspaces.acquire() as cwd:
+            # save input in scratch directory
+            with span("prepare"):
+                text = prepare_input(*vpn.reduced.inequalities(b))
+                with open(os.path.join(cwd, INPUT_FILENAME), "w") as f:
+                    f.write(text)
+            record(bytes_in=len(text))
+
+            # run count
+            try:
+                returncode, output = await asyncio.wait_for(
+                    run_async([self.path, INPUT_FILENAME], cwd=cwd), self.timeout
+                )
+            except asyncio.TimeoutError:
+                raise subprocess.TimeoutExpired(self.path, self.timeout)
+
+            # parse output
+            with span("parse"):
+                return parse_output(returncode, output)
+
+    def close(self):
+        self.workspaces.close()
 
     def __str__(self):
         return "latte[%s]" % self.path
@@ -0,0 +1,146 @@
+import asyncio, contextvars, functools, logging, threading
+from . import EvaluatorBase
+from .tracing import span, record
+
+__all__ = ["NativeEvaluator", "count_solutions", "BudgetExceeded"]
+
+# default number of steps after which NativeEvaluator gives up in favor of its fallback
+# (roughly the time it takes to start an external binary)
+DEFAULT_MAX_STEPS = 20000
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def prepare_columns(A):
+    """
+    Return the nonzero entries of the columns of A, as lists of (row,entry)'s, together with
+    the entries of each column whose row has its last nonzero entry in that column.
+    """
+    nrows, ncols = A.shape
+    columns = [
+        [(i, int(A[i, j])) for i in range(nrows) if A[i, j] != 0] for j in range(ncols)
+    ]
+    if any(a < 0 for column in columns for _, a in column) or not all(columns):
+        raise ValueError(
+            "Only matrices with nonnegative entries and no zero columns are supported."
+        )
+
+    last = {}
+    for j, column in enumerate(columns):
+        for i, _ in column:
+            last[i] = j
+    forced = [
+        [(i, a) for i, a in column if last[i] == j] for j, column in enumerate(columns)
+    ]
+    return columns, forced
+
+
+def count_solutions(A, b, max_steps=None, stop=None):
+    """
+    Count #{ x >= 0 : A * x = b } for a matrix A with nonnegative entries, using exact
+    integer arithmetic.
+
+    The variables are enumerated column by column, memoizing the counts for each remaining
+    right-hand side (sub-margin). A variable whose column is the last one involving some row
+    is determined by that row, so it is not enumerated. If more than max_steps sub-margins
+    need to be visited, or if the threading.Event stop is set, BudgetExceeded is raised.
+    """
+    nrows, ncols = A.shape
+    assert len(b) == nrows
+    columns, forced = prepare_columns(A)
+    b = tuple(int(x) for x in b)
+    if any(x < 0 for x in b):
+        return 0
+    if any(b[i] != 0 for i in range(nrows) if not any(A[i])):
+        return 0
+
+    memo = {}
+
+    def count(j, residual):
+        if j == ncols:
+            return 1
+        key = (j, residual)
+        if key in memo:
+            return memo[key]
+        if max_steps is not None and len(memo) >= max_steps:
+            raise BudgetExceeded
+        if stop is not None and stop.is_set():
+            raise BudgetExceeded
+
+        column = columns[j]
+        if forced[j]:
+            i, a = forced[j][0]
+            x, r = divmod(residual[i], a)
+            candidates = [x] if r == 0 else []
+        else:
+            candidates = range(min(residual[i] // a for i, a in column) + 1)
+
+        total = 0
+        for x in candidates:
+            next_residual = list(residual)
+            for i, a in column:
+                next_residual[i] -= a * x
+            if all(next_residual[i] >= 0 for i, _ in column) and all(
+                next_residual[i] == 0 for i, _ in forced[j]
+            ):
+                total += count(j + 1, tuple(next_residual))
+
+        memo[key] = total
+        return total
+
+    return count(0, b)
+
+
+class NativeEvaluator(EvaluatorBase):
+    """
+    Evaluate vector partition functions in-process, using a memoized dynamic program.
+
+    This is only efficient for small right-hand sides. If a fallback evaluator is given,
+    the dynamic program is abandoned after max_steps steps and the query is delegated to it.
+    """
+
+    def __init__(self, fallback=None, max_steps=DEFAULT_MAX_STEPS):
+        self.fallback = fallback
+        self.max_steps = max_steps
+
+    def count(self, vpn, b, stop=None):
+        with span("native"):
+            return count_solutions(
+                vpn.A, b, self.max_steps if self.fallback else None, stop
+            )
+
+    def eval(self, vpn, b):
+        try:
+            return self.count(vpn, b)
+        except BudgetExceeded:
+            logging.debug("Too expensive, delegating to %s.", self.fallback)
+            record(fallback=True)
+            return self.fallback.eval(vpn, b)
+
+    async def eval_async(self, vpn, b):
+        # run the dynamic program in a worker thread, which stops at its next step once the
+        # evaluation is cancelled (e.g., when it loses a race)
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        run = functools.partial(
+            contextvars.copy_context().run, self.count, vpn, b, stop
+        )
+        try:
+            return await loop.run_in_executor(None, run)
+        except BudgetExceeded:
+            logging.debug("Too expensive, delegating to %s.", self.fallback)
+            record(fallback=True)
+            return await self.fallback.eval_async(vpn, b)
+        finally:
+            stop.set()
+
+    def close(self):
+        if self.fallback:
+            self.fallback.close()
+
+    def __str__(self):
+        if self.fallback:
+            return "native[fallback=%s]" % self.fallback
+        return "native"
@@ -0,0 +1,88 @@
+import itertools, logging, math
+
+__all__ = [
+    "check_partitions",
+    "conjugate_partition",
+    "normalize_partitions",
+    "normalize_weight",
+]
+
+
+def check_partitions(partitions):
+    """
+    Check that partitions are weakly decreasing sequences of nonnegative integers, all with
+    the same number of boxes.
+    """
+    for p in partitions:
+        assert all(x >= 0 for x in p), "Partitions should be nonnegative."
+        assert all(
+            x >= y for x, y in zip(p, p[1:])
+        ), "Partitions should be weakly decreasing (highest weight should be dominant)."
+    assert (
+        len(set(map(sum, partitions))) <= 1
+    ), "All partitions should have the same number of boxes."
+
+
+def conjugate_partition(partition):
+    """
+    Return conjugate (transposed) partition.
+    """
+    parts = [int(x) for x in partition if x]
+    return [sum(1 for x in parts if x > i) for i in range(parts[0] if parts else 0)]
+
+
+def problem_size(dims):
+    # the partition function has prod(dims) columns and the finite difference formula
+    # up to prod(dims[i]!) terms
+    return math.prod(dims), sum(dims), len(dims)
+
+
+def normalize_partitions(partitions):
+    """
+    Return list of partitions with the same Kronecker coefficient as the given ones (see
+    check_partitions), which is cheapest to compute. It is obtained by
+
+      - stripping zero rows, which do not change the Kronecker coefficient,
+      - conjugating an even number of partitions, using g(..., lambda', mu', ...) = g(...,
+        lambda, mu, ...), if this shortens them,
+      - dropping one-row partitions (n), which label the trivial representation of S_n,
+      - and sorting the partitions (by decreasing length).
+
+    If all partitions are dropped, the empty list is returned (the Kronecker coefficient
+    is then one).
+    """
+    stripped = [[int(x) for x in p if x] for p in partitions]
+
+    # choose partitions to conjugate by their lengths (the length of the conjugate is the
+    # first row), so that long rows are never expanded
+    lengths = [(len(p), p[0] if p else 0) for p in stripped]
+    best, best_size = (), None
+    for k in range(0, len(stripped) + 1, 2):
+        for conjugated in itertools.combinations(range(len(stripped)), k):
+            dims = [l[i in conjugated] for i, l in enumerate(lengths)]
+            size = problem_size([d for d in dims if d > 1])
+            if best_size is None or size < best_size:
+                best, best_size = conjugated, size
+
+    normalized = [
+        conjugate_partition(p) if i in best else p for i, p in enumerate(stripped)
+    ]
+    normalized = sorted(
+        (p for p in normalized if len(p) > 1), key=lambda p: (len(p), p), reverse=True
+    )
+    if normalized != [list(p) for p in partitions]:
+        logging.info("Normalized %s to %s.", [list(p) for p in partitions], normalized)
+    return normalized
+
+
+def normalize_weight(omega):
+    """
+    Return list of weights with the same weight multiplicity in Sym(C^prod(dims)) as the
+    given product weight, whose blocks should have equal sums. Zero entries are stripped
+    (they force the corresponding slice to vanish), blocks with a single entry are dropped
+    (they do not constrain the other blocks), and the entries of each block as well as the
+    blocks are sorted (weight multiplicities are invariant under such permutations).
+    """
+    blocks = [sorted((int(x) for x in block if x), reverse=True) for block in omega]
+    blocks = [block for block in blocks if len(block) > 1]
+    return sorted(blocks, key=lambda block: (len(block), block), reverse=True)
@@ -1,4 +1,4 @@
-import os
+import asyncio, contextvars, functools, os, signal, subprocess
 import numpy as np
 import whichcraft
 
@@ -6,6 +6,7 @@ __all__ = [
     "VectorPartitionFunction",
     "EvaluatorBase",
     "default_evaluator",
+    "external_evaluator",
     "NoEvaluatorFound",
 ]
 
@@ -21,6 +22,19 @@ class VectorPartitionFunction(object):
 
     def __init__(self, A):
         self.A = np.array(A)
+        self._reduced = None
+
+    @property
+    def reduced(self):
+        """
+        Lower-dimensional description of the polytopes to be counted (see ReducedSystem),
+        computed once and shared by all evaluations.
+        """
+        if self._reduced is None:
+            from .preprocess import reduce_system
+
+            self._reduced = reduce_system(self.A)
+        return self._reduced
 
     def __repr__(self):
         return "<VectorPartitionFunction(%s)>" % self.A
@@ -38,6 +52,71 @@ class EvaluatorBase(object):
     def eval(self, vpn, b):
         raise NotImplementedError
 
+    def close(self):
+        """
+        Release resources held by the evaluator (such as external processes).
+        """
+        pass
+
+    async def eval_async(self, vpn, b):
+        """
+        Evaluate asynchronously. By default, eval is run in a worker thread (in a copy of the
+        current context, so that it can be traced).
+        """
+        loop = asyncio.get_running_loop()
+        run = functools.partial(contextvars.copy_context().run, self.eval, vpn, b)
+        return await loop.run_in_executor(None, run)
+
+    async def eval_many(self, vpn, weights, jobs=1):
+        """
+        Evaluate at each of the given points, running up to jobs evaluations concurrently,
+        and yield (index,value) pairs as soon as the evaluations complete.
+        """
+        semaphore = asyncio.Semaphore(jobs)
+
+        async def eval_one(index, b):
+            async with semaphore:
+                return index, await self.eval_async(vpn, b)
+
+        tasks = [asyncio.ensure_future(eval_one(i, b)) for i, b in enumerate(weights)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def run_async(args, input=None, cwd=None):
+    """
+    Run external program asynchronously and return its exit code and output (stdout and
+    stderr combined). If the calling task is cancelled, the program and its children are killed.
+    """
+    from .tracing import span, record
+
+    with span("spawn"):
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=cwd,
+            start_new_session=True,
+        )
+    try:
+        with span("solve"):
+            stdout, _ = await process.communicate(input)
+        record(bytes_in=len(input or b""), bytes_out=len(stdout))
+    except BaseException:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        # reap the process, so that it does not outlive the event loop
+        await process.wait()
+        raise
+    return process.returncode, stdout
+
 
 class NoEvaluatorFound(Exception):
     pass
@@ -46,17 +125,44 @@ class NoEvaluatorFound(Exception):
 def default_evaluator():
     """
     Find and instantiate best available evaluator.
+
+    Queries are evaluated natively as long as this is cheap, and otherwise delegated to
+    barvinok (preferably in-process using islpy, or a persistent iscc session) or LattE.
+    Raises NoEvaluatorFound if neither is available (since the native evaluator alone is
+    only efficient for small weights, it has to be requested explicitly).
+    """
+    from .native import NativeEvaluator
+
+    return NativeEvaluator(fallback=external_evaluator())
+
+
+def external_evaluator():
+    """
+    Find and instantiate best available evaluator based on barvinok or LattE, i.e., on
+    islpy with barvinok support or on an external binary. Evaluators are created so that
+    they can serve any number of concurrent evaluations.
     """
-    from .barvinok import BarvinokEvaluator
+    from .barvinok import BarvinokEvaluator, IsccEvaluator
+    from .isl import IslEvaluator, isl_available
     from .latte import LatteEvaluator
 
     # first try environment variables
+    if "BARVIKRON_ISCC" in os.environ:
+        return IsccEvaluator(os.environ["BARVIKRON_ISCC"], sessions=None)
     if "BARVIKRON_BARVINOK" in os.environ:
         return BarvinokEvaluator(os.environ["BARVIKRON_BARVINOK"])
     if "BARVIKRON_LATTE" in os.environ:
         return LatteEvaluator(os.environ["BARVIKRON_LATTE"])
 
+    # then try the in-process bindings
+    if isl_available():
+        return IslEvaluator()
+
     # then try to find executables
+    path = whichcraft.which("iscc")
+    if path:
+        return IsccEvaluator(path, sessions=None)
+
     path = whichcraft.which("barvinok_count")
     if path:
         return BarvinokEvaluator(path)
@@ -65,4 +171,6 @@ def default_evaluator():
     if path:
         return LatteEvaluator(path)
 
-    raise NoEvaluatorFound("Cannot find 'barvinok_count' nor LattE's 'count' in path.")
+    raise NoEvaluatorFound(
+        "Cannot find islpy with barvinok support, nor 'iscc', 'barvinok_count' or LattE's 'count' in path."
+    )
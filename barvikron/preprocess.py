@@ -0,0 +1,155 @@
+import logging
+from fractions import Fraction
+import numpy as np
+
+__all__ = ["ReducedSystem", "reduce_system", "independent_rows", "column_hermite_form"]
+
+
+def independent_rows(A):
+    """
+    Return indices of a maximal set of linearly independent rows of A (greedily, in order).
+    """
+    basis = []
+    rows = []
+    for i, row in enumerate(A):
+        # reduce row against the current basis, using exact arithmetic
+        v = [Fraction(int(x)) for x in row]
+        for pivot, u in basis:
+            if v[pivot]:
+                factor = v[pivot] / u[pivot]
+                v = [x - factor * y for x, y in zip(v, u)]
+        pivot = next((j for j, x in enumerate(v) if x), None)
+        if pivot is not None:
+            basis.append((pivot, v))
+            rows.append(i)
+    return rows
+
+
+def extended_gcd(a, b):
+    """
+    Return (g,s,t) such that g = gcd(a,b) = s * a + t * b and g >= 0.
+    """
+    s0, s1, t0, t1 = 1, 0, 0, 1
+    while b:
+        q, a, b = a // b, b, a % b
+        s0, s1 = s1, s0 - q * s1
+        t0, t1 = t1, t0 - q * t1
+    if a < 0:
+        return -a, -s0, -t0
+    return a, s0, t0
+
+
+def column_hermite_form(A):
+    """
+    Return (H,U) for an integer matrix A of full row rank r, where U is unimodular and
+    A * U = [H 0] with H lower triangular with positive diagonal (both as lists of lists).
+    """
+    nrows, ncols = len(A), len(A[0])
+    M = [list(map(int, row)) for row in A]
+    U = [[int(i == j) for j in range(ncols)] for i in range(ncols)]
+
+    def combine(j, k, a, b, c, d):
+        # (column j, column k) <- (a * column j + b * column k, c * column j + d * column k)
+        for X in (M, U):
+            for row in X:
+                row[j], row[k] = a * row[j] + b * row[k], c * row[j] + d * row[k]
+
+    for i in range(nrows):
+        # eliminate entries to the right of the diagonal using unimodular column operations
+        for j in range(i + 1, ncols):
+            if M[i][j]:
+                x, y = M[i][i], M[i][j]
+                g, s, t = extended_gcd(x, y)
+                combine(i, j, s, t, -y // g, x // g)
+        if M[i][i] == 0:
+            raise ValueError("Matrix does not have full row rank.")
+        if M[i][i] < 0:
+            for X in (M, U):
+                for row in X:
+                    row[i] = -row[i]
+    H = [row[:nrows] for row in M]
+    return H, U
+
+
+class ReducedSystem(object):
+    """
+    Lower-dimensional description of the polytopes { x >= 0 : A * x = b }.
+
+    Redundant rows of A are dropped, so that the remaining rows A' have full rank r, and
+    A' * U = [H 0] is brought into Hermite normal form by a unimodular matrix U = [U1 U2].
+    The integral solutions of A * x = b are then x = U1 * H^{-1} * b' + U2 * y for arbitrary
+    y in Z^(n-r), so the lattice points of the polytope are in bijection with the lattice
+    points of { y : U2 * y + U1 * H^{-1} * b' >= 0 } (or there are none if H^{-1} * b' is
+    not integral, or if b violates the dropped rows).
+    """
+
+    def __init__(self, A):
+        self.A = [list(map(int, row)) for row in A]
+        self.rows = independent_rows(self.A)
+        self.H, U = column_hermite_form([self.A[i] for i in self.rows])
+        r = len(self.rows)
+        self.U1 = [row[:r] for row in U]
+        self.U2 = [row[r:] for row in U]
+        self.dim = len(self.A[0]) - r
+
+    def particular_solution(self, b):
+        """
+        Return integral solution x0 of A * x0 = b, or None if there is none.
+        """
+        # solve H * y1 = b' by forward substitution
+        y1 = []
+        for i, row in enumerate(self.H):
+            rhs = int(b[self.rows[i]]) - sum(h * y for h, y in zip(row, y1))
+            y, remainder = divmod(rhs, row[i])
+            if remainder:
+                return None
+            y1.append(y)
+        x0 = [sum(u * y for u, y in zip(row, y1)) for row in self.U1]
+
+        # check dropped rows
+        if any(
+            sum(a * x for a, x in zip(row, x0)) != int(b[i])
+            for i, row in enumerate(self.A)
+        ):
+            return None
+        return x0
+
+    def inequalities(self, b):
+        """
+        Return (M,c) such that the lattice points of { x >= 0 : A * x = b } are in bijection
+        with those of { y : M * y + c >= 0 }, or None if there are no lattice points.
+        """
+        x0 = self.particular_solution(b)
+        if x0 is None:
+            return None
+        return self.U2, x0
+
+    def trivial_count(self, b):
+        """
+        Return the number of lattice points if it can be read off without counting (because
+        there are no integral solutions or the polytope is a point), otherwise None.
+        """
+        x0 = self.particular_solution(b)
+        if x0 is None:
+            return 0
+        if self.dim == 0:
+            return int(all(x >= 0 for x in x0))
+        return None
+
+    def __repr__(self):
+        return "<ReducedSystem(%d rows, dimension %d)>" % (len(self.rows), self.dim)
+
+
+def reduce_system(A):
+    """
+    Compute ReducedSystem for given matrix.
+    """
+    system = ReducedSystem(np.array(A).tolist())
+    logging.debug(
+        "Reduced %d x %d system to %d inequalities in dimension %d.",
+        len(system.A),
+        len(system.A[0]),
+        len(system.U2),
+        system.dim,
+    )
+    return system
@@ -0,0 +1,300 @@
+import math, re
+from fractions import Fraction
+
+__all__ = [
+    "PiecewiseQuasiPolynomial",
+    "parse_isl_pw_qpolynomial",
+    "UnresolvedChamber",
+]
+
+
+class UnresolvedChamber(Exception):
+    pass
+
+
+class PiecewiseQuasiPolynomial(object):
+    """
+    Piecewise quasi-polynomial function of integer parameters, given by a list of
+    (domain,polynomial) pieces. Outside of all domains, the function is zero.
+    """
+
+    def __init__(self, params, pieces, text=None):
+        self.params = params
+        self.pieces = pieces
+        self.text = text
+
+    def __call__(self, b):
+        assert len(b) == len(self.params)
+        env = {param: int(value) for param, value in zip(self.params, b)}
+
+        # locate chamber
+        values = set()
+        try:
+            for domain, polynomial in self.pieces:
+                if domain is None or domain(env):
+                    values.add(polynomial(env))
+        except (KeyError, ZeroDivisionError) as err:
+            raise UnresolvedChamber("Cannot evaluate at %s (%r)." % (list(b), err))
+        if len(values) > 1:
+            raise UnresolvedChamber("%s lies in several chambers." % list(b))
+        value = values.pop() if values else 0
+        if value.denominator != 1:
+            raise UnresolvedChamber("Non-integral value %s at %s." % (value, list(b)))
+        return int(value)
+
+    def __repr__(self):
+        return "<PiecewiseQuasiPolynomial(%s)>" % (
+            self.text or "%d pieces" % len(self.pieces)
+        )
+
+
+TOKEN_REGEX = re.compile(
+    r"\s*(?:(\d+)|([A-Za-z_][A-Za-z_0-9']*)|(->|<=|>=|[-+*/^()\[\]{},;:<>=]))"
+)
+
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN_REGEX.match(text, pos)
+        if not match:
+            raise ValueError("Unexpected character at %r." % text[pos : pos + 20])
+        number, ident, op = match.groups()
+        if number is not None:
+            tokens.append(("num", int(number)))
+        elif ident is not None:
+            tokens.append(("id", ident))
+        else:
+            tokens.append(("op", op))
+        pos = match.end()
+    return tokens
+
+
+KEYWORDS = ("and", "or", "not", "mod", "exists")
+
+COMPARISONS = {
+    "<=": lambda x, y: x <= y,
+    "<": lambda x, y: x < y,
+    ">=": lambda x, y: x >= y,
+    ">": lambda x, y: x > y,
+    "=": lambda x, y: x == y,
+}
+
+
+class Parser(object):
+    """
+    Recursive-descent parser for isl's textual representation of piecewise quasi-polynomials,
+    such as "[n] -> { (1/2 * n + 1/2 * floor((n)/2)) : n >= 0 }". Expressions and conditions
+    are compiled into functions of an environment mapping parameter names to integers.
+    """
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self, offset=0):
+        if self.pos + offset < len(self.tokens):
+            return self.tokens[self.pos + offset]
+        return (None, None)
+
+    def accept(self, value):
+        if self.peek()[1] == value and self.peek()[0] in ("op", "id"):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, value):
+        if not self.accept(value):
+            raise ValueError("Expected %r, got %r." % (value, self.peek()[1]))
+
+    def identifier(self):
+        kind, value = self.peek()
+        if kind != "id":
+            raise ValueError("Expected identifier, got %r." % value)
+        self.pos += 1
+        return value
+
+    # top level
+    def pw_qpolynomial(self):
+        params = []
+        if self.accept("["):
+            if not self.accept("]"):
+                params.append(self.identifier())
+                while self.accept(","):
+                    params.append(self.identifier())
+                self.expect("]")
+            self.expect("->")
+        self.expect("{")
+        pieces = []
+        if not self.accept("}"):
+            pieces.append(self.piece())
+            while self.accept(";"):
+                pieces.append(self.piece())
+            self.expect("}")
+        if self.peek()[0] is not None:
+            raise ValueError("Trailing input %r." % self.peek()[1])
+        return params, pieces
+
+    def piece(self):
+        polynomial = self.expr()
+        domain = self.condition() if self.accept(":") else None
+        return domain, polynomial
+
+    # conditions
+    def condition(self):
+        terms = [self.conjunction()]
+        while self.accept("or"):
+            terms.append(self.conjunction())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda env: any(term(env) for term in terms)
+
+    def conjunction(self):
+        terms = [self.atom()]
+        while self.accept("and"):
+            terms.append(self.atom())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda env: all(term(env) for term in terms)
+
+    def atom(self):
+        if self.accept("exists"):
+            return self.exists()
+        if self.accept("not"):
+            term = self.atom()
+            return lambda env: not term(env)
+        if self.peek()[1] == "(":
+            # either a parenthesized condition or a comparison starting with a parenthesized expression
+            start = self.pos
+            try:
+                self.expect("(")
+                term = self.condition()
+                self.expect(")")
+                if self.peek()[1] not in COMPARISONS:
+                    return term
+            except ValueError:
+                pass
+            self.pos = start
+        return self.comparison()
+
+    def exists(self):
+        # exists (e0 = floor((...)/k), e1 = ...: condition) or exists (e0, e1: condition)
+        self.expect("(")
+        definitions = []
+        while True:
+            name = self.identifier()
+            value = self.expr() if self.accept("=") else None
+            definitions.append((name, value))
+            if not self.accept(","):
+                break
+        self.expect(":")
+        term = self.condition()
+        self.expect(")")
+
+        def exists(env):
+            # variables without definition are left unbound, so that conditions that
+            # depend on them cannot be evaluated (see UnresolvedChamber)
+            env = dict(env)
+            for name, value in definitions:
+                if value is not None:
+                    env[name] = value(env)
+            return term(env)
+
+        return exists
+
+    def comparison(self):
+        operands = [self.expr()]
+        operators = []
+        while self.peek()[1] in COMPARISONS:
+            operators.append(COMPARISONS[self.peek()[1]])
+            self.pos += 1
+            operands.append(self.expr())
+        if not operators:
+            raise ValueError("Expected comparison, got %r." % self.peek()[1])
+
+        def comparison(env):
+            values = [operand(env) for operand in operands]
+            return all(op(x, y) for op, x, y in zip(operators, values, values[1:]))
+
+        return comparison
+
+    # expressions
+    def expr(self):
+        terms = [(1, self.term())]
+        while self.peek()[1] in ("+", "-") and self.peek()[0] == "op":
+            sign = 1 if self.peek()[1] == "+" else -1
+            self.pos += 1
+            terms.append((sign, self.term()))
+        if len(terms) == 1:
+            return terms[0][1]
+        return lambda env: sum(sign * term(env) for sign, term in terms)
+
+    def term(self):
+        value = self.factor()
+        while True:
+            kind, token = self.peek()
+            if kind == "op" and token in ("*", "/"):
+                self.pos += 1
+                lhs, rhs = value, self.factor()
+                if token == "*":
+                    value = lambda env, lhs=lhs, rhs=rhs: lhs(env) * rhs(env)
+                else:
+                    value = lambda env, lhs=lhs, rhs=rhs: Fraction(lhs(env)) / rhs(env)
+            elif kind == "id" and token == "mod":
+                self.pos += 1
+                lhs, rhs = value, self.factor()
+                value = lambda env, lhs=lhs, rhs=rhs: lhs(env) % rhs(env)
+            elif (kind == "id" and token not in KEYWORDS) or (kind, token) == (
+                "op",
+                "(",
+            ):
+                # implicit multiplication, as in 2n or 2(n + 1)
+                lhs, rhs = value, self.factor()
+                value = lambda env, lhs=lhs, rhs=rhs: lhs(env) * rhs(env)
+            else:
+                return value
+
+    def factor(self):
+        if self.peek() == ("op", "-"):
+            self.pos += 1
+            operand = self.factor()
+            return lambda env: -operand(env)
+        value = self.primary()
+        if self.accept("^"):
+            kind, exponent = self.peek()
+            if kind != "num":
+                raise ValueError("Expected exponent, got %r." % exponent)
+            self.pos += 1
+            base = value
+            value = lambda env: base(env) ** exponent
+        return value
+
+    def primary(self):
+        kind, token = self.peek()
+        if kind == "num":
+            self.pos += 1
+            return lambda env: token
+        if kind == "id" and token == "floor":
+            self.pos += 1
+            self.expect("(")
+            operand = self.expr()
+            self.expect(")")
+            return lambda env: math.floor(operand(env))
+        if kind == "id" and token not in KEYWORDS:
+            self.pos += 1
+            return lambda env: env[token]
+        if self.accept("("):
+            value = self.expr()
+            self.expect(")")
+            return value
+        raise ValueError("Unexpected token %r." % token)
+
+
+def parse_isl_pw_qpolynomial(text):
+    """
+    Parse piecewise quasi-polynomial in isl's textual format (as printed by barvinok's iscc).
+    """
+    params, pieces = Parser(text).pw_qpolynomial()
+    return PiecewiseQuasiPolynomial(params, pieces, text.strip())
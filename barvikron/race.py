@@ -0,0 +1,101 @@
+import asyncio, logging
+from collections import Counter
+from . import EvaluatorBase
+from .tracing import current_record, record
+
+__all__ = ["RacingEvaluator", "EvaluatorMismatch"]
+
+
+class EvaluatorMismatch(Exception):
+    pass
+
+
+class RacingEvaluator(EvaluatorBase):
+    """
+    Evaluate vector partition functions by starting several evaluators on the same query
+    and returning the first successful result.
+
+    The remaining evaluations are cancelled, which kills the processes of evaluators that
+    run external tools asynchronously (barvinok_count, LattE) and stops the dynamic program
+    of the native evaluator. Other evaluations in threads cannot be stopped and run to
+    completion in the background.
+    If cross_check is set, all evaluations are instead run to completion and an
+    EvaluatorMismatch is raised if their results differ.
+
+    The number of wins and failures of each evaluator is recorded in wins and failures.
+    """
+
+    def __init__(self, evaluators, cross_check=False):
+        assert evaluators, "Specify at least one evaluator."
+        self.evaluators = list(evaluators)
+        self.cross_check = cross_check
+        self.wins = Counter()
+        self.failures = Counter()
+
+    def eval(self, vpn, b):
+        # use a fresh event loop, which does not wait for losing evaluations in threads
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.eval_async(vpn, b))
+        finally:
+            loop.close()
+
+    async def eval_async(self, vpn, b):
+        # no need to race if the answer is known
+        count = vpn.reduced.trivial_count(b)
+        if count is not None:
+            return count
+
+        async def run(evaluator):
+            # do not mix up the traced phases of the competing evaluators
+            current_record.set(None)
+            return await evaluator.eval_async(vpn, b)
+
+        tasks = {asyncio.ensure_future(run(e)): e for e in self.evaluators}
+        pending = set(tasks)
+        winner, value, results = None, None, {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    evaluator = tasks[task]
+                    if task.exception() is not None:
+                        logging.warning("%s failed: %r", evaluator, task.exception())
+                        self.failures[str(evaluator)] += 1
+                        continue
+                    results[str(evaluator)] = task.result()
+                    if winner is None:
+                        winner, value = evaluator, task.result()
+                if winner is not None and not self.cross_check:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if winner is None:
+            raise next(t.exception() for t in tasks if t.done() and not t.cancelled())
+        self.wins[str(winner)] += 1
+        record(winner=str(winner))
+        if len(set(results.values())) > 1:
+            raise EvaluatorMismatch("Results differ for %s: %s" % (list(b), results))
+        return value
+
+    def stats(self):
+        """
+        Return human-readable summary of wins and failures per evaluator.
+        """
+        return ", ".join(
+            "%s: %d wins, %d failures" % (e, self.wins[str(e)], self.failures[str(e)])
+            for e in self.evaluators
+        )
+
+    def close(self):
+        logging.info("Race: %s", self.stats())
+        for evaluator in self.evaluators:
+            evaluator.close()
+
+    def __str__(self):
+        return "race[%s]" % ", ".join(map(str, self.evaluators))
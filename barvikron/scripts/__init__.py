@@ -1,5 +1,18 @@
-import logging
+import logging, os
 import click
+from .. import (
+    BarvinokEvaluator,
+    IsccEvaluator,
+    LatteEvaluator,
+    NativeEvaluator,
+    ParametricBarvinokEvaluator,
+    CachedEvaluator,
+    MultiplicityCache,
+    RacingEvaluator,
+    EvaluatorBase,
+    NoEvaluatorFound,
+    default_evaluator,
+)
 
 
 def enable_logging():
@@ -14,3 +27,139 @@ class WeightParamType(click.ParamType):
         if not isinstance(value, (tuple, list)):
             self.fail("%s is not a valid weight" % value, param, ctx)
         return value
+
+
+NO_EVALUATOR_MESSAGE = "No partition function evaluator found. Specify --barvinok, --iscc or --latte (or --native for small weights)."
+
+
+class MissingEvaluator(EvaluatorBase):
+    """
+    Stand-in for an evaluator that could not be found, which fails only once a partition
+    function has to be evaluated, since many coefficients can be computed without (see
+    prepare_kronecker).
+    """
+
+    def eval(self, vpn, b):
+        raise NoEvaluatorFound(NO_EVALUATOR_MESSAGE)
+
+    def __str__(self):
+        return "missing"
+
+
+def evaluator_options(f):
+    """
+    Decorator that adds the options for choosing and configuring the evaluator (see
+    create_evaluator).
+    """
+    options = [
+        click.option(
+            "--barvinok",
+            metavar="PATH",
+            help="Path to barvinok_count tool (see http://barvinok.gforge.inria.fr/).",
+        ),
+        click.option(
+            "--iscc",
+            metavar="PATH",
+            help="Path to barvinok's iscc tool, which is kept running to evaluate all weight multiplicities (see http://barvinok.gforge.inria.fr/).",
+        ),
+        click.option(
+            "--latte",
+            metavar="PATH",
+            help="Path to LattE's count tool (see https://www.math.ucdavis.edu/~latte/).",
+        ),
+        click.option(
+            "--native",
+            is_flag=True,
+            help="Evaluate weight multiplicities only by barvikron's own dynamic program (exact, but only efficient for small weights).",
+        ),
+        click.option(
+            "--scratch",
+            metavar="PATH",
+            help="Directory in which LattE's scratch directories are created (default: $BARVIKRON_SCRATCH, /dev/shm or the temporary directory).",
+        ),
+        click.option(
+            "--race",
+            is_flag=True,
+            help="Run all given backends (--barvinok, --iscc, --latte, --native) side by side and keep the first answer.",
+        ),
+        click.option(
+            "--cross-check",
+            is_flag=True,
+            help="With --race, wait for all backends and check that their answers agree.",
+        ),
+        click.option(
+            "--cache",
+            metavar="PATH",
+            help="Path to on-disk cache of weight multiplicities (created if necessary).",
+        ),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+
+def check_evaluator_options(barvinok, iscc, latte, native, race):
+    """
+    Check that the backends given on the command line can be combined.
+    """
+    num_backends = sum(map(bool, [barvinok, iscc, latte, native]))
+    if race and num_backends < 2:
+        raise click.UsageError(
+            "Specify at least two of --barvinok, --iscc, --latte or --native to race."
+        )
+    if num_backends > 1 and not race:
+        raise click.UsageError(
+            "Specify only one of --barvinok, --iscc, --latte or --native (or --race)."
+        )
+
+
+def create_evaluator(
+    barvinok,
+    iscc,
+    latte,
+    native,
+    scratch,
+    race,
+    cross_check,
+    cache,
+    parametric=None,
+    sessions=1,
+    required=False,
+):
+    """
+    Instantiate evaluator according to the options (see evaluator_options), optionally
+    using the parametric vector partition function computed by barvinok's iscc tool at the
+    given path, with the other backends as fallback. If no backend is given or found (see
+    default_evaluator), an error is raised if required is set, and a MissingEvaluator is
+    used otherwise.
+    """
+    check_evaluator_options(barvinok, iscc, latte, native, race)
+    if scratch:
+        os.environ["BARVIKRON_SCRATCH"] = scratch
+    backends = []
+    if barvinok:
+        backends.append(BarvinokEvaluator(barvinok))
+    if iscc:
+        backends.append(IsccEvaluator(iscc, sessions=sessions))
+    if latte:
+        backends.append(LatteEvaluator(latte))
+    if native:
+        backends.append(NativeEvaluator())
+
+    if race:
+        evaluator = RacingEvaluator(backends, cross_check)
+    elif backends:
+        evaluator = backends[0]
+    else:
+        try:
+            evaluator = default_evaluator()
+        except NoEvaluatorFound:
+            if required:
+                raise click.ClickException(NO_EVALUATOR_MESSAGE)
+            evaluator = None if parametric else MissingEvaluator()
+
+    if parametric:
+        evaluator = ParametricBarvinokEvaluator(parametric, fallback=evaluator)
+    if cache:
+        evaluator = CachedEvaluator(evaluator, MultiplicityCache(cache))
+    return evaluator
@@ -0,0 +1,90 @@
+import functools, json, sys
+import click
+from .. import NoEvaluatorFound, kronecker_many
+from . import (
+    enable_logging,
+    evaluator_options,
+    check_evaluator_options,
+    create_evaluator,
+    NO_EVALUATOR_MESSAGE,
+)
+
+
+def read_queries(file):
+    """
+    Read queries from JSON lines, each of which is either a list of partitions or an object
+    with key "partitions" (other keys are passed through to the results).
+    """
+    queries = []
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        query = json.loads(line)
+        if isinstance(query, list):
+            query = {"partitions": query}
+        queries.append(query)
+    return queries
+
+
+@click.command()
+@click.argument("file", type=click.File("r"), default="-")
+@evaluator_options
+@click.option(
+    "-p",
+    "--processes",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of processes that evaluate weight multiplicities.",
+)
+@click.option("-v", "--verbose", is_flag=True)
+def main(
+    file,
+    barvinok,
+    iscc,
+    latte,
+    native,
+    scratch,
+    race,
+    cross_check,
+    cache,
+    processes,
+    verbose,
+):
+    """
+    Compute many Kronecker coefficients, read as JSON lines from FILE (default: stdin).
+    Each line is a list of partitions, such as [[2,1],[2,1],[2,1]], or an object with key
+    "partitions". Results are written as JSON lines as soon as they are known (so possibly
+    out of order), with the value under the key "value".
+
+    Each distinct weight multiplicity is evaluated only once for all queries.
+    """
+    if verbose:
+        enable_logging()
+    check_evaluator_options(barvinok, iscc, latte, native, race)
+
+    # the evaluator is created in each process of the pool
+    queries = read_queries(file)
+    evaluator = functools.partial(
+        create_evaluator,
+        barvinok,
+        iscc,
+        latte,
+        native,
+        scratch,
+        race,
+        cross_check,
+        cache,
+    )
+    partitions = [query["partitions"] for query in queries]
+    try:
+        for index, value in kronecker_many(partitions, evaluator, processes):
+            click.echo(json.dumps(dict(queries[index], value=value)))
+    except NoEvaluatorFound:
+        click.echo(NO_EVALUATOR_MESSAGE, err=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,24 @@
-import logging, multiprocessing, multiprocessing.managers, os, queue
+import concurrent.futures, functools, logging, multiprocessing.managers, os, socket, sys, threading, time
 import click
 from .. import (
-    BarvinokEvaluator,
-    LatteEvaluator,
-    flatten_weight,
-    finite_differences,
-    positive_roots,
+    MultiplicityCache,
     kronecker_weight_vpn,
+    prepare_kronecker,
+    finite_difference_terms,
+    Dispatcher,
+    CostModel,
+    makespan,
+    write_timings,
+    Tracer,
+    TracingEvaluator,
+    Coordinator,
+    WireServer,
+    WireClient,
+    annotate,
 )
-from . import WeightParamType, enable_logging
+from ..dispatch import DEFAULT_LEASE_TIMEOUT
+from ..batch import init_process, eval_in_process
+from . import WeightParamType, enable_logging, evaluator_options, create_evaluator
 
 
 class WorkManager(multiprocessing.managers.BaseManager):
@@ -17,6 +27,21 @@ class WorkManager(multiprocessing.managers.BaseManager):
 
 DEFAULT_PORT = 12345
 
+# ways in which master and workers can communicate
+TRANSPORTS = ["manager", "wire"]
+
+# how long workers wait before asking again for work items when none are available
+POLL_INTERVAL = 1.0
+
+# how often workers renew their leases
+HEARTBEAT_INTERVAL = 10.0
+
+# how often the master reports progress
+PROGRESS_INTERVAL = 5.0
+
+# how long multi-process workers hold on to results before sending them to the master
+FLUSH_INTERVAL = 5.0
+
 
 @click.group()
 def main():
@@ -26,7 +51,7 @@ def main():
 @main.command()
 @click.argument(
     "partitions",
-    metavar="\u03BB \u03BC \u03BD ...",
+    metavar="\u03bb \u03bc \u03bd ...",
     nargs=-1,
     required=True,
     type=WeightParamType(),
@@ -44,50 +69,307 @@ def main():
     required=True,
     help="Secret authentication key for communication with workers.",
 )
+@click.option(
+    "--cache",
+    metavar="PATH",
+    help="Path to on-disk cache of weight multiplicities to consult before dispatching work items.",
+)
+@click.option(
+    "--timings",
+    metavar="PATH",
+    help="Path to file of recorded evaluation times, used to calibrate the cost model that decides which work items to dispatch first (appended to).",
+)
+@click.option(
+    "--dry-run",
+    "dry_run",
+    type=int,
+    metavar="WORKERS",
+    help="Only print the predicted running time for given number of workers.",
+)
+@click.option(
+    "--journal",
+    metavar="PATH",
+    help="Path to journal of computed weight multiplicities (resumed from if it exists).",
+)
+@click.option(
+    "--lease-timeout",
+    type=float,
+    default=DEFAULT_LEASE_TIMEOUT,
+    show_default=True,
+    help="Seconds after which work items of unresponsive workers are handed out again.",
+)
+@click.option(
+    "--transport",
+    type=click.Choice(TRANSPORTS),
+    default="manager",
+    show_default=True,
+    help="How to communicate with workers: using Python's multiprocessing managers, or a lightweight protocol (which scales to many more workers).",
+)
+@click.option(
+    "--trace",
+    metavar="PATH",
+    help="Path to file to which a JSON record is appended for each work item, followed by a summary (including the utilisation of each worker).",
+)
 @click.option("-v", "--verbose", is_flag=True)
-def master(partitions, port, authkey, verbose):
+def master(
+    partitions,
+    port,
+    authkey,
+    cache,
+    timings,
+    dry_run,
+    journal,
+    lease_timeout,
+    transport,
+    trace,
+    verbose,
+):
     """
-    Compute (generalized) Kronecker coefficient g(\u03BB,\u03BC,\u03BD,...)
+    Compute (generalized) Kronecker coefficient g(\u03bb,\u03bc,\u03bd,...)
     using parallel processing. See README for instructions.
     """
     if verbose:
         enable_logging()
 
-    # create queues and register with work manager
-    work_queue = multiprocessing.JoinableQueue()
-    result_queue = multiprocessing.Queue()
-    WorkManager.register("work_queue", callable=lambda: work_queue)
-    WorkManager.register("result_queue", callable=lambda: result_queue)
+    # workers find out by themselves that there is nothing to do (see worker)
+    header = {"partitions": [list(map(int, p)) for p in partitions]}
+    g, partitions = prepare_kronecker(partitions)
+    if g is not None:
+        click.echo(g)
+        return
 
-    # compute highest weight and finite-difference formula
+    # compute highest weight and finite-difference formula (without trivial weight multiplicities)
     logging.info("Preparing work items...")
     dims = list(map(len, partitions))
-    highest_weight = flatten_weight(partitions)
-    findiff = finite_differences(positive_roots(dims))
-    total = len(findiff)
-    for i, (coeff, shift) in enumerate(findiff):
-        work_queue.put((i, total, coeff, highest_weight + shift))
+    g0, terms = finite_difference_terms(partitions)
 
-    # setup work manager
-    manager = WorkManager(address=("", port), authkey=authkey.encode("ascii"))
-    manager.start()
-    logging.info("Serving %d weight multiplicities on port %d...", total, port)
+    # predict evaluation times, so that we can dispatch the most expensive work items first
+    cost_model = CostModel.load(timings) if timings else CostModel()
+    costs = [cost_model.predict(dims, weight) for _, weight in terms]
+    if dry_run:
+        unit = (
+            "s"
+            if cost_model.calibrated
+            else " (arbitrary units, no timings to calibrate from)"
+        )
+        click.echo(
+            "Predicted running time on %d workers: %.1f%s."
+            % (dry_run, makespan(sorted(costs, reverse=True), dry_run), unit)
+        )
+        click.echo(
+            "Without cost-based scheduling: %.1f; total work: %.1f."
+            % (makespan(costs, dry_run), sum(costs))
+        )
+        return
 
-    # wait until all work items have been processed...
-    work_queue.join()
+    tracer = Tracer(trace) if trace else None
+    dispatcher = Dispatcher(terms, lease_timeout, journal, header, costs)
+
+    # skip weight multiplicities that have been computed before
+    if cache:
+        cache = MultiplicityCache(cache)
+        vpn = kronecker_weight_vpn(dims)
+        for i, (coeff, weight) in enumerate(terms):
+            if i in dispatcher.results:
+                continue
+            weight_mul = cache.lookup(vpn, weight)
+            if weight_mul is not None:
+                dispatcher.complete_cached(i, weight_mul)
+        logging.info("Cache: %s", cache)
+        cache.close()
+
+    # serve dispatcher (in a background thread, so that we can report progress)
+    if transport == "wire":
+        wire_server = WireServer(dispatcher, authkey.encode("ascii"), port=port)
+        wire_server.start()
+    else:
+        WorkManager.register("dispatcher", callable=lambda: dispatcher)
+        manager = WorkManager(address=("", port), authkey=authkey.encode("ascii"))
+        server = manager.get_server()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info("Serving %d weight multiplicities on port %d...", len(terms), port)
+
+    # wait until all work items have been processed, requeuing work items of lost workers
+    live = sys.stderr.isatty()
+    while not dispatcher.wait(PROGRESS_INTERVAL):
+        if live:
+            click.echo("\r" + dispatcher.progress(), nl=False, err=True)
+        else:
+            logging.info(dispatcher.progress())
+    if live:
+        click.echo("\r" + dispatcher.progress(), err=True)
+    if transport == "wire":
+        # stop serving before the interpreter shuts down (workers may still be connected)
+        wire_server.close()
+    dispatcher.close()
+    if timings:
+        write_timings(
+            timings,
+            [(dims, terms[i][1], seconds) for i, seconds in dispatcher.seconds.items()],
+        )
+    if tracer:
+        for i, seconds in sorted(dispatcher.seconds.items()):
+            tracer.emit(
+                {
+                    "dims": dims,
+                    "index": i,
+                    "weight": [int(x) for x in terms[i][1]],
+                    "worker": dispatcher.completed_by[i],
+                    "wall": seconds,
+                    "value": dispatcher.results[i],
+                }
+            )
+        tracer.close()
 
     # accumulate weight multiplicities
     logging.info("All work items have been processed. Now accumulating...")
-    g = 0
-    for _ in findiff:
-        g += result_queue.get()
-    click.echo(g)
+    click.echo(g0 + dispatcher.total())
+
+
+def worker_options(f):
+    """
+    Decorator that adds the options for choosing and configuring the evaluator of a worker
+    (see evaluator_options), its heartbeats and tracing.
+    """
+    options = [
+        evaluator_options,
+        click.option(
+            "--heartbeat",
+            type=float,
+            default=HEARTBEAT_INTERVAL,
+            show_default=True,
+            help="Seconds between heartbeats sent to the master.",
+        ),
+        click.option(
+            "--trace",
+            metavar="PATH",
+            help="Path to file to which a JSON record is appended for each evaluation, followed by a summary (can be shared by several workers).",
+        ),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+
+def connect(host, port, authkey, name, transport="manager", worker_id=None):
+    """
+    Connect to the master (or coordinator) and return proxy for the given shared object.
+    """
+    if transport == "wire":
+        assert name == "dispatcher", "The wire protocol only serves the dispatcher."
+        return WireClient(host, port, authkey.encode("ascii"), worker_id)
+    WorkManager.register(name)
+    manager = WorkManager(address=(host, port), authkey=authkey.encode("ascii"))
+    manager.connect()
+    return getattr(manager, name)()
+
+
+def start_heartbeats(
+    host, port, authkey, name, worker_id, interval, transport="manager"
+):
+    """
+    Keep the leases of a worker alive while it is computing (using a separate connection).
+    """
+
+    def send_heartbeats():
+        try:
+            shared = connect(host, port, authkey, name, transport, worker_id)
+            while True:
+                time.sleep(interval)
+                shared.heartbeat(worker_id)
+        except (EOFError, ConnectionError):
+            pass
+
+    threading.Thread(target=send_heartbeats, daemon=True).start()
+
+
+def work_in_processes(
+    dispatcher, worker_id, evaluator_args, dims, processes, batch, tracer
+):
+    """
+    Compute work items using a pool of processes. Work items are leased in batches, so that
+    all processes stay busy, and results are sent to the master in bulk. Batches smaller
+    than the number of processes would leave processes idle, so they are enlarged.
+    """
+    if batch < processes:
+        logging.warning(
+            "Batch size %d is smaller than the number of processes; using %d instead.",
+            batch,
+            processes,
+        )
+        batch = processes
+    pool = concurrent.futures.ProcessPoolExecutor(
+        processes,
+        initializer=init_process,
+        initargs=(functools.partial(create_evaluator, *evaluator_args, required=True),),
+    )
+    running = {}
+    results = []
+    partial_sum = 0
+    last_flush = time.monotonic()
+    try:
+        while True:
+            # prefetch next batch once the queued work items have been started
+            if len(running) <= processes:
+                for index, total, coeff, weight in dispatcher.lease_many(
+                    worker_id, batch - len(running)
+                ):
+                    running[pool.submit(eval_in_process, tuple(dims), weight)] = (
+                        index,
+                        coeff,
+                        weight,
+                    )
+            if not running:
+                # all work items have been handed out -- but some might still be requeued
+                if dispatcher.finished():
+                    break
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            # collect results
+            done, _ = concurrent.futures.wait(
+                running, POLL_INTERVAL, concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                index, coeff, weight = running.pop(future)
+                weight_mul, seconds, pid = future.result()
+                results.append((index, weight_mul, seconds))
+                partial_sum += coeff * weight_mul
+                if tracer:
+                    tracer.emit(
+                        {
+                            "dims": dims,
+                            "index": index,
+                            "weight": list(weight),
+                            # trace each process separately, so that utilisations are per core
+                            "worker": "%s/%d" % (worker_id, pid),
+                            "wall": seconds,
+                            "value": weight_mul,
+                        }
+                    )
+
+            # post results in bulk
+            if results and (
+                len(results) >= processes
+                or not running
+                or time.monotonic() - last_flush > FLUSH_INTERVAL
+            ):
+                logging.info(
+                    "Sending %d weight multiplicities (partial sum %d).",
+                    len(results),
+                    partial_sum,
+                )
+                dispatcher.complete_many(worker_id, results)
+                results, partial_sum = [], 0
+                last_flush = time.monotonic()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
 
 
 @main.command()
 @click.argument(
     "partitions",
-    metavar="\u03BB \u03BC \u03BD ...",
+    metavar="\u03bb \u03bc \u03bd ...",
     nargs=-1,
     required=True,
     type=WeightParamType(),
@@ -107,45 +389,106 @@ def master(partitions, port, authkey, verbose):
     help="Secret authentication key for communication with workers.",
 )
 @click.option(
-    "--barvinok",
-    metavar="PATH",
-    help="Path to barvinok_count tool (see http://barvinok.gforge.inria.fr/).",
+    "-p",
+    "--processes",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of processes computing weight multiplicities (e.g., one per core of the node).",
 )
 @click.option(
-    "--latte",
-    metavar="PATH",
-    help="Path to LattE's count tool (see https://www.math.ucdavis.edu/~latte/).",
+    "--batch",
+    type=int,
+    help="Number of work items leased at once by a multi-process worker (at least the number of processes; default: twice the number of processes).",
 )
+@click.option(
+    "--transport",
+    type=click.Choice(TRANSPORTS),
+    default="manager",
+    show_default=True,
+    help="How to communicate with the master (should match the master's --transport).",
+)
+@worker_options
 @click.option("-v", "--verbose", is_flag=True)
-def worker(partitions, host, port, authkey, barvinok, latte, verbose):
+def worker(
+    partitions,
+    host,
+    port,
+    authkey,
+    processes,
+    batch,
+    transport,
+    barvinok,
+    iscc,
+    latte,
+    native,
+    race,
+    cross_check,
+    scratch,
+    cache,
+    heartbeat,
+    trace,
+    verbose,
+):
     """
-    Compute (generalized) Kronecker coefficient g(\u03BB,\u03BC,\u03BD,...)
+    Compute (generalized) Kronecker coefficient g(\u03bb,\u03bc,\u03bd,...)
     using parallel processing. See README for instructions.
     """
     if verbose:
         enable_logging()
 
-    # instantiate evaluator
-    assert bool(barvinok) != bool(latte), "Specify either --barvinok or --latte."
-    evaluator = BarvinokEvaluator(barvinok) if barvinok else LatteEvaluator(latte)
-
-    # create partition function
-    dims = list(map(len, partitions))
-    vpn = kronecker_weight_vpn(dims)
+    # the master does not serve any work items if the coefficient can be computed directly
+    g, partitions = prepare_kronecker(partitions)
+    if g is not None:
+        logging.info("Kronecker coefficient can be computed directly, nothing to do.")
+        return
 
-    # connect work manager, and retrieve queues
-    WorkManager.register("work_queue")
-    WorkManager.register("result_queue")
+    # connect work manager, and retrieve dispatcher
     logging.info("Connecting to %s:%d...", host, port)
-    manager = WorkManager(address=(host, port), authkey=authkey.encode("ascii"))
-    manager.connect()
-    work_queue = manager.work_queue()
-    result_queue = manager.result_queue()
+    worker_id = "%s:%d" % (socket.gethostname(), os.getpid())
+    dispatcher = connect(host, port, authkey, "dispatcher", transport, worker_id)
+    start_heartbeats(host, port, authkey, "dispatcher", worker_id, heartbeat, transport)
+    tracer = Tracer(trace) if trace else None
 
-    while True:
+    # compute in several processes?
+    dims = list(map(len, partitions))
+    evaluator_args = (barvinok, iscc, latte, native, scratch, race, cross_check, cache)
+    if processes > 1:
+        # fail early if no evaluator is found (rather than in each process of the pool)
+        create_evaluator(*evaluator_args, required=True).close()
         try:
+            work_in_processes(
+                dispatcher,
+                worker_id,
+                evaluator_args,
+                dims,
+                processes,
+                batch or 2 * processes,
+                tracer,
+            )
+        except (EOFError, ConnectionError):
+            logging.info("Lost connection to master.")
+        if tracer:
+            tracer.close()
+        return
+
+    # instantiate evaluator and create partition function
+    evaluator = create_evaluator(*evaluator_args, required=True)
+    if tracer:
+        evaluator = TracingEvaluator(evaluator, tracer, worker_id)
+    vpn = kronecker_weight_vpn(dims)
+
+    try:
+        while True:
             # get next work item
-            index, total, coeff, weight = work_queue.get_nowait()
+            item = dispatcher.lease(worker_id)
+            if item is None:
+                # all work items have been handed out -- but some might still be requeued
+                if dispatcher.finished():
+                    break
+                time.sleep(POLL_INTERVAL)
+                continue
+            index, total, coeff, weight = item
 
             # compute weight multiplicity
             logging.info(
@@ -155,7 +498,10 @@ def worker(partitions, host, port, authkey, barvinok, latte, verbose):
                 os.getpid(),
                 weight,
             )
-            weight_mul = vpn.eval(weight, evaluator)
+            start = time.perf_counter()
+            with annotate(dims=dims, index=index):
+                weight_mul = vpn.eval(weight, evaluator)
+            seconds = time.perf_counter() - start
             logging.info(
                 "(%3d/%3d)   [%6s]   => weight multiplicity = %d (coeff = %d).",
                 index + 1,
@@ -166,10 +512,231 @@ def worker(partitions, host, port, authkey, barvinok, latte, verbose):
             )
 
             # post result
-            result_queue.put(coeff * weight_mul)
-            work_queue.task_done()
-        except queue.Empty:
-            break
+            dispatcher.complete(worker_id, index, weight_mul, seconds)
+    except (EOFError, ConnectionError):
+        # the master exits as soon as all work items have been processed
+        logging.info("Lost connection to master.")
+    evaluator.close()
+    if trace:
+        tracer.close()
+
+
+@main.command()
+@click.option(
+    "-P",
+    "--port",
+    type=int,
+    default=DEFAULT_PORT,
+    help="Port to listen at for communication with workers and clients.",
+)
+@click.option(
+    "-K",
+    "--authkey",
+    required=True,
+    help="Secret authentication key for communication with workers and clients.",
+)
+@click.option(
+    "--timings",
+    metavar="PATH",
+    help="Path to file of recorded evaluation times, used to calibrate the cost model that decides which work items of each job to dispatch first.",
+)
+@click.option(
+    "--lease-timeout",
+    type=float,
+    default=DEFAULT_LEASE_TIMEOUT,
+    show_default=True,
+    help="Seconds after which work items of unresponsive workers are handed out again.",
+)
+@click.option("-v", "--verbose", is_flag=True)
+def coordinator(port, authkey, timings, lease_timeout, verbose):
+    """
+    Run a coordinator that accepts jobs from clients (see submit) and distributes them to
+    a pool of workers (see pool-worker), until interrupted.
+    """
+    if verbose:
+        enable_logging()
+
+    cost_model = CostModel.load(timings) if timings else None
+    coordinator = Coordinator(lease_timeout, cost_model)
+    WorkManager.register("coordinator", callable=lambda: coordinator)
+    manager = WorkManager(address=("", port), authkey=authkey.encode("ascii"))
+    server = manager.get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info("Accepting jobs on port %d...", port)
+
+    status = None
+    try:
+        while True:
+            time.sleep(PROGRESS_INTERVAL)
+            if coordinator.status() != status:
+                status = coordinator.status()
+                logging.info(status)
+    except KeyboardInterrupt:
+        pass
+
+
+@main.command("pool-worker")
+@click.option("-H", "--host", required=True, help="Hostname of coordinator.")
+@click.option(
+    "-P",
+    "--port",
+    type=int,
+    default=DEFAULT_PORT,
+    help="Port to connect to for communication with coordinator.",
+)
+@click.option(
+    "-K",
+    "--authkey",
+    required=True,
+    help="Secret authentication key for communication with coordinator.",
+)
+@click.option(
+    "--idle-timeout",
+    type=float,
+    help="Exit after this many seconds without work (default: never).",
+)
+@worker_options
+@click.option("-v", "--verbose", is_flag=True)
+def pool_worker(
+    host,
+    port,
+    authkey,
+    idle_timeout,
+    barvinok,
+    iscc,
+    latte,
+    native,
+    race,
+    cross_check,
+    scratch,
+    cache,
+    heartbeat,
+    trace,
+    verbose,
+):
+    """
+    Compute weight multiplicities for the jobs of a coordinator, until it exits.
+    """
+    if verbose:
+        enable_logging()
+
+    evaluator = create_evaluator(
+        barvinok, iscc, latte, native, scratch, race, cross_check, cache, required=True
+    )
+    logging.info("Connecting to %s:%d...", host, port)
+    coordinator = connect(host, port, authkey, "coordinator")
+    worker_id = "%s:%d" % (socket.gethostname(), os.getpid())
+    if trace:
+        tracer = Tracer(trace)
+        evaluator = TracingEvaluator(evaluator, tracer, worker_id)
+    start_heartbeats(host, port, authkey, "coordinator", worker_id, heartbeat)
+
+    # partition functions (and their reductions) are reused by all jobs of the same shape
+    vpns = {}
+    idle_since = time.monotonic()
+    try:
+        while True:
+            item = coordinator.lease(worker_id)
+            if item is None:
+                if (
+                    idle_timeout is not None
+                    and time.monotonic() - idle_since > idle_timeout
+                ):
+                    logging.info("No work for %s seconds, exiting.", idle_timeout)
+                    break
+                time.sleep(POLL_INTERVAL)
+                continue
+            job_id, dims, index, coeff, weight = item
+            if tuple(dims) not in vpns:
+                vpns[tuple(dims)] = kronecker_weight_vpn(dims)
+
+            logging.info(
+                "[job %d]   Computing the multiplicity of %s...", job_id, weight
+            )
+            start = time.perf_counter()
+            with annotate(dims=dims, job=job_id, index=index):
+                weight_mul = vpns[tuple(dims)].eval(weight, evaluator)
+            seconds = time.perf_counter() - start
+            logging.info(
+                "[job %d]   => weight multiplicity = %d (coeff = %d).",
+                job_id,
+                weight_mul,
+                coeff,
+            )
+            coordinator.complete(worker_id, job_id, index, weight_mul, seconds)
+            idle_since = time.monotonic()
+    except (EOFError, ConnectionError):
+        logging.info("Lost connection to coordinator.")
+    evaluator.close()
+    if trace:
+        tracer.close()
+
+
+def format_partitions(partitions):
+    return " ".join("[%s]" % ",".join(map(str, p)) for p in partitions)
+
+
+@main.command()
+@click.argument(
+    "partitions",
+    metavar="[\u03bb \u03bc \u03bd ...]",
+    nargs=-1,
+    type=WeightParamType(),
+)
+@click.option("-H", "--host", required=True, help="Hostname of coordinator.")
+@click.option(
+    "-P",
+    "--port",
+    type=int,
+    default=DEFAULT_PORT,
+    help="Port to connect to for communication with coordinator.",
+)
+@click.option(
+    "-K",
+    "--authkey",
+    required=True,
+    help="Secret authentication key for communication with coordinator.",
+)
+@click.option(
+    "-f",
+    "--file",
+    "jobs_file",
+    type=click.File("r"),
+    help="File with one job per line, given by partitions separated by spaces (- for stdin).",
+)
+@click.option(
+    "--weight-multiplicity",
+    is_flag=True,
+    help="Compute weight multiplicities instead of Kronecker coefficients.",
+)
+@click.option("-v", "--verbose", is_flag=True)
+def submit(partitions, host, port, authkey, jobs_file, weight_multiplicity, verbose):
+    """
+    Submit Kronecker coefficients g(\u03bb,\u03bc,\u03bd,...) to a coordinator, and print
+    each one as soon as it has been computed (in the form "\u03bb \u03bc \u03bd ...: g").
+    """
+    if verbose:
+        enable_logging()
+
+    jobs = [list(partitions)] if partitions else []
+    if jobs_file:
+        param = WeightParamType()
+        for line in jobs_file:
+            if line.strip() and not line.startswith("#"):
+                jobs.append([param.convert(p, None, None) for p in line.split()])
+    if not jobs:
+        raise click.UsageError("Specify partitions or --file.")
+
+    coordinator = connect(host, port, authkey, "coordinator")
+    pending = {coordinator.submit(p, weight_multiplicity): p for p in jobs}
+    logging.info("Submitted %d jobs.", len(pending))
+
+    # stream results as they arrive
+    while pending:
+        for job_id, value in coordinator.wait(list(pending), PROGRESS_INTERVAL):
+            click.echo("%s: %d" % (format_partitions(pending.pop(job_id)), value))
+            coordinator.forget(job_id)
+        logging.info("%d jobs pending.", len(pending))
 
 
 if __name__ == "__main__":
@@ -1,72 +1,128 @@
-import sys
+import asyncio, sys
 import click
 from .. import (
-    BarvinokEvaluator,
-    LatteEvaluator,
     kronecker_weight_multiplicity,
     kronecker,
-    default_evaluator,
+    kronecker_async,
     NoEvaluatorFound,
+    CostModel,
+    kronecker_stretched,
+    Tracer,
+    TracingEvaluator,
+)
+from . import (
+    WeightParamType,
+    enable_logging,
+    evaluator_options,
+    create_evaluator,
+    NO_EVALUATOR_MESSAGE,
 )
-from . import WeightParamType, enable_logging
 
 
 @click.command()
 @click.argument(
     "partitions",
-    metavar="\u03BB \u03BC \u03BD ...",
+    metavar="\u03bb \u03bc \u03bd ...",
     nargs=-1,
     required=True,
     type=WeightParamType(),
 )
+@evaluator_options
 @click.option(
-    "--barvinok",
+    "--parametric",
     metavar="PATH",
-    help="Path to barvinok_count tool (see http://barvinok.gforge.inria.fr/).",
+    help="Path to barvinok's iscc tool, used to compute the parametric vector partition function once (the other backends serve as fallback).",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    default=1,
+    help="Number of weight multiplicities to compute concurrently.",
 )
 @click.option(
-    "--latte",
+    "--timings",
     metavar="PATH",
-    help="Path to LattE's count tool (see https://www.math.ucdavis.edu/~latte/).",
+    help="Path to file of recorded evaluation times, used to calibrate the cost model that decides which weight multiplicities to start first when computing concurrently.",
+)
+@click.option(
+    "--stretch",
+    type=int,
+    metavar="N",
+    help="Compute g(N\u03bb,N\u03bc,N\u03bd,...) by interpolating the coefficients for small N.",
 )
 @click.option(
     "--weight-multiplicity",
     is_flag=True,
     help="Compute weight multiplicity instead of Kronecker coefficient.",
 )
+@click.option(
+    "--trace",
+    metavar="PATH",
+    help="Path to file to which a JSON record is appended for each evaluation, followed by a summary.",
+)
 @click.option("-v", "--verbose", is_flag=True)
-def main(partitions, weight_multiplicity, barvinok, latte, verbose):
+def main(
+    partitions,
+    weight_multiplicity,
+    barvinok,
+    iscc,
+    latte,
+    native,
+    race,
+    cross_check,
+    parametric,
+    scratch,
+    cache,
+    jobs,
+    timings,
+    stretch,
+    trace,
+    verbose,
+):
     """
-    Compute (generalized) Kronecker coefficient g(\u03BB,\u03BC,\u03BD,...).
+    Compute (generalized) Kronecker coefficient g(\u03bb,\u03bc,\u03bd,...).
     """
     # enable verbose mode?
     if verbose:
         enable_logging()
 
     # instantiate evaluator
-    if barvinok and latte:
-        click.echo("Specify either --barvinok or --latte (but not both).", err=True)
-        sys.exit(1)
+    evaluator = create_evaluator(
+        barvinok,
+        iscc,
+        latte,
+        native,
+        scratch,
+        race,
+        cross_check,
+        cache,
+        parametric=parametric,
+        sessions=jobs,
+    )
 
-    if barvinok:
-        evaluator = BarvinokEvaluator(barvinok)
-    elif latte:
-        evaluator = LatteEvaluator(latte)
-    else:
-        try:
-            evaluator = default_evaluator()
-        except NoEvaluatorFound:
-            click.echo(
-                "No partition function evaluator found. Specify --barvinok or --latte option.",
-                err=True,
-            )
-            sys.exit(1)
+    # trace evaluations?
+    if trace:
+        tracer = Tracer(trace)
+        evaluator = TracingEvaluator(evaluator, tracer)
 
     # compute Kronecker coefficient
-    if weight_multiplicity:
-        g = kronecker_weight_multiplicity(partitions, evaluator)
-    else:
-        g = kronecker(partitions, evaluator)
+    try:
+        if weight_multiplicity:
+            g = kronecker_weight_multiplicity(partitions, evaluator)
+        elif stretch is not None:
+            g = kronecker_stretched(partitions, evaluator)(stretch)
+        elif jobs > 1:
+            cost_model = CostModel.load(timings) if timings else None
+            g = asyncio.run(kronecker_async(partitions, evaluator, jobs, cost_model))
+        else:
+            g = kronecker(partitions, evaluator)
+    except NoEvaluatorFound:
+        click.echo(NO_EVALUATOR_MESSAGE, err=True)
+        sys.exit(1)
+    evaluator.close()
+    if trace:
+        tracer.close()
     click.echo(g)
 
 
@@ -0,0 +1,209 @@
+import collections, itertools, logging, threading
+from .costmodel import CostModel
+from .dispatch import Dispatcher, DEFAULT_LEASE_TIMEOUT
+from .kronecker import (
+    flatten_weight,
+    prune_terms,
+    trivial_weight_multiplicity,
+    prepare_kronecker,
+    finite_difference_terms,
+)
+from .normalize import normalize_weight
+
+__all__ = ["Coordinator", "UnknownJob"]
+
+
+class UnknownJob(Exception):
+    pass
+
+
+def job_terms(partitions, weight_multiplicity=False, shortcuts=True):
+    """
+    Return (dims,g0,terms) such that the Kronecker coefficient (or weight multiplicity) is
+    g0 plus the sum of coeff * weight multiplicity over the (coeff,weight)'s in terms, where
+    the weight multiplicities are for the given dims (which are those of the normalized
+    partitions or weight). Terms is empty if the Kronecker coefficient is known directly
+    (see prepare_kronecker).
+    """
+    if weight_multiplicity:
+        dims = list(map(len, partitions))
+        if len(set(map(sum, partitions))) > 1:
+            return dims, 0, []
+        g0 = trivial_weight_multiplicity(dims, flatten_weight(partitions))
+        if g0 is not None:
+            return dims, g0, []
+        omega = normalize_weight(partitions)
+        dims = list(map(len, omega))
+        return (dims,) + prune_terms(dims, [(1, flatten_weight(omega))])
+    g, partitions = prepare_kronecker(partitions, shortcuts)
+    dims = list(map(len, partitions))
+    if g is not None:
+        return dims, g, []
+    return (dims,) + finite_difference_terms(partitions)
+
+
+class Job(object):
+    def __init__(self, id, partitions, dims, weight_multiplicity, g0, dispatcher):
+        self.id = id
+        self.partitions = partitions
+        self.dims = dims
+        self.weight_multiplicity = weight_multiplicity
+        self.g0 = g0
+        self.dispatcher = dispatcher
+        self.value = None
+
+    def __repr__(self):
+        return "<Job(%d, %s)>" % (self.id, self.partitions)
+
+
+class Coordinator(object):
+    """
+    Compute many Kronecker coefficients (or weight multiplicities) on a shared pool of
+    workers. Clients submit jobs and wait for their results, while workers lease work items
+    (weight multiplicities) of any job.
+
+    Each job has its own Dispatcher, so leases, heartbeats and cost-based ordering work as
+    for a single computation. Work items are handed out round-robin across the jobs, so
+    that small jobs are not stuck behind large ones. Unless shortcuts is False, Kronecker
+    coefficients that can be computed directly (see kronecker_shortcut) are finished when
+    they are submitted.
+    """
+
+    def __init__(
+        self, lease_timeout=DEFAULT_LEASE_TIMEOUT, cost_model=None, shortcuts=True
+    ):
+        self.lease_timeout = lease_timeout
+        self.cost_model = cost_model or CostModel()
+        self.shortcuts = shortcuts
+        self.jobs = {}
+        self.active = collections.deque()
+        self.ids = itertools.count(1)
+        self.lock = threading.Condition()
+
+    def submit(self, partitions, weight_multiplicity=False):
+        """
+        Submit job and return its id.
+        """
+        partitions = [list(map(int, p)) for p in partitions]
+        dims, g0, terms = job_terms(partitions, weight_multiplicity, self.shortcuts)
+        costs = [self.cost_model.predict(dims, weight) for _, weight in terms]
+        dispatcher = Dispatcher(terms, self.lease_timeout, costs=costs)
+        with self.lock:
+            job = Job(
+                next(self.ids), partitions, dims, weight_multiplicity, g0, dispatcher
+            )
+            self.jobs[job.id] = job
+            logging.info(
+                "Job %d: %s with %d work items.",
+                job.id,
+                job.partitions,
+                len(dispatcher.items),
+            )
+            if dispatcher.finished():
+                self.finish(job)
+            else:
+                self.active.append(job.id)
+            return job.id
+
+    def finish(self, job):
+        with self.lock:
+            job.value = job.g0 + job.dispatcher.total()
+            job.dispatcher.close()
+            if job.id in self.active:
+                self.active.remove(job.id)
+            logging.info("Job %d: %s = %d.", job.id, job.partitions, job.value)
+            self.lock.notify_all()
+
+    def lease(self, worker):
+        """
+        Lease next work item to the given worker and return (job,dims,index,coeff,weight),
+        or None if no work item is currently available.
+        """
+        with self.lock:
+            for _ in range(len(self.active)):
+                job = self.jobs[self.active[0]]
+                self.active.rotate(-1)
+                item = job.dispatcher.lease(worker)
+                if item is not None:
+                    index, _, coeff, weight = item
+                    return job.id, job.dims, index, coeff, weight
+            return None
+
+    def heartbeat(self, worker):
+        """
+        Renew all leases held by the given worker.
+        """
+        with self.lock:
+            for job_id in self.active:
+                self.jobs[job_id].dispatcher.heartbeat(worker)
+
+    def complete(self, worker, job_id, index, weight_mul, seconds=None):
+        """
+        Record weight multiplicity computed for the given work item.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.value is not None:
+                # late result for a job that has been finished (and possibly forgotten)
+                return
+            job.dispatcher.complete(worker, index, weight_mul, seconds)
+            if job.dispatcher.finished():
+                self.finish(job)
+
+    def job(self, job_id):
+        try:
+            return self.jobs[job_id]
+        except KeyError:
+            raise UnknownJob("Unknown job %s." % job_id)
+
+    def result(self, job_id):
+        """
+        Return result of the given job, or None if it has not finished yet.
+        """
+        with self.lock:
+            return self.job(job_id).value
+
+    def wait(self, job_ids, timeout):
+        """
+        Wait until one of the given jobs has finished or the timeout has passed, and return
+        the list of (job,value)'s of all given jobs that have finished.
+        """
+        with self.lock:
+            jobs = [self.job(job_id) for job_id in job_ids]
+            self.lock.wait_for(
+                lambda: any(job.value is not None for job in jobs), timeout
+            )
+            return [(job.id, job.value) for job in jobs if job.value is not None]
+
+    def forget(self, job_id):
+        """
+        Discard a finished job (after its result has been retrieved).
+        """
+        with self.lock:
+            job = self.job(job_id)
+            assert job.value is not None, "Job %d has not finished yet." % job_id
+            del self.jobs[job_id]
+
+    def progress(self, job_id):
+        with self.lock:
+            job = self.job(job_id)
+            if job.value is not None:
+                return "Job %d: finished" % job_id
+            return "Job %d: %s" % (job_id, job.dispatcher.progress())
+
+    def status(self):
+        """
+        Return a line describing the state of all jobs.
+        """
+        with self.lock:
+            pending = leased = 0
+            for job_id in self.active:
+                dispatcher = self.jobs[job_id].dispatcher
+                pending += len(dispatcher.pending)
+                leased += len(dispatcher.leases)
+            return "%d jobs (%d running), %d work items pending, %d leased" % (
+                len(self.jobs),
+                len(self.active),
+                pending,
+                leased,
+            )
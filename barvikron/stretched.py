@@ -0,0 +1,158 @@
+import logging
+from fractions import Fraction
+import numpy as np
+from . import kronecker, kronecker_weight_vpn
+
+__all__ = [
+    "QuasiPolynomial",
+    "fit_quasi_polynomial",
+    "kronecker_stretched",
+    "StretchingNotDetermined",
+]
+
+# default number of periods that are tried when fitting a quasi-polynomial
+DEFAULT_MAX_PERIOD = 6
+
+
+class StretchingNotDetermined(Exception):
+    pass
+
+
+class QuasiPolynomial(object):
+    """
+    Quasi-polynomial N -> sum_k coefficients[N % period][k] * N^k with rational coefficients.
+    """
+
+    def __init__(self, coefficients):
+        self.coefficients = [[Fraction(c) for c in poly] for poly in coefficients]
+        self.period = len(self.coefficients)
+
+    @property
+    def degree(self):
+        return max(len(poly) for poly in self.coefficients) - 1
+
+    def exact(self, N):
+        poly = self.coefficients[N % self.period]
+        return sum(c * N**k for k, c in enumerate(poly))
+
+    def __call__(self, N):
+        value = self.exact(N)
+        assert value.denominator == 1, "Non-integral value %s at N = %d." % (value, N)
+        return int(value)
+
+    def __str__(self):
+        def polynomial(poly):
+            monomials = {0: "%s", 1: "%s*N"}
+            terms = [
+                monomials.get(k, "%%s*N^%d" % k) % c
+                for k, c in reversed(list(enumerate(poly)))
+                if c
+            ]
+            return " + ".join(terms) or "0"
+
+        if self.period == 1:
+            return polynomial(self.coefficients[0])
+        return "; ".join(
+            "%s if N %% %d == %d" % (polynomial(poly), self.period, r)
+            for r, poly in enumerate(self.coefficients)
+        )
+
+    def __repr__(self):
+        return "<QuasiPolynomial(%s)>" % self
+
+
+def interpolate(points):
+    """
+    Return the coefficients of the unique polynomial of degree < len(points) through the
+    given (x,y)'s, using exact rational arithmetic.
+    """
+    coefficients = [Fraction(0)] * len(points)
+    for i, (x_i, y_i) in enumerate(points):
+        # expand y_i * prod_{j != i} (x - x_j) / (x_i - x_j)
+        basis = [Fraction(y_i)]
+        for j, (x_j, _) in enumerate(points):
+            if j != i:
+                scale = Fraction(1, x_i - x_j)
+                basis = [
+                    scale
+                    * (
+                        (basis[k - 1] if k > 0 else 0)
+                        - x_j * (basis[k] if k < len(basis) else 0)
+                    )
+                    for k in range(len(basis) + 1)
+                ]
+        for k, c in enumerate(basis):
+            coefficients[k] += c
+    return coefficients
+
+
+def fit_quasi_polynomial(values, degree, period):
+    """
+    Fit quasi-polynomial of given degree and period to the smallest degree+1 sample points
+    of each residue class in values (a dictionary N -> value), and return it if it agrees
+    with all other sample points (otherwise, None).
+    """
+    coefficients = []
+    for r in range(period):
+        points = sorted((N, y) for N, y in values.items() if N % period == r)
+        if len(points) < degree + 1:
+            return None
+        coefficients.append(interpolate(points[: degree + 1]))
+    f = QuasiPolynomial(coefficients)
+    if all(f.exact(N) == y for N, y in values.items()):
+        return f
+    return None
+
+
+def kronecker_stretched(
+    partitions,
+    evaluator,
+    max_degree=None,
+    max_period=DEFAULT_MAX_PERIOD,
+    verify=2,
+    shortcuts=True,
+):
+    """
+    Determine the quasi-polynomial N -> g(N*partitions) that computes stretched Kronecker
+    coefficients.
+
+    The Kronecker coefficients are computed for N = 1, 2, ... until some quasi-polynomial
+    (of degree at most max_degree and period at most max_period) fits all values, with at
+    least verify values in each residue class that were not used for fitting. Candidates
+    with fewer coefficients are preferred. The degree is at most the dimension of the
+    polytopes whose lattice points are counted, which is used if max_degree is not given.
+    The shortcuts argument is passed on to kronecker.
+    """
+    dims = list(map(len, partitions))
+    if max_degree is None:
+        A = kronecker_weight_vpn(dims).A
+        max_degree = A.shape[1] - np.linalg.matrix_rank(A.astype(float))
+    candidates = sorted(
+        (
+            (degree, period)
+            for degree in range(max_degree + 1)
+            for period in range(1, max_period + 1)
+        ),
+        key=lambda dp: (dp[1] * (dp[0] + 1), dp[0]),
+    )
+
+    values = {}
+    max_N = max_period * (max_degree + 1 + verify)
+    for N in range(1, max_N + 1):
+        values[N] = kronecker(
+            [[N * x for x in p] for p in partitions], evaluator, shortcuts
+        )
+        logging.info("g(%d * partitions) = %d", N, values[N])
+
+        # is there a quasi-polynomial that has been verified on sufficiently many values?
+        for degree, period in candidates:
+            if N >= period * (degree + 1 + verify):
+                f = fit_quasi_polynomial(values, degree, period)
+                if f:
+                    logging.info("Stretching quasi-polynomial: %s", f)
+                    return f
+
+    raise StretchingNotDetermined(
+        "No quasi-polynomial of degree <= %d and period <= %d fits g(N * partitions) for N <= %d."
+        % (max_degree, max_period, max_N)
+    )
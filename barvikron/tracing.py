@@ -0,0 +1,227 @@
+import contextlib, contextvars, json, logging, os, resource, socket, threading, time
+from collections import defaultdict
+from .parfun import EvaluatorBase
+
+__all__ = ["Tracer", "TracingEvaluator", "annotate", "span", "record", "percentiles"]
+
+# fields attached to all records emitted in the current context (e.g., dims)
+annotations = contextvars.ContextVar("annotations", default={})
+
+# record of the evaluation that is currently being traced (or None)
+current_record = contextvars.ContextVar("current_record", default=None)
+
+
+@contextlib.contextmanager
+def annotate(**fields):
+    """
+    Context manager that attaches the given fields to all records emitted inside of it.
+    """
+    token = annotations.set(dict(annotations.get(), **fields))
+    try:
+        yield
+    finally:
+        annotations.reset(token)
+
+
+@contextlib.contextmanager
+def span(name):
+    """
+    Context manager that adds the time spent inside of it to the given phase of the
+    evaluation that is currently being traced (if any).
+    """
+    rec = current_record.get()
+    if rec is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = rec.setdefault("phases", {})
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def record(**fields):
+    """
+    Add fields to the record of the evaluation that is currently being traced (if any).
+    Numeric fields starting with "bytes" are accumulated.
+    """
+    rec = current_record.get()
+    if rec is None:
+        return
+    for key, value in fields.items():
+        if key.startswith("bytes"):
+            rec[key] = rec.get(key, 0) + value
+        else:
+            rec[key] = value
+
+
+def percentiles(values, ps=(50, 90, 99)):
+    """
+    Return dictionary of the given percentiles of values (nearest-rank method).
+    """
+    values = sorted(values)
+    if not values:
+        return {}
+    return {"p%d" % p: values[max(0, -(-p * len(values) // 100) - 1)] for p in ps}
+
+
+class Tracer(object):
+    """
+    Write one JSON record per traced evaluation to a file (JSON lines), and a summary with
+    percentiles of the wall times and the utilisation of each worker when closed.
+
+    Several processes can append to the same file, since each record is written at once.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, "a")
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.wall_times = []
+        self.busy = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def emit(self, rec):
+        with self.lock:
+            self.f.write(json.dumps(rec, default=int) + "\n")
+            self.f.flush()
+            if "wall" in rec:
+                self.wall_times.append(rec["wall"])
+                self.busy[rec.get("worker")] += rec["wall"]
+                self.counts[rec.get("worker")] += 1
+
+    def summary(self):
+        """
+        Return summary of the evaluations traced so far.
+        """
+        elapsed = time.time() - self.start_time
+        return {
+            "evaluations": len(self.wall_times),
+            "elapsed": elapsed,
+            "wall": dict(
+                percentiles(self.wall_times),
+                total=sum(self.wall_times),
+                max=max(self.wall_times, default=0.0),
+            ),
+            "workers": {
+                str(worker): {
+                    "evaluations": self.counts[worker],
+                    "busy": busy,
+                    "utilisation": busy / elapsed if elapsed else 0.0,
+                }
+                for worker, busy in self.busy.items()
+            },
+        }
+
+    def close(self):
+        summary = self.summary()
+        logging.info("Trace summary: %s", json.dumps(summary))
+        with self.lock:
+            self.f.write(json.dumps({"summary": summary}) + "\n")
+            self.f.close()
+        return summary
+
+
+def worker_id():
+    return "%s:%d" % (socket.gethostname(), os.getpid())
+
+
+class TracingEvaluator(EvaluatorBase):
+    """
+    Evaluate vector partition functions using another evaluator, and emit a record for each
+    evaluation to the given Tracer.
+
+    Each record contains the annotations of the current context (see annotate), the weight,
+    the backend, the wall and CPU time, the CPU time and peak RSS of child processes, the
+    time spent in each phase (see span), and further fields set by the evaluators (see record),
+    such as bytes_in, bytes_out and cache. Resource usage of child processes is measured
+    process-wide, so it is only accurate if evaluations do not overlap.
+
+    Concurrent evaluations (e.g., barvikron -j N) are attributed to separate slots of the
+    worker ("<worker>#<slot>"), so that the utilisation of each slot is at most one.
+    """
+
+    def __init__(self, evaluator, tracer, worker=None):
+        self.evaluator = evaluator
+        self.tracer = tracer
+        self.worker = worker or worker_id()
+        self.lock = threading.Lock()
+        self.busy_slots = set()
+
+    def acquire_slot(self):
+        with self.lock:
+            slot = 0
+            while slot in self.busy_slots:
+                slot += 1
+            self.busy_slots.add(slot)
+            return slot
+
+    def release_slot(self, slot):
+        with self.lock:
+            self.busy_slots.discard(slot)
+
+    def begin(self, vpn, b, slot):
+        rec = dict(annotations.get())
+        rec.update(
+            weight=[int(x) for x in b],
+            backend=str(self.evaluator),
+            worker="%s#%d" % (rec.get("worker", self.worker), slot),
+        )
+        if "dims" not in rec and hasattr(vpn, "dims"):
+            # partition functions of weight multiplicities know their dims
+            rec["dims"] = vpn.dims
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = (
+            time.perf_counter(),
+            time.process_time(),
+            children.ru_utime + children.ru_stime,
+        )
+        return rec, start
+
+    def end(self, rec, start, value):
+        wall, cpu, child_cpu = start
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        rec.update(
+            value=value,
+            wall=time.perf_counter() - wall,
+            cpu=time.process_time() - cpu,
+            child_cpu=children.ru_utime + children.ru_stime - child_cpu,
+            child_maxrss_kb=children.ru_maxrss,
+        )
+        self.tracer.emit(rec)
+
+    def eval(self, vpn, b):
+        slot = self.acquire_slot()
+        try:
+            rec, start = self.begin(vpn, b, slot)
+            token = current_record.set(rec)
+            try:
+                value = self.evaluator.eval(vpn, b)
+            finally:
+                current_record.reset(token)
+            self.end(rec, start, value)
+        finally:
+            self.release_slot(slot)
+        return value
+
+    async def eval_async(self, vpn, b):
+        slot = self.acquire_slot()
+        try:
+            rec, start = self.begin(vpn, b, slot)
+            token = current_record.set(rec)
+            try:
+                value = await self.evaluator.eval_async(vpn, b)
+            finally:
+                current_record.reset(token)
+            self.end(rec, start, value)
+        finally:
+            self.release_slot(slot)
+        return value
+
+    def close(self):
+        self.evaluator.close()
+
+    def __str__(self):
+        return "traced[%s]" % self.evaluator
@@ -0,0 +1,42 @@
+import logging
+
+__all__ = ["is_two_row", "two_row_kronecker"]
+
+
+def is_two_row(partitions):
+    """
+    Check whether partitions consists of three partitions with at most two rows each.
+    """
+    return len(partitions) == 3 and all(sum(1 for x in p if x) <= 2 for p in partitions)
+
+
+def two_row_kronecker(partitions):
+    """
+    Compute Kronecker coefficient g(lambda,mu,nu) of three partitions with at most two rows
+    in closed form.
+
+    Write lambda = (n-p,p), mu = (n-q,q), nu = (n-r,r). By Cauchy's formula, g is the
+    multiplicity of S_mu(C^2) x S_nu(C^2) in S_lambda(C^2 x C^2) restricted to
+    GL(2) x GL(2). Restricting S_lambda(C^4) to O(4) using Littlewood's branching rule (valid
+    as lambda has at most two rows) and then to SO(4) = SL(2) x SL(2) (up to a cover), one
+    finds that g is the number of integers t with 0 <= 2t <= m = min(q,r) for which
+    k = p - |q-r| - 2t satisfies 0 <= k <= min(2m - 4t, n - q - r - |q-r|) (the Clebsch-Gordan
+    condition for the Littlewood-Richardson coefficient c^lambda_{(2m-2t,2t),(n-q-r,|q-r|)}).
+    """
+    assert is_two_row(partitions), "Expected three partitions with at most two rows."
+    sizes = set(map(sum, partitions))
+    if len(sizes) > 1:
+        return 0
+    (n,) = sizes
+    rows = [list(map(int, partition)) + [0, 0] for partition in partitions]
+    assert all(
+        row == sorted(row, reverse=True) for row in rows
+    ), "Highest weight should be dominant."
+    p, q, r = (row[1] for row in rows)
+
+    m = min(q, r)
+    d = abs(q - r)
+    lo = max(0, -(-(p + q + r - n) // 2))
+    hi = min(m // 2, (p - d) // 2, (2 * m - p + d) // 2)
+    logging.info("Computed two-row Kronecker coefficient in closed form.")
+    return max(0, hi - lo + 1)
@@ -0,0 +1,258 @@
+import asyncio, hashlib, hmac, logging, os, socket, struct, threading
+
+__all__ = ["WireServer", "WireClient", "AuthenticationFailed"]
+
+# message types
+HELLO, LEASE, ITEMS, COMPLETE, HEARTBEAT, FINISHED = range(1, 7)
+
+# length of the challenges used for authentication
+CHALLENGE_SIZE = 32
+
+# frames larger than this are rejected
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+class AuthenticationFailed(Exception):
+    pass
+
+
+def encode_ints(ints):
+    """
+    Encode sequence of (arbitrarily large) integers using zigzag LEB128 varints.
+    """
+    out = bytearray()
+    for n in ints:
+        z = 2 * n if n >= 0 else -2 * n - 1
+        while z >= 0x80:
+            out.append((z & 0x7F) | 0x80)
+            z >>= 7
+        out.append(z)
+    return bytes(out)
+
+
+def decode_ints(data):
+    """
+    Decode bytes produced by encode_ints into a list of integers.
+    """
+    ints = []
+    z = shift = 0
+    for byte in data:
+        z |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            ints.append(z >> 1 if not z & 1 else -(z >> 1) - 1)
+            z = shift = 0
+    assert shift == 0, "Truncated integer."
+    return ints
+
+
+def frame(kind, payload=b""):
+    return struct.pack(">IB", len(payload) + 1, kind) + payload
+
+
+def respond(authkey, challenge):
+    return hmac.new(authkey, challenge, hashlib.sha256).digest()
+
+
+class WireServer(object):
+    """
+    Serve a Dispatcher to workers (see WireClient) over TCP, using an asyncio event loop in
+    a background thread.
+
+    Messages are length-prefixed frames consisting of a type byte and a payload of varint
+    integers (indices, coefficients, weights and weight multiplicities). Both sides prove
+    knowledge of the authentication key by answering a random challenge with its HMAC.
+    Idle connections only cost a suspended coroutine each. The dispatcher is called
+    directly, except for completions that are written to its journal, which are handed to a
+    worker thread, so that the event loop is not blocked by disk I/O.
+    """
+
+    def __init__(self, dispatcher, authkey, host="", port=0):
+        self.dispatcher = dispatcher
+        self.authkey = authkey
+        self.host = host
+        self.port = port
+        self.num_connections = 0
+        # tasks handling the open connections, with their writers
+        self.connections = {}
+        self.started = threading.Event()
+
+    def start(self):
+        """
+        Start serving in a background thread, and return the port.
+        """
+        self.thread = threading.Thread(
+            target=asyncio.run, args=(self.serve(),), daemon=True
+        )
+        self.thread.start()
+        self.started.wait()
+        return self.port
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        self.server = await asyncio.start_server(
+            self.handle, self.host or None, self.port
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.started.set()
+        async with self.server:
+            await self.stopping.wait()
+
+            # close connections, and let their handlers finish (rather than cancel them)
+            self.server.close()
+            for writer in list(self.connections.values()):
+                writer.close()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+
+    def close(self):
+        """
+        Stop serving, close all connections and wait until the background thread has
+        finished (so that the dispatcher is no longer used).
+        """
+        self.loop.call_soon_threadsafe(self.stopping.set)
+        self.thread.join()
+
+    async def authenticate(self, reader, writer):
+        challenge = os.urandom(CHALLENGE_SIZE)
+        writer.write(challenge)
+        response = await reader.readexactly(CHALLENGE_SIZE)
+        if not hmac.compare_digest(response, respond(self.authkey, challenge)):
+            raise AuthenticationFailed("Client failed to authenticate.")
+        challenge = await reader.readexactly(CHALLENGE_SIZE)
+        writer.write(respond(self.authkey, challenge))
+
+    async def handle(self, reader, writer):
+        self.num_connections += 1
+        self.connections[asyncio.current_task()] = writer
+        peer = writer.get_extra_info("peername")
+        worker = str(peer)
+        try:
+            await self.authenticate(reader, writer)
+            while True:
+                (size,) = struct.unpack(">I", await reader.readexactly(4))
+                if not 0 < size <= MAX_FRAME_SIZE:
+                    raise ValueError("Invalid frame size %d." % size)
+                data = await reader.readexactly(size)
+                kind, payload = data[0], data[1:]
+                if kind == HELLO:
+                    worker = payload.decode("utf-8")
+                elif kind == LEASE:
+                    (n,) = decode_ints(payload)
+                    items = self.dispatcher.lease_many(worker, n)
+                    ints = [len(self.dispatcher.items), len(items)]
+                    for index, _, coeff, weight in items:
+                        ints += [index, coeff, len(weight)]
+                        ints += weight
+                    writer.write(frame(ITEMS, encode_ints(ints)))
+                elif kind == COMPLETE:
+                    ints = decode_ints(payload)
+                    results = [
+                        (index, value, micros / 1e6 if micros >= 0 else None)
+                        for index, value, micros in zip(
+                            ints[::3], ints[1::3], ints[2::3]
+                        )
+                    ]
+                    if self.dispatcher.journal:
+                        await asyncio.to_thread(
+                            self.dispatcher.complete_many, worker, results
+                        )
+                    else:
+                        self.dispatcher.complete_many(worker, results)
+                elif kind == HEARTBEAT:
+                    self.dispatcher.heartbeat(worker)
+                elif kind == FINISHED:
+                    writer.write(
+                        frame(FINISHED, encode_ints([self.dispatcher.finished()]))
+                    )
+                else:
+                    raise ValueError("Unknown message type %d." % kind)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (AuthenticationFailed, ValueError, AssertionError) as err:
+            logging.warning("Closing connection from %s: %s", peer, err)
+        finally:
+            self.num_connections -= 1
+            del self.connections[asyncio.current_task()]
+            writer.close()
+
+
+class WireClient(object):
+    """
+    Connect to a WireServer. Offers the methods of Dispatcher that are used by workers,
+    so it can be used in place of a proxy of the dispatcher. The worker is identified by
+    the name given when connecting (the worker arguments of the methods are ignored).
+    """
+
+    def __init__(self, host, port, authkey, worker):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.lock = threading.Lock()
+        self.authenticate(authkey)
+        self.send(HELLO, worker.encode("utf-8"))
+
+    def recv_exactly(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise EOFError("Connection closed by server.")
+            data += chunk
+        return data
+
+    def authenticate(self, authkey):
+        challenge = self.recv_exactly(CHALLENGE_SIZE)
+        self.sock.sendall(respond(authkey, challenge))
+        challenge = os.urandom(CHALLENGE_SIZE)
+        self.sock.sendall(challenge)
+        try:
+            response = self.recv_exactly(CHALLENGE_SIZE)
+        except EOFError:
+            raise AuthenticationFailed("Server rejected authentication key.")
+        if not hmac.compare_digest(response, respond(authkey, challenge)):
+            raise AuthenticationFailed("Server failed to authenticate.")
+
+    def send(self, kind, payload=b""):
+        with self.lock:
+            self.sock.sendall(frame(kind, payload))
+
+    def request(self, kind, payload=b""):
+        with self.lock:
+            self.sock.sendall(frame(kind, payload))
+            (size,) = struct.unpack(">I", self.recv_exactly(4))
+            data = self.recv_exactly(size)
+        assert data[0] == (ITEMS if kind == LEASE else kind)
+        return decode_ints(data[1:])
+
+    def lease_many(self, worker, n):
+        ints = self.request(LEASE, encode_ints([n]))
+        total, count = ints[:2]
+        items, pos = [], 2
+        for _ in range(count):
+            index, coeff, length = ints[pos : pos + 3]
+            items.append((index, total, coeff, tuple(ints[pos + 3 : pos + 3 + length])))
+            pos += 3 + length
+        return items
+
+    def lease(self, worker):
+        items = self.lease_many(worker, 1)
+        return items[0] if items else None
+
+    def complete_many(self, worker, results):
+        ints = []
+        for index, weight_mul, seconds in results:
+            ints += [index, weight_mul, -1 if seconds is None else int(seconds * 1e6)]
+        self.send(COMPLETE, encode_ints(ints))
+
+    def complete(self, worker, index, weight_mul, seconds=None):
+        self.complete_many(worker, [(index, weight_mul, seconds)])
+
+    def heartbeat(self, worker):
+        self.send(HEARTBEAT)
+
+    def finished(self):
+        return bool(self.request(FINISHED)[0])
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,82 @@
+import atexit, contextlib, logging, os, shutil, tempfile, threading
+
+__all__ = ["Workspaces", "default_scratch_root"]
+
+
+def default_scratch_root():
+    """
+    Return directory in which scratch directories are created: $BARVIKRON_SCRATCH if set,
+    otherwise /dev/shm (if available), otherwise the system's temporary directory.
+    """
+    if os.environ.get("BARVIKRON_SCRATCH"):
+        return os.environ["BARVIKRON_SCRATCH"]
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK | os.X_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+class Workspaces(object):
+    """
+    Pool of private scratch directories, so that concurrent runs of external tools that
+    write fixed-name files into their working directory do not interfere.
+
+    A directory is handed out to one evaluation at a time. When the evaluation finishes
+    (successfully or not), its contents are removed and the directory is kept for reuse.
+    All directories are removed by close() or when the interpreter exits.
+    """
+
+    def __init__(self, root=None, prefix="barvikron-"):
+        self.root = root or default_scratch_root()
+        self.prefix = "%s%d-" % (prefix, os.getpid())
+        self.idle = []
+        self.all = []
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """
+        Context manager that yields an empty scratch directory.
+        """
+        with self.lock:
+            path = self.idle.pop() if self.idle else None
+        if path is None:
+            os.makedirs(self.root, exist_ok=True)
+            path = tempfile.mkdtemp(prefix=self.prefix, dir=self.root)
+            logging.debug("Created scratch directory %s.", path)
+            with self.lock:
+                self.all.append(path)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def release(self, path):
+        # empty directory so that it can be reused (and does not occupy memory on a tmpfs)
+        try:
+            for name in os.listdir(path):
+                child = os.path.join(path, name)
+                if os.path.isdir(child) and not os.path.islink(child):
+                    shutil.rmtree(child)
+                else:
+                    os.remove(child)
+        except OSError as err:
+            logging.warning("Could not clean up scratch directory %s (%s).", path, err)
+            shutil.rmtree(path, ignore_errors=True)
+            with self.lock:
+                self.all.remove(path)
+            return
+        with self.lock:
+            self.idle.append(path)
+
+    def close(self):
+        with self.lock:
+            paths, self.all, self.idle = self.all, [], []
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def __len__(self):
+        return len(self.all)
+
+    def __repr__(self):
+        return "<Workspaces(%s, %d directories)>" % (self.root, len(self.all))
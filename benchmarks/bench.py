@@ -0,0 +1,324 @@
+"""
+Benchmarks for the hot paths of barvikron.
+
+External counting tools are replaced by fake_barvinok_count, which answers every query
+immediately, so that the benchmarks measure the overhead of barvikron itself and run
+without barvinok or LattE. Results are written as JSON and compared against a baseline:
+
+    python benchmarks/bench.py --output results.json --baseline benchmarks/baseline.json
+"""
+
+import functools, json, os, platform, socket, subprocess, sys, time, timeit
+import click
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+import barvikron
+from barvikron import (
+    BarvinokEvaluator,
+    Dispatcher,
+    WireClient,
+    WireServer,
+    character_kronecker,
+    kronecker_table,
+    finite_differences,
+    flatten_weight,
+    kronecker,
+    kronecker_weight_vpn,
+    positive_roots,
+    weyl_finite_differences,
+)
+from barvikron import barvinok, latte
+
+FAKE_BARVINOK_COUNT = os.path.join(HERE, "fake_barvinok_count")
+
+# stretched family g(N*[4,2,1], N*[5,1,1], N*[3,2,2]) from the README's scaling table
+FAMILY = [[4, 2, 1], [5, 1, 1], [3, 2, 2]]
+STRETCHINGS = [1, 100, 10000]
+
+# fast benchmarks are run repeatedly, so that each sample takes at least this many seconds
+MIN_SAMPLE_TIME = 0.2
+
+# slowdowns by less than this many seconds per call are within noise and never regressions
+NOISE_FLOOR = 1e-3
+
+# benchmarks are registered as name -> (function, number of repetitions)
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=5):
+    def register(f):
+        BENCHMARKS[name] = (f, repeat)
+        return f
+
+    return register
+
+
+def stretched(N):
+    return [[N * x for x in p] for p in FAMILY]
+
+
+# building blocks
+@benchmark("finite_differences[3,3,3]")
+def bench_finite_differences():
+    finite_differences(positive_roots([3, 3, 3]))
+
+
+@benchmark("weyl_finite_differences[3,3,3]")
+def bench_weyl_finite_differences():
+    list(weyl_finite_differences([3, 3, 3]))
+
+
+@benchmark("kronecker_weight_vpn[3,3,3]")
+def bench_kronecker_weight_vpn():
+    kronecker_weight_vpn([3, 3, 3])
+
+
+@benchmark("kronecker_weight_vpn[4,4,4]")
+def bench_kronecker_weight_vpn_large():
+    kronecker_weight_vpn([4, 4, 4])
+
+
+@benchmark("positive_roots[4,4,4]")
+def bench_positive_roots():
+    positive_roots([4, 4, 4])
+
+
+@functools.lru_cache()
+def reduced_query():
+    vpn = kronecker_weight_vpn([3, 3, 3])
+    return vpn.reduced.inequalities(flatten_weight(stretched(10000)))
+
+
+@benchmark("prepare_input[barvinok]", repeat=20)
+def bench_prepare_input_barvinok():
+    barvinok.prepare_input(*reduced_query())
+
+
+@benchmark("prepare_input[iscc]", repeat=20)
+def bench_prepare_input_iscc():
+    barvinok.prepare_iscc_query(*reduced_query())
+
+
+@benchmark("prepare_input[latte]", repeat=20)
+def bench_prepare_input_latte():
+    latte.prepare_input(*reduced_query())
+
+
+@benchmark("reduce_system[3,3,3]")
+def bench_reduce_system():
+    barvikron.reduce_system(kronecker_weight_vpn([3, 3, 3]).A)
+
+
+# end-to-end computations (with fake counting tool)
+def bench_kronecker(N):
+    def f():
+        kronecker(stretched(N), BarvinokEvaluator(FAKE_BARVINOK_COUNT), shortcuts=False)
+
+    return f
+
+
+for N in STRETCHINGS:
+    benchmark("kronecker[N=%d]" % N, repeat=3)(bench_kronecker(N))
+
+
+@benchmark("character_kronecker[n=20]")
+def bench_character_kronecker():
+    # clear caches, so that the character table is computed from scratch
+    barvikron.chartable.mn_character.cache_clear()
+    barvikron.chartable._characters.cache_clear()
+    character_kronecker([[5, 5, 5, 5], [6, 5, 4, 3, 2], [8, 6, 4, 2]])
+
+
+@benchmark("kronecker_table[3,3,3, k=8]", repeat=3)
+def bench_kronecker_table():
+    kronecker_table([3, 3, 3], 8)
+
+
+@benchmark("wire[lease+complete, 500 items]")
+def bench_wire():
+    weight = flatten_weight(stretched(10000))
+    dispatcher = Dispatcher([(1, weight)] * 500)
+    server = WireServer(dispatcher, b"benchmark", "localhost")
+    port = server.start()
+    client = WireClient("localhost", port, b"benchmark", "w")
+    while True:
+        item = client.lease("w")
+        if item is None:
+            break
+        client.complete("w", item[0], 10**30, 1.0)
+    assert client.finished()
+    client.close()
+    server.close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("localhost", port)).close()
+            return
+        except ConnectionError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+def bench_parallel(workers, N=100):
+    def f():
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(HERE))
+        cmd = [sys.executable, "-m", "barvikron.scripts.parallel"]
+        args = [str(p).replace(" ", "") for p in stretched(N)]
+        port, authkey = str(free_port()), "benchmark"
+        master = subprocess.Popen(
+            cmd + ["master"] + args + ["-P", port, "-K", authkey],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        wait_for_port(int(port))
+        procs = [
+            subprocess.Popen(
+                cmd
+                + ["worker"]
+                + args
+                + ["-H", "localhost", "-P", port, "-K", authkey]
+                + ["--barvinok", FAKE_BARVINOK_COUNT],
+                env=env,
+            )
+            for _ in range(workers)
+        ]
+        assert master.wait() == 0
+        for proc in procs:
+            proc.wait()
+
+    return f
+
+
+def run(f, repeat):
+    """
+    Return minimal and median time per call of f over the given number of samples. The
+    first call is a warm-up; fast functions are called several times per sample.
+    """
+    timer = timeit.Timer(f)
+    number = 1
+    if timer.timeit(1) < MIN_SAMPLE_TIME:
+        number, _ = timer.autorange()
+    times = [timer.timeit(number) / number for _ in range(repeat)]
+    return {
+        "min": min(times),
+        "median": float(np.median(times)),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def compare(results, baseline, tolerance, noise_floor=NOISE_FLOOR):
+    """
+    Print comparison of results against baseline and return the names of all benchmarks
+    whose minimal time exceeds the baseline's by more than the given factor, and by more
+    than noise_floor seconds (ratios of microsecond timings are mostly noise).
+    """
+    regressions = []
+    click.echo("%-36s %12s %12s %8s" % ("benchmark", "baseline", "current", "ratio"))
+    for name, result in results.items():
+        if name not in baseline:
+            click.echo("%-36s %12s %12.6f %8s" % (name, "-", result["min"], "-"))
+            continue
+        ratio = result["min"] / baseline[name]["min"]
+        flag = ""
+        if ratio > tolerance and result["min"] - baseline[name]["min"] > noise_floor:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        click.echo(
+            "%-36s %12.6f %12.6f %8.2f%s"
+            % (name, baseline[name]["min"], result["min"], ratio, flag)
+        )
+    return regressions
+
+
+@click.command()
+@click.option(
+    "-o",
+    "--output",
+    metavar="PATH",
+    help="Path to file to which results are written (JSON).",
+)
+@click.option(
+    "--baseline",
+    metavar="PATH",
+    help="Path to file of baseline results to compare against (JSON).",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=1.5,
+    show_default=True,
+    help="Report a regression if a benchmark is slower than the baseline by more than this factor.",
+)
+@click.option(
+    "--noise-floor",
+    type=float,
+    default=NOISE_FLOOR,
+    show_default=True,
+    help="Do not report a regression if a benchmark is slower than the baseline by less than this many seconds.",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=2,
+    show_default=True,
+    help="Benchmark the master/worker computation with 1, ..., this many local workers.",
+)
+@click.option(
+    "-k",
+    "--select",
+    metavar="SUBSTRING",
+    help="Only run benchmarks whose name contains this.",
+)
+def main(output, baseline, tolerance, noise_floor, workers, select):
+    """
+    Run benchmarks and compare against baseline (exit code 1 if there are regressions).
+    """
+    for k in range(1, workers + 1):
+        benchmark("parallel[workers=%d]" % k, repeat=1)(bench_parallel(k))
+
+    results = {}
+    for name, (f, repeat) in BENCHMARKS.items():
+        if select and select not in name:
+            continue
+        results[name] = run(f, repeat)
+        click.echo("%-36s %12.6f s" % (name, results[name]["min"]), err=True)
+
+    if output:
+        meta = {
+            "barvikron": barvikron.__version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+            f.write("\n")
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(
+                results, json.load(f)["results"], tolerance, noise_floor
+            )
+        if regressions:
+            click.echo("Regressions: %s" % ", ".join(regressions), err=True)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 import pytest
-from barvikron import BarvinokEvaluator, LatteEvaluator, default_evaluator
+from barvikron import (
+    BarvinokEvaluator,
+    LatteEvaluator,
+    NativeEvaluator,
+    NoEvaluatorFound,
+    default_evaluator,
+)
 
 
 def pytest_addoption(parser):
@@ -20,6 +26,10 @@ def pytest_addoption(parser):
 
 
 def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "large: weights too large to be evaluated by the native evaluator alone",
+    )
     pytest.evaluators = []
 
     # add barvinok?
@@ -32,9 +42,12 @@ def pytest_configure(config):
     if latte_path:
         pytest.evaluators.append(LatteEvaluator(latte_path))
 
-    # no evaluator specified? add default
+    # no evaluator specified? add default (or the native evaluator alone)
     if not pytest.evaluators:
-        pytest.evaluators.append(default_evaluator())
+        try:
+            pytest.evaluators.append(default_evaluator())
+        except NoEvaluatorFound:
+            pytest.evaluators.append(NativeEvaluator())
 
 
 def pytest_report_header(config):
@@ -44,3 +57,19 @@ def pytest_report_header(config):
 def pytest_generate_tests(metafunc):
     if "evaluator" in metafunc.fixturenames:
         metafunc.parametrize("evaluator", pytest.evaluators)
+
+
+def pytest_collection_modifyitems(config, items):
+    skip = pytest.mark.skip(
+        reason="too large for native evaluator (use --barvinok or --latte)"
+    )
+    for item in items:
+        evaluator = getattr(item, "callspec", None) and item.callspec.params.get(
+            "evaluator"
+        )
+        if (
+            isinstance(evaluator, NativeEvaluator)
+            and not evaluator.fallback
+            and "large" in item.keywords
+        ):
+            item.add_marker(skip)
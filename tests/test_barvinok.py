@@ -0,0 +1,95 @@
+import asyncio, itertools, os, sys
+import numpy as np
+import pytest
+from barvikron import *
+from barvikron import barvinok
+
+# fake iscc tool that counts lattice points in small sets by brute force; it exits without
+# answering if a file named 'crash' exists next to it (and removes that file)
+FAKE_ISCC = """#!%s
+import itertools, os, re, sys
+crash = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crash")
+for line in sys.stdin:
+    match = re.match(r"card \\{ \\[(.*)\\] : (.*) \\};", line.strip())
+    if os.path.exists(crash):
+        os.remove(crash)
+        sys.exit(1)
+    variables = [v.strip() for v in match.group(1).split(",")]
+    if variables == ["i"]:
+        # marker query
+        count = int(match.group(2).split("<")[-1])
+    else:
+        condition = compile(match.group(2), "<query>", "eval")
+        count = sum(
+            1
+            for values in itertools.product(range(-8, 9), repeat=len(variables))
+            if eval(condition, dict(zip(variables, values)))
+        )
+    print("{ %%d }" %% count, flush=True)
+""" % sys.executable
+
+
+def fake_iscc(tmp_path):
+    path = str(tmp_path / "iscc")
+    with open(path, "w") as f:
+        f.write(FAKE_ISCC)
+    os.chmod(path, 0o755)
+    return path
+
+
+def test_prepare_iscc_query():
+    M, c = [[1, 0], [0, 1], [-1, -2]], [0, 0, 3]
+    assert barvinok.prepare_iscc_query(M, c) == (
+        "card { [y0, y1] : 0 + 1*y0 >= 0 and 0 + 1*y1 >= 0 and 3 - 1*y0 - 2*y1 >= 0 };\n"
+    )
+
+
+def test_iscc_evaluator(tmp_path):
+    evaluator = IsccEvaluator(fake_iscc(tmp_path))
+    vpn = kronecker_weight_vpn([2, 3])
+    weights = [
+        flatten_weight(omega) for omega in [[[2, 1], [1, 1, 1]], [[3, 1], [2, 1, 1]]]
+    ]
+    try:
+        for weight in weights:
+            assert vpn.eval(weight, evaluator) == count_solutions(vpn.A, weight)
+        assert evaluator.num_sessions == 1
+
+        # session crashes and is restarted
+        open(str(tmp_path / "crash"), "w").close()
+        assert vpn.eval(weights[1], evaluator) == count_solutions(vpn.A, weights[1])
+        assert evaluator.num_sessions == 1
+    finally:
+        evaluator.close()
+
+
+@pytest.mark.parametrize("sessions", [3, None])
+def test_iscc_evaluator_sessions(tmp_path, sessions):
+    evaluator = IsccEvaluator(fake_iscc(tmp_path), sessions=sessions)
+    vpn = VectorPartitionFunction(
+        [[2, 1, 1, 0, 0, 0], [0, 1, 0, 2, 1, 0], [0, 0, 1, 0, 1, 2]]
+    )
+    weights = list(itertools.product(range(1, 4), repeat=3))
+
+    async def collect():
+        return dict([item async for item in evaluator.eval_many(vpn, weights, 3)])
+
+    try:
+        values = asyncio.run(collect())
+        assert [values[i] for i in range(len(weights))] == [
+            count_solutions(vpn.A, b) for b in weights
+        ]
+        assert evaluator.num_sessions <= 3
+    finally:
+        evaluator.close()
+    assert evaluator.num_sessions == 0
+
+
+def test_iscc_evaluator_unlimited_sessions(tmp_path):
+    evaluator = IsccEvaluator(fake_iscc(tmp_path), sessions=None)
+    sessions = [evaluator.acquire() for _ in range(4)]
+    assert evaluator.num_sessions == 4
+    for session in sessions:
+        evaluator.idle.put(session)
+    evaluator.close()
+    assert evaluator.num_sessions == 0
@@ -0,0 +1,27 @@
+import functools
+from barvikron import *
+
+QUERIES = [
+    [[3, 2, 1], [3, 2, 1], [4, 1, 1]],
+    [[3, 2, 1], [3, 2, 1], [3, 2, 1]],
+    [[1, 1, 1], [3, 0], [2, 1]],
+    [[3, 1], [2, 2], [2, 1, 1]],
+    [[2, 1], [2, 1], [2, 1]],
+]
+
+
+def test_kronecker_many():
+    evaluator = NativeEvaluator()
+    expected = [kronecker(p, evaluator, shortcuts=False) for p in QUERIES]
+    results = list(kronecker_many(QUERIES, evaluator, shortcuts=False))
+    assert sorted(index for index, _ in results) == list(range(len(QUERIES)))
+    assert dict(results) == dict(enumerate(expected))
+    assert dict(kronecker_many(QUERIES, evaluator)) == dict(enumerate(expected))
+
+
+def test_kronecker_many_processes():
+    evaluator = functools.partial(NativeEvaluator)
+    results = dict(kronecker_many(QUERIES, evaluator, processes=2, shortcuts=False))
+    assert results == {
+        i: kronecker(p, NativeEvaluator()) for i, p in enumerate(QUERIES)
+    }
@@ -0,0 +1,60 @@
+from barvikron import *
+
+
+class CountingEvaluator(EvaluatorBase):
+    """
+    Fake evaluator that returns the sum of the entries of b and records how often it was called.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def eval(self, vpn, b):
+        self.calls += 1
+        return sum(b)
+
+
+def test_query_key():
+    vpn = kronecker_weight_vpn([2, 2, 2])
+    assert query_key(vpn.A, [1, 0, 1, 0, 1, 0]) == query_key(
+        vpn.A, flatten_weight([[1, 0], [1, 0], [1, 0]])
+    )
+    assert query_key(vpn.A, [1, 0, 1, 0, 1, 0]) != query_key(vpn.A, [0, 1, 1, 0, 1, 0])
+    assert query_key(vpn.A, [1, 0, 1, 0, 1, 0]) != query_key(
+        kronecker_weight_vpn([2, 3]).A, [1, 0, 1, 0, 0]
+    )
+
+
+def test_cached_evaluator(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    vpn = kronecker_weight_vpn([2, 2, 2])
+    inner = CountingEvaluator()
+    evaluator = CachedEvaluator(inner, MultiplicityCache(path))
+
+    assert vpn.eval([10**20, 0, 10**20, 0, 10**20, 0], evaluator) == 3 * 10**20
+    assert vpn.eval([10**20, 0, 10**20, 0, 10**20, 0], evaluator) == 3 * 10**20
+    assert vpn.eval([0, 1, 0, 1, 0, 1], evaluator) == 3
+    assert inner.calls == 2
+    assert evaluator.cache.hits == 1
+    assert evaluator.cache.misses == 2
+    evaluator.close()
+
+    # values persist across instances
+    cache = MultiplicityCache(path)
+    assert cache.lookup(vpn, [0, 1, 0, 1, 0, 1]) == 3
+    assert cache.lookup(vpn, [1, 0, 0, 1, 0, 1]) is None
+    assert len(cache) == 2
+
+
+def test_eviction(tmp_path):
+    vpn = kronecker_weight_vpn([2, 2])
+    cache = MultiplicityCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.store(vpn, [1, 0, 1, 0], 1)
+    cache.store(vpn, [2, 0, 2, 0], 1)
+    assert cache.lookup(vpn, [1, 0, 1, 0]) == 1
+    cache.store(vpn, [3, 0, 3, 0], 1)
+
+    assert len(cache) == 2
+    assert cache.lookup(vpn, [1, 0, 1, 0]) == 1
+    assert cache.lookup(vpn, [2, 0, 2, 0]) is None
+    assert cache.lookup(vpn, [3, 0, 3, 0]) == 1
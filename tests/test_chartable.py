@@ -0,0 +1,94 @@
+import itertools, math
+import pytest
+from barvikron import *
+
+
+class FailingEvaluator(EvaluatorBase):
+    def eval(self, vpn, b):
+        raise AssertionError("Should not evaluate partition functions.")
+
+
+def test_integer_partitions():
+    assert list(integer_partitions(4)) == [
+        (4,),
+        (3, 1),
+        (2, 2),
+        (2, 1, 1),
+        (1, 1, 1, 1),
+    ]
+    assert [len(list(integer_partitions(n))) for n in range(8)] == [
+        1,
+        1,
+        2,
+        3,
+        5,
+        7,
+        11,
+        15,
+    ]
+
+
+def test_characters():
+    # character table of S_3 (classes (3), (2,1), (1,1,1))
+    assert characters([3]) == (1, 1, 1)
+    assert characters([2, 1, 0]) == (-1, 0, 2)
+    assert characters([1, 1, 1]) == (1, -1, 1)
+    assert character([2, 2], [2, 1, 1]) == 0
+    assert character([3, 1], [2, 2]) == -1
+
+    # row orthogonality and hook length formula
+    n = 6
+    rows = [characters(p) for p in integer_partitions(n)]
+    for a, b in itertools.product(range(len(rows)), repeat=2):
+        total = sum(s * x * y for s, x, y in zip(class_sizes(n), rows[a], rows[b]))
+        assert total == (math.factorial(n) if a == b else 0)
+    assert characters([3, 2, 1])[-1] == 16
+
+    with pytest.raises(AssertionError):
+        characters([1, 2])
+    with pytest.raises(AssertionError):
+        character([1, 2], [2, 1])
+    with pytest.raises(AssertionError):
+        kronecker_shortcut([[1, 2], [2, 1], [3]])
+
+
+def test_character_kronecker():
+    evaluator = NativeEvaluator()
+    for n in range(1, 6):
+        shapes = [list(p) for p in integer_partitions(n) if len(p) <= 3]
+        for partitions in itertools.combinations_with_replacement(shapes, 3):
+            partitions = list(partitions)
+            if kronecker_vanishes(partitions):
+                continue
+            assert character_kronecker(partitions) == kronecker(
+                partitions, evaluator, shortcuts=False
+            ), partitions
+
+
+def test_character_kronecker_generalized():
+    evaluator = NativeEvaluator()
+    assert character_kronecker([[2, 1]]) == 0
+    assert character_kronecker([[3]]) == 1
+    assert character_kronecker([[2, 1], [2, 1]]) == 1
+    partitions = [[2, 1], [2, 1], [2, 1], [2, 1]]
+    assert character_kronecker(partitions) == kronecker(
+        partitions, evaluator, shortcuts=False
+    )
+
+
+def test_two_row_cross_check():
+    for n in range(13):
+        for p, q, r in itertools.product(range(n // 2 + 1), repeat=3):
+            partitions = [[n - p, p], [n - q, q], [n - r, r]]
+            assert two_row_kronecker(partitions) == character_kronecker(
+                partitions
+            ), partitions
+
+
+def test_character_shortcut():
+    assert kronecker([[3, 2, 1], [3, 2, 1], [4, 1, 1]], FailingEvaluator()) == 4
+    partitions = [[10, 6, 2], [10, 8], [11, 7]]
+    # see test_briand_orellana_rosas_p8
+    assert kronecker(partitions, FailingEvaluator()) == 3
+    with pytest.raises(AssertionError):
+        kronecker(partitions, FailingEvaluator(), shortcuts=False)
@@ -0,0 +1,72 @@
+import math
+import pytest
+from barvikron import *
+
+
+def test_makespan():
+    assert makespan([3, 3, 2, 2, 2], 2) == 7
+    assert makespan([2, 2, 2, 3, 3], 2) == 7
+    assert makespan([1, 1, 1, 1, 4], 2) == 6
+    assert makespan([4, 1, 1, 1, 1], 2) == 4
+    assert makespan([], 3) == 0
+
+
+def test_sort():
+    dims = [2, 2, 2]
+    terms = [
+        (1, [1, 1, 1, 1, 1, 1]),
+        (-1, [90, 10, 90, 10, 90, 10]),
+        (1, [5, 5, 5, 5, 5, 5]),
+    ]
+    CostModel().sort(dims, terms)
+    assert [weight[0] for _, weight in terms] == [90, 5, 1]
+
+
+def test_large_weights():
+    # predictions grow polynomially in the bit size, and stay finite for huge weights
+    model = CostModel([0.0, 1.0, 2.0, -0.5])
+    dims = [2, 2, 2]
+    N = 10**20
+    small, large = [N, N] * 3, [N**2, N**2] * 3
+    assert math.isfinite(model.predict(dims, large))
+    assert model.predict(dims, large) / model.predict(dims, small) == pytest.approx(
+        4, rel=0.1
+    )
+    terms = [(1, small), (1, large)]
+    model.sort(dims, terms)
+    assert terms[0][1] == large
+    assert math.isfinite(CostModel([0.0, 1.0, 1000.0, 0.0]).predict(dims, large))
+
+
+def test_fit(tmp_path):
+    # synthetic timings that follow the model exactly
+    coefficients = [-3.0, 0.5, 0.25, -0.1]
+    model = CostModel(coefficients)
+    timings = [
+        (dims, weight, model.predict(dims, weight))
+        for dims in ([2, 2, 2], [2, 2, 3], [3, 3, 3])
+        for weight in (
+            [1] * sum(dims),
+            [10, 0] + [3] * (sum(dims) - 2),
+            list(range(sum(dims))),
+        )
+    ]
+    path = str(tmp_path / "timings")
+    write_timings(path, timings)
+    assert read_timings(path) == [(dims, weight, t) for dims, weight, t in timings]
+
+    calibrated = CostModel.load(path)
+    assert calibrated.calibrated
+    assert calibrated.coefficients == pytest.approx(coefficients)
+
+    # too few timings to calibrate from
+    assert not CostModel.fit(timings[:3]).calibrated
+    assert not CostModel.load(str(tmp_path / "missing")).calibrated
+
+
+def test_dispatcher_costs():
+    items = [(1, [2, 1]), (-1, [3, 0]), (2, [1, 2])]
+    dispatcher = Dispatcher(items, costs=[1.0, 3.0, 2.0])
+    assert [dispatcher.lease("a")[0] for _ in range(3)] == [1, 2, 0]
+    dispatcher.complete("a", 1, 5, seconds=0.5)
+    assert dispatcher.seconds == {1: 0.5}
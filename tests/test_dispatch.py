@@ -0,0 +1,115 @@
+import time
+import pytest
+from barvikron import *
+
+ITEMS = [(1, [2, 1]), (-1, [3, 0]), (2, [1, 2])]
+
+
+def test_lease_complete():
+    dispatcher = Dispatcher(ITEMS)
+    assert dispatcher.lease("a") == (0, 3, 1, (2, 1))
+    assert dispatcher.lease("b") == (1, 3, -1, (3, 0))
+    dispatcher.complete("a", 0, 5)
+    dispatcher.complete("b", 1, 2)
+    assert not dispatcher.finished()
+    assert dispatcher.lease("a") == (2, 3, 2, (1, 2))
+    assert dispatcher.lease("a") is None
+    dispatcher.complete("a", 2, 1)
+    assert dispatcher.finished()
+    assert dispatcher.wait(0)
+    assert dispatcher.total() == 5 - 2 + 2
+
+
+def test_expire():
+    dispatcher = Dispatcher(ITEMS, lease_timeout=0.05)
+    assert dispatcher.lease("a")[0] == 0
+    assert dispatcher.lease("b")[0] == 1
+
+    # b keeps its lease alive, a does not
+    time.sleep(0.03)
+    dispatcher.heartbeat("b")
+    time.sleep(0.03)
+    assert dispatcher.lease("c")[0] == 0
+    assert dispatcher.lease("c")[0] == 2
+    assert dispatcher.lease("c") is None
+
+    # late result from a is still accepted, duplicate from c is ignored
+    dispatcher.complete("a", 0, 5)
+    dispatcher.complete("c", 0, 7)
+    dispatcher.complete("b", 1, 2)
+    dispatcher.complete("c", 2, 1)
+    assert dispatcher.finished()
+    assert dispatcher.total() == 5 - 2 + 2
+
+
+def test_journal(tmp_path):
+    path = str(tmp_path / "journal")
+    header = {"partitions": [[2, 1]]}
+    dispatcher = Dispatcher(ITEMS, journal=path, header=header)
+    dispatcher.lease("a")
+    dispatcher.lease("a")
+    dispatcher.complete("a", 1, 2)
+    dispatcher.close()
+
+    # resume
+    dispatcher = Dispatcher(ITEMS, journal=path, header=header)
+    assert dispatcher.num_resumed == 1
+    assert dispatcher.lease("a")[0] == 0
+    assert dispatcher.lease("a")[0] == 2
+    dispatcher.complete("a", 0, 5)
+    dispatcher.complete("a", 2, 1)
+    assert dispatcher.total() == 5 - 2 + 2
+    dispatcher.close()
+
+    # journal written for different work items
+    with pytest.raises(JournalMismatch):
+        Dispatcher(ITEMS, journal=path, header={"partitions": [[1, 1]]})
+    with pytest.raises(JournalMismatch):
+        Dispatcher(list(reversed(ITEMS)), journal=path, header=header)
+    with pytest.raises(JournalMismatch):
+        Dispatcher(ITEMS[:1], journal=path, header=header)
+
+
+def test_truncated_journal(tmp_path):
+    path = str(tmp_path / "journal")
+    header = {"partitions": [[2, 1]]}
+    dispatcher = Dispatcher(ITEMS, journal=path, header=header)
+    dispatcher.complete("a", 1, 2)
+    dispatcher.close()
+
+    # master killed while appending a record
+    with open(path, "a") as f:
+        f.write('{"index": 0, "weight": [')
+
+    dispatcher = Dispatcher(ITEMS, journal=path, header=header)
+    assert dispatcher.num_resumed == 1
+    dispatcher.complete("a", 0, 5)
+    dispatcher.close()
+    dispatcher = Dispatcher(ITEMS, journal=path, header=header)
+    assert dispatcher.results == {0: 5, 1: 2}
+    dispatcher.close()
+
+
+def test_complete_cached():
+    dispatcher = Dispatcher(ITEMS)
+    dispatcher.complete_cached(1, 2)
+    assert [dispatcher.lease("a")[0] for _ in range(2)] == [0, 2]
+    assert dispatcher.lease("a") is None
+    assert "1/3 done" in dispatcher.progress()
+    assert "2 leased, 0 pending" in dispatcher.progress()
+
+
+def test_lease_complete_many(tmp_path):
+    path = str(tmp_path / "journal")
+    dispatcher = Dispatcher(ITEMS, journal=path, header={})
+    assert [item[0] for item in dispatcher.lease_many("a", 2)] == [0, 1]
+    assert [item[0] for item in dispatcher.lease_many("a", 2)] == [2]
+    assert dispatcher.lease_many("a", 2) == []
+    dispatcher.complete_many("a", [(0, 5, 0.1), (2, 1, None)])
+    assert not dispatcher.finished()
+    assert dispatcher.seconds == {0: 0.1}
+    dispatcher.complete_many("a", [(1, 2, 0.2), (0, 7, 0.3)])
+    assert dispatcher.finished()
+    assert dispatcher.total() == 5 - 2 + 2
+    dispatcher.close()
+    assert Dispatcher(ITEMS, journal=path, header={}).finished()
@@ -1,3 +1,4 @@
+import pytest
 from barvikron import *
 
 
@@ -23,3 +24,10 @@ def test_kronecker_findiff():
     ]
     coeffs = finite_differences(positive_roots([2, 2, 2]))
     assert sorted_list(coeffs) == expected
+
+
+@pytest.mark.parametrize("dims", [[2, 2, 2], [3, 2], [3, 3, 2], [1, 4]])
+def test_weyl_finite_differences(dims):
+    expected = sorted_list(finite_differences(positive_roots(dims)))
+    got = sorted((coeff, list(shift)) for coeff, shift in weyl_finite_differences(dims))
+    assert got == expected
@@ -0,0 +1,26 @@
+import itertools
+from barvikron import *
+
+
+def test_weight_multiplicity_table():
+    evaluator = NativeEvaluator()
+    dims, k = [2, 3, 2], 4
+    table = weight_multiplicity_table(dims, k)
+    vpn = kronecker_weight_vpn(dims)
+    for a, b1, b2, c in itertools.product(range(k + 1), repeat=4):
+        if b1 + b2 > k:
+            continue
+        weight = [a, k - a, b1, b2, k - b1 - b2, c, k - c]
+        assert table[a, b1, b2, c] == vpn.eval(weight, evaluator), weight
+
+
+def test_kronecker_table():
+    for dims in [[3, 3, 3], [2, 2, 3], [2, 2, 2, 2]]:
+        for k in range(7):
+            table = kronecker_table(dims, k)
+            for partitions, g in table.items():
+                assert g == character_kronecker(partitions), partitions
+    table = kronecker_table([3, 3, 3], 6)
+    assert table[(3, 2, 1), (3, 2, 1), (4, 1, 1)] == 4
+    assert table[(4, 2, 0), (5, 1, 0), (3, 3, 0)] == 1
+    assert len(table) == 7**3
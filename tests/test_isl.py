@@ -0,0 +1,48 @@
+import concurrent.futures
+import pytest
+from barvikron import *
+from barvikron.isl import prepare_parametric_set
+
+needs_isl = pytest.mark.skipif(
+    not isl_available(), reason="islpy with barvinok support not installed"
+)
+
+
+def test_prepare_parametric_set():
+    M = [[1, 0], [0, 1], [-1, -2]]
+    assert (
+        prepare_parametric_set(M)
+        == "[c0, c1, c2] -> { [y0, y1] : c0 + 1*y0 >= 0 and c1 + 1*y1 >= 0 and c2 - 1*y0 - 2*y1 >= 0 }"
+    )
+
+
+@needs_isl
+def test_isl_evaluator():
+    evaluator = IslEvaluator()
+    vpn = kronecker_weight_vpn([2, 2, 2])
+    native = NativeEvaluator()
+    for b in [
+        [1, 1, 1, 1, 1, 1],
+        [2, 0, 1, 1, 1, 1],
+        [3, 3, 4, 2, 3, 3],
+        [1, 0, 0, 0, 1, 0],
+    ]:
+        assert vpn.eval(b, evaluator) == vpn.eval(b, native)
+    evaluator.close()
+
+
+@needs_isl
+def test_isl_kronecker():
+    partitions = [[3, 2, 1], [3, 2, 1], [4, 1, 1]]
+    assert kronecker(partitions, IslEvaluator(), shortcuts=False) == 4
+
+
+@needs_isl
+def test_isl_evaluator_threads():
+    evaluator = IslEvaluator()
+    vpn = kronecker_weight_vpn([2, 2, 2])
+    weights = [[n, n + 1, n, n + 1, n, n + 1] for n in range(8)]
+    with concurrent.futures.ThreadPoolExecutor(4) as pool:
+        values = list(pool.map(lambda b: vpn.eval(b, evaluator), weights))
+    assert values == [vpn.eval(b, NativeEvaluator()) for b in weights]
+    evaluator.close()
@@ -1,7 +1,12 @@
+import asyncio
 import pytest
 from barvikron import *
 
 
+def large(N):
+    return pytest.param(N, marks=pytest.mark.large)
+
+
 def stretch(N, partitions):
     return [[N * x for x in partition] for partition in partitions]
 
@@ -53,12 +58,13 @@ def test_kronecker_weight_multiplicity(partitions, expected, evaluator):
     assert kronecker_weight_multiplicity(partitions, evaluator) == expected
 
 
-@pytest.mark.parametrize("N", [1, 2, 3, 4, 5, 10**20, 10**20 + 5])
+@pytest.mark.parametrize("N", [1, 2, 3, 4, 5, large(10**20), large(10**20 + 5)])
 def test_two_row_boxes(N, evaluator):
     partitions = stretch(N, [[1, 1], [1, 1], [1, 1]])
-    assert kronecker(partitions, evaluator) == (N + 1) % 2
+    assert kronecker(partitions, evaluator, shortcuts=False) == (N + 1) % 2
 
 
+@pytest.mark.large
 @pytest.mark.parametrize("j", [1, 2])
 @pytest.mark.parametrize("N", [1, 2, 3, 4, 100, 10**20])
 def test_briand_orellana_rosas_2_4(j, N, evaluator):
@@ -73,13 +79,13 @@ def test_briand_orellana_rosas_2_4(j, N, evaluator):
     beta = [k + 1, k - 1]
     gamma = [2 * k - 2 * i - 2 * j, 2 * i, 2 * j]
 
-    got = kronecker(stretch(N, [alpha, beta, gamma]), evaluator)
+    got = kronecker(stretch(N, [alpha, beta, gamma]), evaluator, shortcuts=False)
     # expected = N / 2 + 1 - (N % 2) * 3 / 2
     expected = (N + 2 - (N % 2) * 3) // 2
     assert got == expected
 
 
-@pytest.mark.parametrize("N", [1, 2, 3, 4, 5, 100, 10**20])
+@pytest.mark.parametrize("N", [1, 2, 3, large(4), large(5), large(100), large(10**20)])
 def test_briand_orellana_rosas_p8(N, evaluator):
     """
     Compare with formula by Briand-Orellana-Rosas (page 8 of arXiv:0810.3163).
@@ -88,7 +94,86 @@ def test_briand_orellana_rosas_p8(N, evaluator):
     beta = [10, 8]
     gamma = [11, 7]
 
-    got = kronecker(stretch(N, [alpha, beta, gamma]), evaluator)
+    got = kronecker(stretch(N, [alpha, beta, gamma]), evaluator, shortcuts=False)
     # expected = 7 / 4 * N**2 + 3 / 2 * N + 1 - (N % 2) * 5 / 4
     expected = (7 * N**2 + 6 * N + 4 - (N % 2) * 5) // 4
     assert got == expected
+
+
+def test_canonical_weight():
+    assert canonical_weight([2, 2, 2], [3, 8, 5, 6, 6, 5]) == (8, 3, 6, 5, 6, 5)
+    assert canonical_weight([3, 2, 2], [1, 2, 0, 0, 3, 2, 1]) == (2, 1, 0, 3, 0, 2, 1)
+    assert canonical_weight([2, 3, 2], [0, 3, 1, 2, 0, 2, 1]) == (3, 0, 2, 1, 0, 2, 1)
+
+
+def test_collapse_terms():
+    dims = [2, 2, 2]
+    highest_weight = flatten_weight([[1, 1], [1, 1], [1, 1]])
+    terms = collapse_terms(
+        dims, highest_weight, finite_differences(positive_roots(dims))
+    )
+    assert sorted((coeff, weight.tolist()) for coeff, weight in terms) == [
+        (-3, [2, 0, 1, 1, 1, 1]),
+        (-1, [2, 0, 2, 0, 2, 0]),
+        (+1, [1, 1, 1, 1, 1, 1]),
+        (+3, [2, 0, 2, 0, 1, 1]),
+    ]
+
+
+def test_trivial_weight_multiplicity(evaluator):
+    dims = [2, 3, 1]
+    vpn = kronecker_weight_vpn(dims)
+    for weight, expected in [
+        ([3, -1, 1, 1, 0, 2], 0),
+        ([2, 0, 1, 1, 1, 2], 0),
+        ([0, 0, 0, 0, 0, 0], 1),
+        ([2, 0, 1, 1, 0, 2], 1),
+        ([1, 1, 2, 0, 0, 2], 1),
+        ([1, 1, 1, 1, 0, 2], None),
+    ]:
+        assert trivial_weight_multiplicity(dims, weight) == expected
+        if expected is not None and all(x >= 0 for x in weight):
+            assert vpn.eval(weight, evaluator) == expected
+
+
+def test_prune_terms():
+    dims = [2, 2, 2]
+    terms = [
+        (1, [1, 1, 1, 1, 1, 1]),
+        (-3, [2, 0, 2, 0, 1, 1]),
+        (5, [3, -1, 1, 1, 1, 1]),
+    ]
+    g0, remaining = prune_terms(dims, terms)
+    assert g0 == -3
+    assert remaining == terms[:1]
+
+
+def test_kronecker_vanishes(evaluator):
+    assert kronecker_vanishes([[2, 1], [3], [2, 1]]) is False
+    assert kronecker_vanishes([[2, 1], [3], [1, 1, 1]])
+    assert kronecker_vanishes([[2, 1], [2, 1], [2, 2]])
+    assert kronecker_vanishes([[1, 1, 1], [3, 0], [2, 1]])
+    assert not kronecker_vanishes([[1, 1, 1, 1], [2, 2], [2, 2]])
+    assert kronecker([[1, 1, 1], [3, 0], [2, 1]], evaluator) == 0
+
+
+def test_prepare_kronecker():
+    assert prepare_kronecker([[2, 1], [3], [1, 1, 1]]) == (0, [[2, 1], [3], [1, 1, 1]])
+    assert prepare_kronecker([[1, 1, 1], [1, 1, 1], [3]]) == (1, [])
+    assert prepare_kronecker([[4, 2, 0], [5, 1], [3, 3]]) == (
+        1,
+        [[5, 1], [4, 2], [3, 3]],
+    )
+    assert prepare_kronecker([[4, 2, 0], [5, 1], [3, 3]], shortcuts=False) == (
+        None,
+        [[5, 1], [4, 2], [3, 3]],
+    )
+    with pytest.raises(AssertionError):
+        prepare_kronecker([[1, 0], [0, 1], [1, 0]])
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_kronecker_async(jobs, evaluator):
+    partitions = [[3, 2, 1], [3, 2, 1], [4, 1, 1]]
+    got = asyncio.run(kronecker_async(partitions, evaluator, jobs, shortcuts=False))
+    assert got == kronecker(partitions, evaluator, shortcuts=False) == 4
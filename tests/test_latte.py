@@ -0,0 +1,75 @@
+import asyncio, os, subprocess
+import pytest
+from barvikron import *
+
+# fake LattE count tool that fails if another instance shares its working directory
+FAKE_COUNT = """#!/bin/sh
+test -e latte_stats && exit 1
+test -e query.latte || exit 1
+touch latte_stats
+mkdir -p Dual
+sleep %s
+echo "*****  Total number of lattice points is: 3 ****"
+"""
+
+
+def fake_count(tmp_path, seconds=0.1):
+    path = str(tmp_path / "count")
+    with open(path, "w") as f:
+        f.write(FAKE_COUNT % seconds)
+    os.chmod(path, 0o755)
+    return path
+
+
+def test_workspaces(tmp_path):
+    workspaces = Workspaces(str(tmp_path / "scratch"))
+    with workspaces.acquire() as first:
+        open(os.path.join(first, "junk"), "w").close()
+        with workspaces.acquire() as second:
+            assert first != second
+    assert len(workspaces) == 2
+
+    # directories are emptied and reused
+    with workspaces.acquire() as path:
+        assert path in (first, second)
+        assert os.listdir(path) == []
+    assert len(workspaces) == 2
+
+    workspaces.close()
+    assert not os.path.exists(first) and not os.path.exists(second)
+
+
+def test_default_scratch_root(monkeypatch, tmp_path):
+    monkeypatch.setenv("BARVIKRON_SCRATCH", str(tmp_path))
+    assert default_scratch_root() == str(tmp_path)
+
+
+def test_latte_evaluator(tmp_path):
+    scratch = tmp_path / "scratch"
+    evaluator = LatteEvaluator(fake_count(tmp_path), scratch=str(scratch))
+    vpn = kronecker_weight_vpn([2, 2])
+    assert vpn.eval([1, 1, 1, 1], evaluator) == 3
+    assert vpn.eval([1, 1, 1, 1], evaluator) == 3
+
+    # concurrent evaluations get their own directories
+    async def eval_concurrently():
+        return [
+            value async for _, value in evaluator.eval_many(vpn, [[1, 1, 1, 1]] * 4, 4)
+        ]
+
+    assert asyncio.run(eval_concurrently()) == [3] * 4
+    assert len(evaluator.workspaces) == 4
+    assert all(os.listdir(str(path)) == [] for path in scratch.iterdir())
+
+
+def test_latte_timeout(tmp_path):
+    scratch = tmp_path / "scratch"
+    evaluator = LatteEvaluator(
+        fake_count(tmp_path, 10), scratch=str(scratch), timeout=0.2
+    )
+    vpn = kronecker_weight_vpn([2, 2])
+    with pytest.raises(subprocess.TimeoutExpired):
+        vpn.eval([1, 1, 1, 1], evaluator)
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(evaluator.eval_async(vpn, [1, 1, 1, 1]))
+    assert all(os.listdir(str(path)) == [] for path in scratch.iterdir())
@@ -0,0 +1,74 @@
+import asyncio, itertools, threading
+import numpy as np
+import pytest
+from barvikron import *
+
+
+def brute_force(A, b, bound):
+    A = np.array(A, dtype=object)
+    return sum(
+        1
+        for x in itertools.product(range(bound + 1), repeat=A.shape[1])
+        if list(A.dot(x)) == list(b)
+    )
+
+
+@pytest.mark.parametrize("b", itertools.product(range(4), repeat=3))
+def test_count_solutions(b):
+    A = np.array([[2, 1, 1, 0, 0], [0, 1, 0, 2, 1], [0, 0, 1, 0, 1]], dtype=object)
+    assert count_solutions(A, b) == brute_force(A, b, 3)
+
+
+def test_count_kronecker():
+    vpn = kronecker_weight_vpn([2, 3])
+    for omega in [[[2, 1], [1, 1, 1]], [[3, 0], [1, 2, 0]], [[1, 2], [3, 0, 0]]]:
+        weight = flatten_weight(omega)
+        assert count_solutions(vpn.A, weight) == brute_force(vpn.A, weight, 3)
+    assert count_solutions(vpn.A, [2, -1, 1, 0, 0]) == 0
+    assert count_solutions(vpn.A, [30, 0, 30, 0, 0]) == 1
+
+
+def test_unsupported():
+    with pytest.raises(ValueError):
+        count_solutions(np.array([[1, -1]]), [0])
+    with pytest.raises(ValueError):
+        count_solutions(np.array([[1, 0]]), [0])
+
+
+class FakeEvaluator(EvaluatorBase):
+    def eval(self, vpn, b):
+        return -1
+
+
+def test_fallback():
+    vpn = kronecker_weight_vpn([2, 2, 2])
+    evaluator = NativeEvaluator(fallback=FakeEvaluator(), max_steps=1000)
+    assert vpn.eval([1, 1, 1, 1, 1, 1], evaluator) == 4
+    assert vpn.eval([10**20, 10**20] * 3, evaluator) == -1
+
+    with pytest.raises(BudgetExceeded):
+        count_solutions(vpn.A, [10**20, 10**20] * 3, max_steps=1000)
+
+
+def test_eval_async():
+    vpn = kronecker_weight_vpn([2, 2, 2])
+    evaluator = NativeEvaluator(fallback=FakeEvaluator(), max_steps=1000)
+    assert asyncio.run(evaluator.eval_async(vpn, [1, 1, 1, 1, 1, 1])) == 4
+    assert asyncio.run(evaluator.eval_async(vpn, [10**20, 10**20] * 3)) == -1
+
+    # the event loop is not blocked, and cancelled evaluations stop
+    async def cancel():
+        task = asyncio.ensure_future(
+            NativeEvaluator().eval_async(vpn, [10**20, 10**20] * 3)
+        )
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+
+    stop = threading.Event()
+    stop.set()
+    with pytest.raises(BudgetExceeded):
+        count_solutions(vpn.A, [10**20, 10**20] * 3, stop=stop)
@@ -0,0 +1,79 @@
+import itertools
+import pytest
+from barvikron import *
+
+
+class RecordingEvaluator(NativeEvaluator):
+    def __init__(self):
+        super().__init__()
+        self.shapes = set()
+
+    def eval(self, vpn, b):
+        self.shapes.add(vpn.A.shape)
+        return super().eval(vpn, b)
+
+
+def test_check_partitions():
+    check_partitions([[2, 1, 0], [3], [1, 1, 1]])
+    for partitions in [
+        [[1, 0], [0, 1], [1, 0]],
+        [[1, 2], [3], [2, 1]],
+        [[2, 1, -1], [2], [1, 1]],
+        [[2, 1], [2, 1], [2, 2]],
+    ]:
+        with pytest.raises(AssertionError):
+            check_partitions(partitions)
+        with pytest.raises(AssertionError):
+            kronecker(partitions, NativeEvaluator())
+        with pytest.raises(AssertionError):
+            list(kronecker_many([partitions], NativeEvaluator()))
+
+
+def test_conjugate_partition():
+    assert conjugate_partition([4, 2, 1, 0]) == [3, 2, 1, 1]
+    assert conjugate_partition([1, 1, 1]) == [3]
+    assert conjugate_partition([]) == []
+
+
+def test_normalize_partitions():
+    assert normalize_partitions([[5, 3, 0], [4, 4, 0], [6, 2, 0]]) == [
+        [6, 2],
+        [5, 3],
+        [4, 4],
+    ]
+    assert normalize_partitions([[2, 1], [3, 0], [2, 1]]) == [[2, 1], [2, 1]]
+    assert normalize_partitions([[1, 1, 1, 1], [2, 2], [3, 1]]) == [[3, 1], [2, 2]]
+    assert normalize_partitions([[1, 1, 1], [1, 1, 1], [3]]) == []
+    assert normalize_partitions([[3, 2, 1], [3, 2, 1], [4, 1, 1]]) == [
+        [4, 1, 1],
+        [3, 2, 1],
+        [3, 2, 1],
+    ]
+
+
+def test_normalized_kronecker():
+    evaluator = NativeEvaluator()
+    shapes = [list(p) + [0] for p in integer_partitions(4)]
+    for partitions in itertools.product(shapes, repeat=3):
+        assert kronecker(partitions, evaluator, shortcuts=False) == character_kronecker(
+            partitions
+        ), partitions
+
+
+def test_dimension_reduction():
+    evaluator = RecordingEvaluator()
+    partitions = [[8, 4, 0], [6, 6, 0, 0], [7, 5, 0]]
+    assert kronecker(partitions, evaluator, shortcuts=False) == two_row_kronecker(
+        partitions
+    )
+    assert evaluator.shapes == {(6, 8)}
+
+
+def test_normalize_weight():
+    evaluator = RecordingEvaluator()
+    omega = [[2, 0, 1], [3], [0, 1, 2], [1, 0, 0, 2]]
+    assert normalize_weight(omega) == [[2, 1], [2, 1], [2, 1]]
+    vpn = kronecker_weight_vpn([3, 1, 3, 4])
+    expected = vpn.eval(flatten_weight(omega), NativeEvaluator())
+    assert kronecker_weight_multiplicity(omega, evaluator) == expected
+    assert evaluator.shapes == {(6, 8)}
@@ -1,4 +1,4 @@
-import itertools
+import asyncio, itertools, os
 import pytest
 from barvikron import *
 
@@ -64,3 +64,37 @@ def test_sturmfels_evaluation(b, evaluator):
     got = sturmfels_vpn.eval(b, evaluator)
     expected = sturmfels_expected(b)
     assert got == expected
+
+
+class SlowEvaluator(EvaluatorBase):
+    """
+    Fake evaluator that takes b[0] hundredths of a second to return b[0].
+    """
+
+    async def eval_async(self, vpn, b):
+        await asyncio.sleep(b[0] / 100)
+        return b[0]
+
+
+def test_eval_many():
+    async def collect(evaluator, weights, jobs):
+        return [x async for x in evaluator.eval_many(vpn, weights, jobs)]
+
+    vpn = VectorPartitionFunction([[1]])
+    got = asyncio.run(collect(SlowEvaluator(), [[30], [10], [20]], jobs=3))
+    assert got == [(1, 10), (2, 20), (0, 30)]
+
+    got = asyncio.run(collect(SlowEvaluator(), [[30], [10], [20]], jobs=1))
+    assert got == [(0, 30), (1, 10), (2, 20)]
+
+
+def test_eval_async(tmp_path):
+    path = str(tmp_path / "barvinok_count")
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\ncat > /dev/null\necho 'some output'\necho 42\n")
+    os.chmod(path, 0o755)
+
+    vpn = VectorPartitionFunction([[1, 1, 1]])
+    evaluator = BarvinokEvaluator(path)
+    assert vpn.eval([3], evaluator) == 42
+    assert asyncio.run(evaluator.eval_async(vpn, [3])) == 42
@@ -0,0 +1,72 @@
+import itertools
+import numpy as np
+import pytest
+from barvikron import *
+from barvikron import barvinok, latte
+
+STURMFELS = [[2, 1, 1, 0, 0, 0], [0, 1, 0, 2, 1, 0], [0, 0, 1, 0, 1, 2]]
+
+
+def test_independent_rows():
+    assert independent_rows(kronecker_weight_vpn([2, 2, 2]).A) == [0, 1, 2, 4]
+    assert independent_rows([[1, 2], [2, 4], [0, 0], [0, 1]]) == [0, 3]
+
+
+@pytest.mark.parametrize("A", [STURMFELS, [[2, 3, 5]], [[1, 1, 0], [0, 1, 4]]])
+def test_column_hermite_form(A):
+    H, U = column_hermite_form(A)
+    r = len(A)
+    assert round(abs(np.linalg.det(np.array(U, dtype=float)))) == 1
+    AU = np.array(A, dtype=object).dot(np.array(U, dtype=object))
+    assert AU[:, :r].tolist() == H
+    assert not AU[:, r:].any()
+    assert all(H[i][j] == 0 for i in range(r) for j in range(i + 1, r))
+    assert all(H[i][i] > 0 for i in range(r))
+
+
+def count_reduced(system, b, bound=8):
+    # brute-force count of lattice points in { y : M * y + c >= 0 }
+    count = system.trivial_count(b)
+    if count is not None:
+        return count
+    M, c = system.inequalities(b)
+    M = np.array(M, dtype=object)
+    return sum(
+        1
+        for y in itertools.product(range(-bound, bound + 1), repeat=system.dim)
+        if all(M.dot(y) + np.array(c, dtype=object) >= 0)
+    )
+
+
+def test_reduced_system_sturmfels():
+    system = VectorPartitionFunction(STURMFELS).reduced
+    assert system.dim == 3
+    for b in itertools.product(range(4), repeat=3):
+        assert count_reduced(system, b) == count_solutions(np.array(STURMFELS), b)
+
+
+def test_reduced_system_kronecker():
+    vpn = kronecker_weight_vpn([2, 3])
+    system = vpn.reduced
+    assert system is vpn.reduced
+    assert system.dim == 2
+    for omega in [[[2, 1], [1, 1, 1]], [[3, 0], [1, 2, 0]], [[4, 2], [2, 2, 2]]]:
+        weight = flatten_weight(omega)
+        assert count_reduced(system, weight) == count_solutions(vpn.A, weight)
+
+    # blocks of different degrees
+    assert system.trivial_count([2, 1, 1, 1, 0]) == 0
+
+    # polytope is a point
+    vpn = kronecker_weight_vpn([1, 2])
+    assert vpn.reduced.dim == 0
+    assert vpn.reduced.trivial_count([3, 1, 2]) == 1
+    assert vpn.reduced.trivial_count([3, 4, -1]) == 0
+
+
+def test_prepare_input():
+    M, c = [[1, 0], [0, 1], [-1, -1]], [0, 0, 3]
+    assert (
+        barvinok.prepare_input(M, c) == "3 4\n1   1 0   0\n1   0 1   0\n1   -1 -1   3\n"
+    )
+    assert latte.prepare_input(M, c) == "3 3\n0   1 0\n0   0 1\n3   -1 -1\n"
@@ -0,0 +1,127 @@
+import os
+import pytest
+from barvikron import *
+
+
+def test_polynomial():
+    f = parse_isl_pw_qpolynomial("[b0] -> { (1 + b0) : b0 >= 0 }")
+    assert f.params == ["b0"]
+    assert [f([b]) for b in range(-2, 4)] == [0, 0, 1, 2, 3, 4]
+    assert f([10**30]) == 10**30 + 1
+
+
+def test_quasi_polynomial():
+    # vector partition function of A = [[1, 2]]
+    f = parse_isl_pw_qpolynomial("[b0] -> { (1 + floor((b0)/2)) : b0 >= 0 }")
+    assert [f([b]) for b in range(-1, 6)] == [0, 1, 1, 2, 2, 3, 3]
+
+    f = parse_isl_pw_qpolynomial(
+        "[n] -> { ((1/2 * n + 1/2 * n^2) - floor((n)/2)) : n >= 0 and (n) mod 2 = 0 }"
+    )
+    assert f([4]) == 8
+
+
+def test_chambers():
+    f = parse_isl_pw_qpolynomial(
+        "[u, v] -> { (1 + v) : 0 <= v <= u; (1 + u) : u >= 0 and v >= 1 + u; "
+        "3 : exists (e0 = floor((u)/2): 2e0 = -1 + u and u < 0) }"
+    )
+    assert f([5, 3]) == 4
+    assert f([3, 5]) == 4
+    assert f([-3, 0]) == 3
+    assert f([-4, 0]) == 0
+
+
+def test_unbound_exists():
+    f = parse_isl_pw_qpolynomial(
+        "[u] -> { (1 + u) : u >= 0 and exists (e0: u = 3e0); 7 : u < 0 }"
+    )
+    assert f([-1]) == 7
+    with pytest.raises(UnresolvedChamber):
+        f([3])
+
+
+def test_walls():
+    # pieces agree on the wall
+    f = parse_isl_pw_qpolynomial(
+        "[u, v] -> { (1 + v) : 0 <= v <= u; (1 + u) : 0 <= u <= v }"
+    )
+    assert f([4, 4]) == 5
+
+    # pieces disagree on the wall
+    f = parse_isl_pw_qpolynomial("[u, v] -> { (1 + v) : 0 <= v <= u; u : 0 <= u <= v }")
+    with pytest.raises(UnresolvedChamber):
+        f([4, 4])
+
+    # non-integral value
+    f = parse_isl_pw_qpolynomial("[u] -> { 1/2 * u : u >= 0 }")
+    with pytest.raises(UnresolvedChamber):
+        f([3])
+
+
+def test_parametric_evaluator(tmp_path):
+    # fake iscc tool that prints the parametric partition function of A = [[1, 2]]
+    path = str(tmp_path / "iscc")
+    with open(path, "w") as f:
+        f.write(
+            "#!/bin/sh\ncat > /dev/null\necho '[b0] -> { (1 + floor((b0)/2)) : b0 >= 0 }'\n"
+        )
+    os.chmod(path, 0o755)
+
+    vpn = VectorPartitionFunction([[1, 2]])
+    evaluator = ParametricBarvinokEvaluator(path)
+    assert vpn.eval([7], evaluator) == 4
+    assert vpn.eval([10**20], evaluator) == 10**20 // 2 + 1
+    assert len(evaluator.quasi_polynomials) == 1
+
+
+def test_parametric_evaluator_fallback(tmp_path):
+    path = str(tmp_path / "iscc")
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\ncat > /dev/null\necho '[b0] -> { 1/2 * b0 : b0 >= 0 }'\n")
+    os.chmod(path, 0o755)
+
+    class FallbackEvaluator(EvaluatorBase):
+        def eval(self, vpn, b):
+            return 42
+
+    vpn = VectorPartitionFunction([[1, 2]])
+    evaluator = ParametricBarvinokEvaluator(path, fallback=FallbackEvaluator())
+    assert vpn.eval([4], evaluator) == 2
+    assert vpn.eval([5], evaluator) == 42
+
+
+def test_parametric_evaluator_parse_error(tmp_path):
+    path = str(tmp_path / "iscc")
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\ncat > /dev/null\necho 'garbage {'\n")
+    os.chmod(path, 0o755)
+
+    class FallbackEvaluator(EvaluatorBase):
+        def eval(self, vpn, b):
+            return 42
+
+    vpn = VectorPartitionFunction([[1, 2]])
+    evaluator = ParametricBarvinokEvaluator(path, fallback=FallbackEvaluator())
+    assert vpn.eval([4], evaluator) == 42
+
+
+def test_parametric_evaluator_failure(tmp_path):
+    path = str(tmp_path / "iscc")
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\ncat > /dev/null\necho 'out of memory'\nexit 1\n")
+    os.chmod(path, 0o755)
+
+    class FallbackEvaluator(EvaluatorBase):
+        def eval(self, vpn, b):
+            return 42
+
+    vpn = VectorPartitionFunction([[1, 2]])
+    evaluator = ParametricBarvinokEvaluator(path, fallback=FallbackEvaluator())
+    assert vpn.eval([4], evaluator) == 42
+    assert vpn.eval([5], evaluator) == 42
+    assert list(evaluator.quasi_polynomials.values()) == [None]
+
+    # without fallback, the failure is reported as an unresolved chamber
+    with pytest.raises(UnresolvedChamber):
+        vpn.eval([4], ParametricBarvinokEvaluator(path))
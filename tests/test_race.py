@@ -0,0 +1,86 @@
+import os, time
+import pytest
+from barvikron import *
+
+# fake barvinok_count that records its pid, sleeps and then reports a given count
+FAKE_BARVINOK_COUNT = """#!/bin/sh
+echo $$ > %s
+cat > /dev/null
+sleep %s
+echo %s
+"""
+
+
+def fake_barvinok_count(tmp_path, name, seconds, count=2):
+    path = str(tmp_path / name)
+    with open(path, "w") as f:
+        f.write(FAKE_BARVINOK_COUNT % (path + ".pid", seconds, count))
+    os.chmod(path, 0o755)
+    return path
+
+
+def running(pid_path):
+    with open(pid_path) as f:
+        pid = int(f.read())
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # zombies are fine
+    with open("/proc/%d/stat" % pid) as f:
+        return f.read().split()[2] != "Z"
+
+
+def test_racing_evaluator(tmp_path):
+    slow = fake_barvinok_count(tmp_path, "slow", 10)
+    fast = fake_barvinok_count(tmp_path, "fast", 0)
+    evaluator = RacingEvaluator([BarvinokEvaluator(slow), BarvinokEvaluator(fast)])
+    vpn = kronecker_weight_vpn([2, 2])
+
+    start = time.monotonic()
+    assert vpn.eval([1, 1, 1, 1], evaluator) == 2
+    assert time.monotonic() - start < 5
+    assert not running(slow + ".pid")
+    assert evaluator.wins == {"barvinok[%s]" % fast: 1}
+
+    # trivial queries are not raced
+    assert vpn.eval([1, 0, 0, 0], evaluator) == 0
+    assert sum(evaluator.wins.values()) == 1
+    evaluator.close()
+
+
+def test_racing_evaluator_failures(tmp_path):
+    broken = str(tmp_path / "broken")
+    with open(broken, "w") as f:
+        f.write("#!/bin/sh\nexit 1\n")
+    os.chmod(broken, 0o755)
+    slow = fake_barvinok_count(tmp_path, "slow", 0.5)
+    vpn = kronecker_weight_vpn([2, 2])
+
+    evaluator = RacingEvaluator([BarvinokEvaluator(broken), BarvinokEvaluator(slow)])
+    assert vpn.eval([1, 1, 1, 1], evaluator) == 2
+    assert evaluator.failures == {"barvinok[%s]" % broken: 1}
+    assert evaluator.wins == {"barvinok[%s]" % slow: 1}
+
+    evaluator = RacingEvaluator([BarvinokEvaluator(broken)])
+    with pytest.raises(AssertionError):
+        vpn.eval([1, 1, 1, 1], evaluator)
+
+
+def test_racing_evaluator_cross_check(tmp_path):
+    vpn = kronecker_weight_vpn([2, 2])
+    evaluator = RacingEvaluator(
+        [BarvinokEvaluator(fake_barvinok_count(tmp_path, "a", 0)), NativeEvaluator()],
+        cross_check=True,
+    )
+    assert vpn.eval([1, 1, 1, 1], evaluator) == 2
+
+    evaluator = RacingEvaluator(
+        [
+            BarvinokEvaluator(fake_barvinok_count(tmp_path, "a", 0)),
+            BarvinokEvaluator(fake_barvinok_count(tmp_path, "b", 0.2, count=3)),
+        ],
+        cross_check=True,
+    )
+    with pytest.raises(EvaluatorMismatch):
+        vpn.eval([1, 1, 1, 1], evaluator)
@@ -0,0 +1,68 @@
+import pytest
+from barvikron import *
+
+
+def run_worker(coordinator, evaluator, worker="w"):
+    vpns = {}
+    while True:
+        item = coordinator.lease(worker)
+        if item is None:
+            return
+        job_id, dims, index, coeff, weight = item
+        vpn = vpns.setdefault(tuple(dims), kronecker_weight_vpn(dims))
+        coordinator.complete(worker, job_id, index, vpn.eval(weight, evaluator))
+
+
+def test_coordinator():
+    evaluator = NativeEvaluator()
+    coordinator = Coordinator(shortcuts=False)
+    partitions = [
+        [[2, 1], [2, 1], [2, 1]],
+        [[3, 2, 1], [3, 2, 1], [4, 1, 1]],
+        [[2, 2], [3, 1]],
+    ]
+    ids = [coordinator.submit(p) for p in partitions]
+    ids.append(coordinator.submit([[2, 1], [2, 1], [2, 1]], weight_multiplicity=True))
+    ids.append(coordinator.submit([[2], [1, 1]]))
+    assert coordinator.wait(ids, 0) == [(ids[-1], 0)]
+
+    run_worker(coordinator, evaluator)
+    expected = [kronecker(p, evaluator, shortcuts=False) for p in partitions]
+    expected.append(kronecker_weight_multiplicity([[2, 1], [2, 1], [2, 1]], evaluator))
+    assert coordinator.wait(ids, 0) == list(zip(ids, expected + [0]))
+    assert coordinator.status() == "5 jobs (0 running), 0 work items pending, 0 leased"
+
+    coordinator.forget(ids[0])
+    with pytest.raises(UnknownJob):
+        coordinator.result(ids[0])
+    assert coordinator.result(ids[1]) == expected[1]
+
+
+def test_coordinator_shortcuts():
+    coordinator = Coordinator()
+    ids = [
+        coordinator.submit([[2, 1], [2, 1], [2, 1]]),
+        coordinator.submit([[3, 2, 1], [3, 2, 1], [4, 1, 1]]),
+    ]
+    assert coordinator.wait(ids, 0) == [(ids[0], 1), (ids[1], 4)]
+    assert coordinator.lease("a") is None
+
+
+def test_coordinator_fairness():
+    coordinator = Coordinator(shortcuts=False)
+    large = coordinator.submit([[3, 2, 1], [3, 2, 1], [4, 1, 1]])
+    small = coordinator.submit([[2, 1], [2, 1], [2, 1]])
+    assert coordinator.lease("a")[0] == large
+    assert coordinator.lease("a")[0] == small
+    assert coordinator.lease("a")[0] == large
+
+
+def test_coordinator_expire():
+    coordinator = Coordinator(lease_timeout=0)
+    job_id = coordinator.submit([[2, 1], [2, 1], [2, 1]], weight_multiplicity=True)
+    item = coordinator.lease("a")
+    assert coordinator.lease("b") == item
+    coordinator.complete("b", job_id, item[2], 7)
+    coordinator.complete("a", job_id, item[2], 7)
+    assert coordinator.result(job_id) == 7
+    assert coordinator.lease("a") is None
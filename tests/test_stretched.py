@@ -0,0 +1,42 @@
+import pytest
+from barvikron import *
+
+
+def test_quasi_polynomial():
+    f = QuasiPolynomial([[1, 2], [0, 2, 1]])
+    assert f.period == 2 and f.degree == 2
+    assert [f(N) for N in range(5)] == [1, 3, 5, 15, 9]
+    assert str(f) == "2*N + 1 if N % 2 == 0; 1*N^2 + 2*N if N % 2 == 1"
+
+
+def test_fit_quasi_polynomial():
+    f = QuasiPolynomial([[1, 2], [0, 2, 1]])
+    values = {N: f(N) for N in range(1, 11)}
+    assert fit_quasi_polynomial(values, 1, 2) is None
+    assert fit_quasi_polynomial(values, 2, 1) is None
+    g = fit_quasi_polynomial(values, 2, 2)
+    assert g(10**20 + 1) == f(10**20 + 1)
+
+
+@pytest.mark.parametrize(
+    "partitions",
+    [
+        [[1, 1], [1, 1], [1, 1]],
+        [[2, 1], [2, 1], [2, 1]],
+        [[2, 2], [2, 2], [3, 1]],
+    ],
+)
+@pytest.mark.parametrize("shortcuts", [True, False])
+def test_kronecker_stretched(partitions, shortcuts, evaluator):
+    # without shortcuts, the values are fitted from partition functions and checked against
+    # the closed form for two rows
+    f = kronecker_stretched(partitions, evaluator, shortcuts=shortcuts)
+    for N in [1, 9, 10]:
+        assert f(N) == kronecker([[N * x for x in p] for p in partitions], evaluator)
+
+
+def test_kronecker_stretched_undetermined(evaluator):
+    with pytest.raises(StretchingNotDetermined):
+        kronecker_stretched(
+            [[2, 1], [2, 1], [2, 1]], evaluator, max_degree=0, max_period=1
+        )
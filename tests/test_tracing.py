@@ -0,0 +1,87 @@
+import asyncio, json
+from barvikron import *
+from test_latte import fake_count
+
+
+def read_trace(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_percentiles():
+    assert percentiles([]) == {}
+    assert percentiles([3, 1, 2]) == {"p50": 2, "p90": 3, "p99": 3}
+    assert percentiles(range(1, 101), (50, 90)) == {"p50": 50, "p90": 90}
+
+
+def test_tracing_evaluator(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(path)
+    evaluator = TracingEvaluator(
+        CachedEvaluator(NativeEvaluator(), MultiplicityCache(":memory:")), tracer, "w1"
+    )
+    vpn = kronecker_weight_vpn([2, 2, 2])
+    with annotate(dims=[2, 2, 2], index=7):
+        first = vpn.eval([2, 1, 2, 1, 2, 1], evaluator)
+    assert vpn.eval([2, 1, 2, 1, 2, 1], evaluator) == first
+    summary = tracer.close()
+
+    records = read_trace(path)
+    assert len(records) == 3
+    assert records[0]["dims"] == [2, 2, 2] and records[0]["index"] == 7
+    assert records[0]["weight"] == [2, 1, 2, 1, 2, 1]
+    assert records[0]["worker"] == "w1#0"
+    assert records[0]["cache"] == "miss" and records[1]["cache"] == "hit"
+    assert records[0]["value"] == first
+    assert "native" in records[0]["phases"]
+    assert "index" not in records[1]
+    assert records[1]["dims"] == [2, 2, 2]
+    assert records[2]["summary"] == summary
+    assert summary["evaluations"] == 2
+    assert summary["workers"]["w1#0"]["evaluations"] == 2
+
+
+def test_tracing_phases(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(path)
+    evaluator = TracingEvaluator(
+        LatteEvaluator(fake_count(tmp_path, 0), scratch=str(tmp_path / "scratch")),
+        tracer,
+    )
+    vpn = kronecker_weight_vpn([2, 2])
+    assert vpn.eval([1, 1, 1, 1], evaluator) == 3
+    assert asyncio.run(evaluator.eval_async(vpn, [1, 1, 1, 1])) == 3
+    tracer.close()
+
+    records = read_trace(path)[:2]
+    for rec in records:
+        assert set(rec["phases"]) >= {"prepare", "spawn", "solve", "parse"}
+        assert rec["bytes_in"] > 0 and rec["bytes_out"] > 0
+        assert rec["wall"] >= sum(rec["phases"].values())
+
+
+class SlowEvaluator(EvaluatorBase):
+    async def eval_async(self, vpn, b):
+        await asyncio.sleep(0.1)
+        return 1
+
+
+def test_tracing_slots(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(path)
+    evaluator = TracingEvaluator(SlowEvaluator(), tracer, "w1")
+    vpn = kronecker_weight_vpn([2, 2])
+
+    async def run():
+        return await asyncio.gather(
+            *(evaluator.eval_async(vpn, [1, 1, 1, 1]) for _ in range(3))
+        )
+
+    assert asyncio.run(run()) == [1, 1, 1]
+    assert evaluator.busy_slots == set()
+    summary = tracer.close()
+
+    # concurrent evaluations are attributed to separate slots
+    assert set(summary["workers"]) == {"w1#0", "w1#1", "w1#2"}
+    for worker in summary["workers"].values():
+        assert worker["utilisation"] <= 1
@@ -0,0 +1,31 @@
+import itertools
+from barvikron import *
+
+
+class FailingEvaluator(EvaluatorBase):
+    def eval(self, vpn, b):
+        raise AssertionError("Should not evaluate partition functions.")
+
+
+def test_is_two_row():
+    assert is_two_row([[2, 1], [3], [1, 1, 1]]) is False
+    assert is_two_row([[2, 1], [3], [2, 1, 0]])
+    assert not is_two_row([[2, 1], [3]])
+
+
+def test_two_row_kronecker():
+    evaluator = NativeEvaluator()
+    for n in range(9):
+        for p, q, r in itertools.product(range(n // 2 + 1), repeat=3):
+            partitions = [[n - p, p], [n - q, q], [n - r, r]]
+            assert two_row_kronecker(partitions) == kronecker(
+                partitions, evaluator, shortcuts=False
+            ), partitions
+
+
+def test_two_row_shortcut():
+    partitions = [[4 * 10**6, 2 * 10**6], [5 * 10**6, 10**6], [3 * 10**6, 3 * 10**6]]
+    g = kronecker(partitions, FailingEvaluator())
+    assert g == two_row_kronecker(partitions)
+    assert kronecker([[4, 2], [5, 1], [3, 3]], FailingEvaluator()) == 1
+    assert kronecker([[4, 2, 0], [5, 1, 0], [3, 3]], FailingEvaluator()) == 1
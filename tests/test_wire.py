@@ -0,0 +1,47 @@
+import pytest
+from barvikron import *
+from barvikron.wire import encode_ints, decode_ints
+
+ITEMS = [(1, [2, 1]), (-1, [3, 0]), (2, [1, 2])]
+
+
+def test_encode_ints():
+    ints = [0, 1, -1, 63, -64, 64, 127, 128, -(10**30), 3**200]
+    assert decode_ints(encode_ints(ints)) == ints
+    assert len(encode_ints([0, 1, -1, 63])) == 4
+
+
+def test_wire():
+    dispatcher = Dispatcher(ITEMS)
+    server = WireServer(dispatcher, b"secret", "localhost")
+    port = server.start()
+    a = WireClient("localhost", port, b"secret", "a")
+    b = WireClient("localhost", port, b"secret", "b")
+
+    assert a.lease("a") == (0, 3, 1, (2, 1))
+    assert b.lease_many("b", 5) == [(1, 3, -1, (3, 0)), (2, 3, 2, (1, 2))]
+    assert a.lease("a") is None
+    b.heartbeat("b")
+    a.complete("a", 0, 10**40, 0.5)
+    b.complete_many("b", [(1, 2, None), (2, 1, 0.25)])
+    # requests are answered after the preceding messages on the same connection
+    a.finished()
+    assert b.finished()
+    assert dispatcher.total() == 10**40 - 2 + 2
+    assert dispatcher.completed_by == {0: "a", 1: "b", 2: "b"}
+    assert dispatcher.seconds == {0: 0.5, 2: 0.25}
+    a.close()
+
+    # closing the server closes remaining connections
+    server.close()
+    assert server.num_connections == 0
+    with pytest.raises((EOFError, ConnectionError)):
+        b.finished()
+    b.close()
+
+
+def test_wire_authentication():
+    server = WireServer(Dispatcher(ITEMS), b"secret", "localhost")
+    port = server.start()
+    with pytest.raises(AuthenticationFailed):
+        WireClient("localhost", port, b"wrong", "a")